@@ -0,0 +1,12 @@
+from strawberry.types.nodes import SelectedField, Selection
+
+
+def selected_names(selections: list[Selection]) -> set[str]:
+    """Имена запрошенных полей с раскрытыми фрагментами (без псевдонимов)"""
+    names: set[str] = set()
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            names.add(selection.name)
+        else:
+            names |= selected_names(selection.selections)
+    return names
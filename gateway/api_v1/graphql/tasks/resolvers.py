@@ -5,9 +5,13 @@ from .schemas import (
     TaskCreateInputGQL,
     TaskUpdateInputGQL,
     TaskStatusGQL,
-    map_json_to_task_gql
+    TaskOrderGQL,
+    TaskConnectionGQL,
+    map_json_to_task_gql,
+    map_json_to_task_connection_gql
 )
 from ..query_loader import load_query, load_mutation
+from ..selection import selected_names
 from typing import Optional
 from core.config import settings
 
@@ -69,6 +73,48 @@ class Query:
                 pages_count=tasks_data['pagesCount']
             )
 
+    @strawberry.field
+    async def tasks_connection(
+        self,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+        status: Optional[TaskStatusGQL] = None,
+        order_by: Optional[TaskOrderGQL] = None,
+        info: strawberry.Info = strawberry.UNSET,
+    ) -> TaskConnectionGQL:
+        """
+        Получение списка задач с курсорной пагинацией (Relay):
+        - first/after — вперед, last/before — назад
+        - totalCount запрашивается у сервиса задач, только если его запросил клиент
+        """
+        query = load_query('get_tasks_connection', 'tasks')
+        variables = {
+            'first': first,
+            'after': after,
+            'last': last,
+            'before': before,
+            'withTotalCount': 'totalCount' in selected_names(info.selected_fields[0].selections),
+        }
+        if status:
+            variables['status'] = status.value.upper()
+        if order_by:
+            variables['orderBy'] = order_by.to_dict()
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                TASKS_URL,
+                json={
+                    'query': query,
+                    'variables': variables
+                }
+            )
+            data = response.json()
+            if 'errors' in data:
+                error_msg = data['errors'][0]['message']
+                raise Exception(f'Ошибка получения задач: {error_msg}')
+            return map_json_to_task_connection_gql(data['data']['tasksConnection'])
+
 @strawberry.type
 class Mutation:
     @strawberry.mutation
@@ -31,6 +31,60 @@ class TaskPageGQL:
     total: int
     pages_count: int
 
+@strawberry.enum
+class TaskOrderFieldGQL(str, Enum):
+    TITLE = 'title'
+    STATUS = 'status'
+    ID = 'id'
+
+@strawberry.enum
+class OrderDirectionGQL(str, Enum):
+    ASC = 'asc'
+    DESC = 'desc'
+
+@strawberry.input
+class TaskOrderGQL:
+    field: TaskOrderFieldGQL = TaskOrderFieldGQL.TITLE
+    direction: OrderDirectionGQL = OrderDirectionGQL.DESC
+
+    def to_dict(self) -> dict:
+        """Значения enum в верхнем регистре для GraphQL сервиса задач"""
+        return {'field': self.field.value.upper(), 'direction': self.direction.value.upper()}
+
+@strawberry.type
+class PageInfoGQL:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str] = None
+    end_cursor: Optional[str] = None
+
+@strawberry.type
+class TaskEdgeGQL:
+    cursor: str
+    node: TaskGQL
+
+@strawberry.type
+class TaskConnectionGQL:
+    edges: List[TaskEdgeGQL]
+    page_info: PageInfoGQL
+    total_count: Optional[int] = None
+
+def map_json_to_task_connection_gql(data: dict) -> TaskConnectionGQL:
+    page_info = data['pageInfo']
+    return TaskConnectionGQL(
+        edges=[
+            TaskEdgeGQL(cursor=edge['cursor'], node=map_json_to_task_gql(edge['node']))
+            for edge in data['edges']
+        ],
+        page_info=PageInfoGQL(
+            has_next_page=page_info['hasNextPage'],
+            has_previous_page=page_info['hasPreviousPage'],
+            start_cursor=page_info['startCursor'],
+            end_cursor=page_info['endCursor'],
+        ),
+        total_count=data.get('totalCount'),
+    )
+
 @strawberry.input
 class TaskCreateInputGQL:
     title: str
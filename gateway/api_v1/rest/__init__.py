@@ -3,10 +3,12 @@ from fastapi import APIRouter
 from .tasks.views import router as tasks_router
 from .tasks.views import router_list as tasks_list_router
 from .tasks.views import router_worker as tasks_worker_router
+from .metrics.views import router as metrics_router
 
 router = APIRouter()
 
 
 router.include_router(router=tasks_router, prefix='/task')
 router.include_router(router=tasks_list_router, prefix='/tasks')
-router.include_router(router=tasks_worker_router, prefix='/task')
\ No newline at end of file
+router.include_router(router=tasks_worker_router, prefix='/task')
+router.include_router(router=metrics_router, prefix='/metrics')
\ No newline at end of file
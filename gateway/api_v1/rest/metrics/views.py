@@ -0,0 +1,15 @@
+from fastapi import APIRouter, status
+from core.metrics import metrics
+
+router = APIRouter(tags=['Metrics'])
+
+
+@router.get('/', status_code=status.HTTP_200_OK)
+async def get_metrics():
+    """
+    Снимок метрик процесса (spool и очередь публикации событий).
+
+    Возвращает:
+        dict: Метрики процесса. `200`
+    """
+    return metrics.snapshot()
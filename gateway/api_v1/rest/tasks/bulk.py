@@ -0,0 +1,240 @@
+import re
+from typing import AsyncIterator, Union
+
+
+class BulkFormatError(ValueError):
+    """Тело запроса не разбирается как NDJSON или JSON-массив"""
+
+
+# структурные символы JSON вне строк и конец строки/экранирование внутри строк
+_STRUCTURAL = re.compile(rb'[\[\]{}",]')
+_STRING_END = re.compile(rb'["\\]')
+_WHITESPACE = b' \t\r\n'
+
+
+class NdjsonSplitter:
+    """Делит поток NDJSON на строки; пустые строки пропускаются, но нумеруются"""
+    def __init__(self, max_item_bytes: int):
+        self.max_item_bytes = max_item_bytes
+        self.buffer = b''
+        self.line = 0
+
+        # ошибка после строк той же части тела: сначала отдаются строки
+        self.error: BulkFormatError | None = None
+
+    def feed(self, data: bytes) -> list[tuple[int, bytes]]:
+        if self.error is not None:
+            raise self.error
+        *lines, self.buffer = (self.buffer + data).split(b'\n')
+        items = []
+        for raw in lines:
+            self.line += 1
+            if raw.strip():
+                items.append((self.line, raw))
+        if len(self.buffer) > self.max_item_bytes:
+            self.error = BulkFormatError(f'Строка {self.line + 1} длиннее {self.max_item_bytes} Б')
+            if not items:
+                raise self.error
+        return items
+
+    def close(self) -> list[tuple[int, bytes]]:
+        if self.error is not None:
+            raise self.error
+        self.line += 1
+        return [(self.line, self.buffer)] if self.buffer.strip() else []
+
+
+class JsonArraySplitter:
+    """
+    Делит поток JSON-массива на элементы верхнего уровня, не разбирая их:
+    отслеживаются только вложенность скобок и строки. Элементы разбирает
+    и проверяет схема, в буфере остается не больше одного элемента.
+    """
+    def __init__(self, max_item_bytes: int):
+        self.max_item_bytes = max_item_bytes
+        self.buffer = bytearray()
+        self.pos = 0
+        # начало текущего элемента в buffer, вложенность и признак строки
+        self.start: int | None = None
+        self.depth = 0
+        self.in_string = False
+        # start -> value -> next -> value ... -> end
+        self.state = 'start'
+        self.number = 0
+        # ошибка после элементов той же части тела: сначала отдаются элементы
+        self.error: BulkFormatError | None = None
+
+    def _skip_whitespace(self) -> bool:
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+            self.pos += 1
+        return self.pos < len(self.buffer)
+
+    def _emit(self, end: int, items: list) -> None:
+        self.number += 1
+        items.append((self.number, bytes(self.buffer[self.start:end]).strip()))
+        self.start = None
+        self.pos = end
+        self.state = 'next'
+
+    def feed(self, data: bytes) -> list[tuple[int, bytes]]:
+        if self.error is not None:
+            raise self.error
+        self.buffer += data
+        items: list[tuple[int, bytes]] = []
+        try:
+            self._split(items)
+        except BulkFormatError as e:
+            if not items:
+                raise
+            self.error = e
+            return items
+        # разобранная часть буфера больше не нужна
+        cut = self.start if self.start is not None else self.pos
+        if cut:
+            del self.buffer[:cut]
+            self.pos -= cut
+            if self.start is not None:
+                self.start = 0
+        return items
+
+    def _split(self, items: list) -> None:
+        while True:
+            if self.start is not None:
+                if not self._scan_value(items):
+                    if self.pos - self.start > self.max_item_bytes:
+                        raise BulkFormatError(f'Элемент {self.number + 1} длиннее {self.max_item_bytes} Б')
+                    break
+                continue
+            if not self._skip_whitespace():
+                break
+            char = self.buffer[self.pos]
+            if self.state == 'start':
+                if char != ord('['):
+                    raise BulkFormatError('Ожидается JSON-массив или NDJSON (Content-Type: application/x-ndjson)')
+                self.state = 'first'
+                self.pos += 1
+            elif self.state in ('first', 'value'):
+                if char == ord(']') and self.state == 'first':
+                    self.state = 'end'
+                    self.pos += 1
+                    continue
+                if char in b',]':
+                    raise BulkFormatError(f'Пропущен элемент {self.number + 1}')
+                self.start = self.pos
+                self.depth = 0
+                if char == ord('"'):
+                    self.in_string = True
+                    self.pos += 1
+                elif char in b'{[':
+                    self.depth = 1
+                    self.pos += 1
+            elif self.state == 'next':
+                if char == ord(','):
+                    self.state = 'value'
+                elif char == ord(']'):
+                    self.state = 'end'
+                else:
+                    raise BulkFormatError(f'Ожидается "," или "]" после элемента {self.number}')
+                self.pos += 1
+            else:
+                raise BulkFormatError('Данные после конца JSON-массива')
+
+    def _scan_value(self, items: list) -> bool:
+        """Продвигает разбор текущего элемента; False — нужны еще данные"""
+        if self.in_string:
+            match = _STRING_END.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                return False
+            if match.group() == b'\\':
+                if match.end() >= len(self.buffer):
+                    self.pos = match.start()
+                    return False
+                self.pos = match.end() + 1
+                return True
+            self.in_string = False
+            self.pos = match.end()
+            if self.depth == 0:
+                self._emit(self.pos, items)
+            return True
+        match = _STRUCTURAL.search(self.buffer, self.pos)
+        if match is None:
+            self.pos = len(self.buffer)
+            return False
+        char = match.group()
+        if char == b'"':
+            self.in_string = True
+            self.pos = match.end()
+        elif char in (b'{', b'['):
+            self.depth += 1
+            self.pos = match.end()
+        elif self.depth == 0:
+            # конец числа или литерала: разделитель разберет состояние next
+            self._emit(match.start(), items)
+        elif char == b',':
+            self.pos = match.end()
+        else:
+            self.depth -= 1
+            self.pos = match.end()
+            if self.depth == 0:
+                self._emit(self.pos, items)
+        return True
+
+    def close(self) -> list[tuple[int, bytes]]:
+        if self.error is not None:
+            raise self.error
+        if self.state != 'end':
+            raise BulkFormatError('JSON-массив не завершен')
+        return []
+
+
+Splitter = Union[NdjsonSplitter, JsonArraySplitter]
+
+
+def make_splitter(content_type: str, max_item_bytes: int) -> Splitter:
+    if 'ndjson' in content_type or 'jsonlines' in content_type:
+        return NdjsonSplitter(max_item_bytes)
+    return JsonArraySplitter(max_item_bytes)
+
+
+async def split_stream(chunks: AsyncIterator[bytes], splitter: Splitter) -> AsyncIterator[tuple[int, bytes]]:
+    """Элементы (номер строки или элемента, байты) по мере поступления тела запроса"""
+    async for chunk in chunks:
+        for item in splitter.feed(chunk):
+            yield item
+    for item in splitter.close():
+        yield item
+
+
+def event_correlation_id(correlation_id: str, line: int) -> str:
+    """correlation_id события пакета: общий для пакета и номер строки"""
+    return f'{correlation_id}:{line}'
+
+
+class BulkResult:
+    """
+    Итог пакетного приема: счетчики и ошибки по строкам (не больше max_errors).
+    correlation_id — общая часть correlation_id событий пакета (см. event_correlation_id).
+    """
+    def __init__(self, max_errors: int, correlation_id: str):
+        self.max_errors = max_errors
+        self.correlation_id = correlation_id
+        self.accepted = 0
+        self.spooled = 0
+        self.rejected = 0
+        self.errors: list[dict] = []
+
+    def reject(self, line: int, errors: list) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def summary(self) -> dict:
+        return {
+            'correlation_id': self.correlation_id,
+            'accepted': self.accepted,
+            'spooled': self.spooled,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'errors_truncated': self.rejected > len(self.errors),
+        }
@@ -1,5 +1,36 @@
 from aiokafka import AIOKafkaProducer
+from typing import Optional
+from infrastructure.kafka.publisher import EventPublisher
+from infrastructure.kafka.spool import EventSpool
+from infrastructure.kafka.pipeline import PublishPipeline
+from infrastructure.kafka.replies import OutcomeStore
+from infrastructure.kafka.changes import ChangeBroadcaster
 
 async def get_producer() -> AIOKafkaProducer:
     from main import app  # Ленивый импорт
     return app.state.kafka_producer
+
+
+async def get_publisher() -> EventPublisher:
+    from main import app  # Ленивый импорт
+    return app.state.kafka_publisher
+
+
+async def get_spool() -> Optional[EventSpool]:
+    from main import app  # Ленивый импорт
+    return app.state.kafka_spool
+
+
+async def get_pipeline() -> Optional[PublishPipeline]:
+    from main import app  # Ленивый импорт
+    return app.state.kafka_pipeline
+
+
+async def get_outcomes() -> Optional[OutcomeStore]:
+    from main import app  # Ленивый импорт
+    return app.state.task_outcomes
+
+
+async def get_broadcaster() -> Optional[ChangeBroadcaster]:
+    from main import app  # Ленивый импорт
+    return app.state.task_changes
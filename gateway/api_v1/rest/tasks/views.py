@@ -1,4 +1,7 @@
-from fastapi import APIRouter,Query, status, Path, Depends
+import asyncio, uuid
+from pydantic import ValidationError
+from fastapi import APIRouter, Query, status, Path, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import Annotated
 from .schemas import (
     SchemaTask,
@@ -6,11 +9,28 @@ from .schemas import (
     TaskUpdate,
     TaskUpdatePartial,
     TasksResponseSchema,
-    TaskFilters
+    TaskFilters,
+    TaskStatusEnum,
 )
 from infrastructure.tasks_facade import task_facade
-from .dependencies import AIOKafkaProducer, get_producer
+from .dependencies import (
+    EventPublisher,
+    EventSpool,
+    OutcomeStore,
+    ChangeBroadcaster,
+    PublishPipeline,
+    get_publisher,
+    get_spool,
+    get_pipeline,
+    get_outcomes,
+    get_broadcaster,
+)
 from core.config import settings
+from infrastructure.kafka.partitioning import event_key
+from infrastructure.kafka.spool import SpoolFullError, spool_record
+from infrastructure.kafka.pipeline import PublishQueueFull
+from infrastructure.kafka.changes import ChangeSubscriber, TooManySubscribers, sse_frame
+from .bulk import BulkFormatError, BulkResult, event_correlation_id, make_splitter, split_stream
 
 import logging.config
 from core.logger import logger_config
@@ -176,26 +196,283 @@ async def get_list_tasks(
         input_search=filters.input_search,
     )
 
+async def task_change_frames(broadcaster: ChangeBroadcaster, subscriber: ChangeSubscriber):
+    try:
+        # переподключение клиента через 3 с после обрыва
+        yield b'retry: 3000\n\n'
+        while not subscriber.closed:
+            frames = await subscriber.next(settings.task_stream.HEARTBEAT)
+            yield b''.join(frames) if frames else b': ping\n\n'
+        # клиент не успевал читать: список задач стоит перечитать через GET /tasks/
+        yield sse_frame('overflow', {'buffer_size': subscriber.size})
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+@router_list.get('/stream', status_code=status.HTTP_200_OK)
+async def stream_task_changes(
+    broadcaster: ChangeBroadcaster | None = Depends(get_broadcaster),
+    task_status: Annotated[list[TaskStatusEnum] | None, Query(alias='status')] = None,
+):
+    """
+    Поток изменений задач (Server-Sent Events) вместо опроса GET /tasks/:
+    события TaskCreated, TaskUpdated, TaskDeleted из топика task_changes.
+
+    - **status**: только задачи в этих статусах (можно несколько); удаления приходят всем
+
+    Все клиенты процесса читают одного потребителя Kafka через свои ограниченные
+    буферы: при переполнении старые события вытесняются (событие dropped)
+    или клиент отключается (событие overflow) — GATEWAY_TASK_STREAM_OVERFLOW.
+    """
+    if broadcaster is None:
+        raise HTTPException(status_code=404, detail='Поток изменений отключен (GATEWAY_TASK_STREAM_ENABLED)')
+    try:
+        subscriber = broadcaster.subscribe([item.value for item in task_status] if task_status else None)
+    except TooManySubscribers as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': '5'})
+    return StreamingResponse(
+        task_change_frames(broadcaster, subscriber),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+def event_response(event_status: str, event: dict) -> dict:
+    """Ответ на событие: по correlation_id итог обработки — в GET /task/events/{correlation_id}"""
+    return {'status': event_status, 'event_id': event['event_id'], 'correlation_id': event['correlation_id']}
+
+def spool_task_event(spool: EventSpool, event: dict, key: bytes | None, response: Response) -> dict:
+    """Событие в локальный spool: отправит фоновая задача, когда Kafka станет доступна"""
+    try:
+        spool.append(spool_record(event, key))
+    except SpoolFullError as e:
+        kafka_logger.error('Kafka недоступна, spool заполнен', exc_info=e)
+        raise HTTPException(status_code=503, detail=f'Ошибка отправки сообщения в topic task_events: {e}')
+    response.status_code = status.HTTP_202_ACCEPTED
+    return event_response('spooled', event)
+
 @router_worker.post('/create_event', status_code=status.HTTP_201_CREATED)
 async def send_task_creation_event(
     task: TaskCreate,
-    producer: AIOKafkaProducer = Depends(get_producer)
+    request: Request,
+    response: Response,
+    publisher: EventPublisher = Depends(get_publisher),
+    spool: EventSpool | None = Depends(get_spool),
+    pipeline: PublishPipeline | None = Depends(get_pipeline),
+    client_id: Annotated[str | None, Header(alias='X-Client-Id')] = None,
+    correlation_id: Annotated[str | None, Header(alias='X-Correlation-Id', max_length=128)] = None,
 ):
     event = {
         'event': 'TaskCreation',
+        # ID события — ID будущей задачи: worker по нему отсекает повторную доставку
+        'event_id': str(uuid.uuid4()),
+        # по correlation_id клиент узнает итог обработки, не опрашивая GET /tasks/
+        'correlation_id': correlation_id or str(uuid.uuid4()),
         'task': task.model_dump()
     }
+    if settings.replies.ENABLED:
+        event['reply_to'] = settings.kafka.REPLY_TOPIC
+    key = event_key(event, settings.kafka.PARTITION_KEY, client_id)
+    if spool is not None and not request.app.state.kafka_producer_available:
+        # Kafka недоступна или spool еще не отправлен: порядок событий сохраняется
+        return spool_task_event(spool, event, key, response)
+    timeout = settings.spool.PUBLISH_TIMEOUT if spool is not None else None
+    if pipeline is not None:
+        # очередь публикации ограничена: при заполнении клиент повторит позже, а не ждет
+        try:
+            future = pipeline.submit(event, key, wait=publisher.waits_for_broker)
+        except PublishQueueFull as e:
+            kafka_logger.warning(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(e),
+                headers={'Retry-After': str(e.retry_after)},
+            )
+        if not publisher.waits_for_broker:
+            response.status_code = status.HTTP_202_ACCEPTED
+            return event_response('accepted', event)
+        publishing = future
+    else:
+        publishing = publisher.publish(topic=settings.kafka.TOPIC, value=event, key=key)
     try:
-        await producer.send_and_wait(topic=settings.kafka.TOPIC, value=event)
+        # по таймауту future отменяется: событие из очереди публикации не уйдет
+        await asyncio.wait_for(publishing, timeout)
         kafka_logger.info('Сообщение успешно отправлено', extra={
             'tags': {
                 'topic': settings.kafka.TOPIC,
                 'event': event['event'],
+                'event_id': event['event_id'],
                 'task_title': event['task']['title'],
                 'task_description': event['task']['description'],
             }
         })
     except Exception as e:
+        if spool is not None:
+            # по таймауту событие могло все же уйти в Kafka: дубликат worker отсечет по event_id
+            kafka_logger.warning('Kafka недоступна, события пишутся в spool => %s: %s', type(e).__name__, e)
+            request.app.state.kafka_producer_available = False
+            return spool_task_event(spool, event, key, response)
         kafka_logger.exception('Ошибка отправки сообщения в topic task_events', exc_info=e)
         raise HTTPException(status_code=503, detail=f'Ошибка отправки сообщения в topic task_events: {e}')
-    return {'status': 'published'}
\ No newline at end of file
+    if not publisher.waits_for_broker:
+        # событие в буфере producer, подтверждения брокера не ждали
+        response.status_code = status.HTTP_202_ACCEPTED
+        return event_response('accepted', event)
+    return event_response('published', event)
+
+
+@router_worker.get('/events/{correlation_id}', status_code=status.HTTP_200_OK)
+async def get_task_event_outcome(
+    # у событий пакета к correlation_id добавлен номер строки
+    correlation_id: Annotated[str, Path(max_length=150)],
+    response: Response,
+    outcomes: OutcomeStore | None = Depends(get_outcomes),
+    wait_ms: Annotated[int, Query(ge=0, le=settings.replies.MAX_WAIT_MS)] = 0,
+):
+    """
+    Итог обработки события по correlation_id: created с ID задачи или failed
+    с ошибкой. Пока ответа worker нет — 202 со статусом pending; с wait_ms
+    запрос ждет ответа не дольше wait_ms (long-poll).
+    """
+    if outcomes is None:
+        raise HTTPException(status_code=404, detail='Ответы worker отключены (GATEWAY_REPLIES_ENABLED)')
+    outcome = await outcomes.wait(correlation_id, wait_ms / 1000)
+    if outcome is None:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {'correlation_id': correlation_id, 'status': 'pending'}
+    return outcome
+
+
+async def send_task_events(
+    publisher: EventPublisher,
+    pipeline: PublishPipeline | None,
+    batch: list[tuple[dict, bytes | None]],
+) -> None:
+    """
+    Пачка событий в Kafka с ожиданием подтверждения. С очередью публикации —
+    через нее: пакетный прием подчиняется тому же ограничению (PublishQueueFull).
+    Пачка принимается целиком: при заполнении очереди поставленные события отменяются.
+    """
+    if pipeline is None:
+        await publisher.publish_batch(settings.kafka.TOPIC, batch)
+        return
+    futures = []
+    try:
+        for event, key in batch:
+            futures.append(pipeline.submit(event, key))
+    except PublishQueueFull:
+        for future in futures:
+            future.cancel()
+        raise
+    try:
+        await asyncio.gather(*futures)
+    except BaseException:
+        # таймаут или ошибка: неотправленные события пачки из очереди не уйдут
+        for future in futures:
+            future.cancel()
+        raise
+
+async def publish_task_events(
+    request: Request,
+    publisher: EventPublisher,
+    pipeline: PublishPipeline | None,
+    spool: EventSpool | None,
+    batch: list[tuple[dict, bytes | None]],
+) -> bool:
+    """Пачка событий в Kafka или, если она недоступна, в spool; True — записано в spool"""
+    if spool is not None and request.app.state.kafka_producer_available:
+        try:
+            await asyncio.wait_for(send_task_events(publisher, pipeline, batch), settings.spool.PUBLISH_TIMEOUT)
+            return False
+        except PublishQueueFull:
+            raise
+        except Exception as e:
+            kafka_logger.warning('Kafka недоступна, события пишутся в spool => %s: %s', type(e).__name__, e)
+            request.app.state.kafka_producer_available = False
+    if spool is None:
+        await send_task_events(publisher, pipeline, batch)
+        return False
+    for event, key in batch:
+        spool.append(spool_record(event, key))
+    return True
+
+@router_worker.post('/create_events', status_code=status.HTTP_200_OK)
+async def send_task_creation_events(
+    request: Request,
+    publisher: EventPublisher = Depends(get_publisher),
+    pipeline: PublishPipeline | None = Depends(get_pipeline),
+    spool: EventSpool | None = Depends(get_spool),
+    client_id: Annotated[str | None, Header(alias='X-Client-Id')] = None,
+    correlation_id: Annotated[str | None, Header(alias='X-Correlation-Id', max_length=128)] = None,
+):
+    """
+    Пакетное создание задач через события: JSON-массив или NDJSON
+    (Content-Type: application/x-ndjson). Тело разбирается по мере
+    поступления, каждая строка проверяется отдельно, корректные события
+    отправляются пачками по GATEWAY_BULK_BATCH_SIZE с ожиданием брокера —
+    следующая часть тела читается после отправки пачки. Пачки идут через
+    очередь публикации: если она заполнена, ответ 429 с Retry-After, а пачка
+    и остаток тела не принимаются (принятое ранее — в счетчиках ответа).
+    В ответе — счетчики и ошибки проверки по номерам строк (элементов массива).
+    correlation_id события — <correlation_id пакета>:<номер строки>, итог каждого
+    события — в GET /task/events/{correlation_id}.
+    """
+    result = BulkResult(settings.bulk_events.MAX_ERRORS, correlation_id or str(uuid.uuid4()))
+    splitter = make_splitter(request.headers.get('content-type', ''), settings.bulk_events.MAX_ITEM_BYTES)
+    batch: list[tuple[dict, bytes | None]] = []
+
+    async def flush() -> None:
+        try:
+            spooled = await publish_task_events(request, publisher, pipeline, spool, batch)
+        except PublishQueueFull as e:
+            kafka_logger.warning(str(e))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={'error': str(e), **result.summary()},
+                headers={'Retry-After': str(e.retry_after)},
+            )
+        except Exception as e:
+            kafka_logger.exception('Ошибка отправки пачки событий в topic task_events', exc_info=e)
+            raise HTTPException(
+                status_code=503,
+                detail={'error': f'Ошибка отправки сообщений в topic task_events: {e}', **result.summary()},
+            )
+        if spooled:
+            result.spooled += len(batch)
+        else:
+            result.accepted += len(batch)
+        batch.clear()
+
+    format_error: BulkFormatError | None = None
+    try:
+        async for line, raw in split_stream(request.stream(), splitter):
+            try:
+                task = TaskCreate.model_validate_json(raw)
+            except ValidationError as e:
+                result.reject(line, e.errors(include_url=False, include_context=False, include_input=False))
+                continue
+            event = {
+                'event': 'TaskCreation',
+                'event_id': str(uuid.uuid4()),
+                'correlation_id': event_correlation_id(result.correlation_id, line),
+                'task': task.model_dump(),
+            }
+            if settings.replies.ENABLED:
+                event['reply_to'] = settings.kafka.REPLY_TOPIC
+            batch.append((event, event_key(event, settings.kafka.PARTITION_KEY, client_id)))
+            if len(batch) >= settings.bulk_events.BATCH_SIZE:
+                await flush()
+    except BulkFormatError as e:
+        format_error = e
+    if batch:
+        await flush()
+    kafka_logger.info('Пакет событий принят', extra={
+        'tags': {
+            'topic': settings.kafka.TOPIC,
+            'accepted': result.accepted,
+            'spooled': result.spooled,
+            'rejected': result.rejected,
+        }
+    })
+    if format_error is not None:
+        # строки до ошибки формата уже отправлены: они есть в счетчиках
+        raise HTTPException(status_code=400, detail={'error': str(format_error), **result.summary()})
+    return result.summary()
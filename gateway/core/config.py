@@ -1,10 +1,15 @@
 # -*- encoding: utf-8 -*-
 import os
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from pydantic_settings import BaseSettings
 
 load_dotenv()
+
+class ConfigurationSection(BaseModel):
+    # значения из окружения — строки: приводятся к объявленным типам ('false' -> False, '8' -> 8)
+    model_config = ConfigDict(validate_default=True)
+
 class ConfigurationCORS(BaseModel):
     #########################
     #         CORS          #
@@ -27,17 +32,110 @@ class ConfigurationCORS(BaseModel):
         'Access-Control-Allow-Origin',
     ]
 
-class ConfigurationKafka(BaseModel):
+class ConfigurationKafka(ConfigurationSection):
     #########################
     #         KAFKA         #
     #########################
     BOOTSTRAP: str = os.getenv('KAFKA_BOOTSTRAP', 'kafka:9092')
     CLIENT_ID: str = os.getenv('KAFKA_CLIENT_ID', 'gateway_app')
     TOPIC: str = os.getenv('KAFKA_TOPIC', 'task_events')
+    # итоги обработки событий worker (correlation_id -> задача или ошибка)
+    REPLY_TOPIC: str = os.getenv('KAFKA_REPLY_TOPIC', 'task_events.replies')
+    # события изменений задач (TaskCreated/Updated/Deleted) из outbox сервиса tasks
+    CHANGES_TOPIC: str = os.getenv('KAFKA_CHANGES_TOPIC', 'task_changes')
     GROUP_ID: str = os.getenv('KAFKA_GROUP_ID', 'gateway_app_group')
     STARTUP_RETRIES: int = os.getenv('KAFKA_STARTUP_RETRIES', 3)
     RETRY_BACKOFF: float = os.getenv('KAFKA_RETRY_BACKOFF', 1.0)
+    # ключ событий задач: task_id (ID будущей задачи), client_id (заголовок X-Client-Id) или none
+    PARTITION_KEY: str = os.getenv('KAFKA_PARTITION_KEY', 'task_id')
+    # default (murmur2 от ключа), random или свой 'module:attribute'
+    PARTITIONER: str = os.getenv('KAFKA_PARTITIONER', 'default')
+    # профиль producer событий задач: latency, balanced или throughput (linger, пачка, сжатие, acks)
+    PRODUCER_PROFILE: str = os.getenv('KAFKA_PRODUCER_PROFILE', 'balanced')
+    # ответ после подтверждения брокером (broker) или после постановки в пачку producer (enqueued)
+    PRODUCER_ACK_MODE: str = os.getenv('KAFKA_PRODUCER_ACK_MODE', 'broker')
+    # неподтвержденных событий в режиме enqueued, дальше запросы ждут
+    PRODUCER_MAX_PENDING: int = os.getenv('KAFKA_PRODUCER_MAX_PENDING', 10000)
+    # кодек событий задач: json или msgpack (формат и версия схемы — в заголовках сообщения)
+    EVENT_CODEC: str = os.getenv('KAFKA_EVENT_CODEC', 'json')
+    # создание/проверка топиков при запуске; партиции ограничивают число параллельных потребителей
+    TOPIC_BOOTSTRAP: bool = os.getenv('KAFKA_TOPIC_BOOTSTRAP', True)
+    TOPIC_PARTITIONS: int = os.getenv('KAFKA_TOPIC_PARTITIONS', 12)
+    TOPIC_REPLICATION: int = os.getenv('KAFKA_TOPIC_REPLICATION', 1)
  
+class ConfigurationSpool(ConfigurationSection):
+    #########################
+    #     KAFKA SPOOL       #
+    #########################
+
+    # события на диск при недоступности Kafka, ответ 202; отправка после восстановления
+    ENABLED: bool = os.getenv('GATEWAY_SPOOL_ENABLED', True)
+    DIR: str = os.getenv('GATEWAY_SPOOL_DIR', 'spool')
+    SEGMENT_BYTES: int = os.getenv('GATEWAY_SPOOL_SEGMENT_BYTES', 16 * 1024 * 1024)
+    MAX_BYTES: int = os.getenv('GATEWAY_SPOOL_MAX_BYTES', 1024 * 1024 * 1024)
+    # always, interval или never
+    FSYNC: str = os.getenv('GATEWAY_SPOOL_FSYNC', 'interval')
+    FSYNC_INTERVAL: float = os.getenv('GATEWAY_SPOOL_FSYNC_INTERVAL', 1.0)
+    # ожидание брокера в запросе, после которого событие уходит в spool
+    PUBLISH_TIMEOUT: float = os.getenv('GATEWAY_SPOOL_PUBLISH_TIMEOUT', 5.0)
+    DRAIN_BATCH: int = os.getenv('GATEWAY_SPOOL_DRAIN_BATCH', 500)
+    DRAIN_INTERVAL: float = os.getenv('GATEWAY_SPOOL_DRAIN_INTERVAL', 0.5)
+
+class ConfigurationPublishQueue(ConfigurationSection):
+    #########################
+    #  KAFKA PUBLISH QUEUE  #
+    #########################
+
+    # очередь событий перед Kafka: при заполнении ответ 429 с Retry-After
+    ENABLED: bool = os.getenv('GATEWAY_PUBLISH_QUEUE_ENABLED', True)
+    SIZE: int = os.getenv('GATEWAY_PUBLISH_QUEUE_SIZE', 10000)
+    # задач-отправителей и событий в одной пачке producer
+    WORKERS: int = os.getenv('GATEWAY_PUBLISH_WORKERS', 4)
+    BATCH_SIZE: int = os.getenv('GATEWAY_PUBLISH_BATCH_SIZE', 500)
+    # минимальный Retry-After (сек.); дальше — оценка по глубине очереди и скорости отправки
+    RETRY_AFTER: int = os.getenv('GATEWAY_PUBLISH_RETRY_AFTER', 1)
+    # отправка оставшейся очереди при остановке
+    SHUTDOWN_TIMEOUT: float = os.getenv('GATEWAY_PUBLISH_SHUTDOWN_TIMEOUT', 10.0)
+
+class ConfigurationBulkEvents(ConfigurationSection):
+    ########################
+    #  BULK TASK EVENTS    #
+    ########################
+
+    # событий в одной пачке producer при пакетном приеме
+    BATCH_SIZE: int = os.getenv('GATEWAY_BULK_BATCH_SIZE', 500)
+    # предельный размер строки NDJSON / элемента массива: больше в памяти не держим
+    MAX_ITEM_BYTES: int = os.getenv('GATEWAY_BULK_MAX_ITEM_BYTES', 65536)
+    # ошибок проверки в ответе; дальше — только счетчик rejected
+    MAX_ERRORS: int = os.getenv('GATEWAY_BULK_MAX_ERRORS', 100)
+
+class ConfigurationReplies(ConfigurationSection):
+    #########################
+    #   TASK EVENT REPLIES  #
+    #########################
+
+    # correlation_id и reply_to в событиях, чтение ответов worker и статус по correlation_id
+    ENABLED: bool = os.getenv('GATEWAY_REPLIES_ENABLED', True)
+    # итогов в памяти и срок их хранения (сек.)
+    MAX_SIZE: int = os.getenv('GATEWAY_REPLIES_MAX_SIZE', 100000)
+    TTL: float = os.getenv('GATEWAY_REPLIES_TTL', 600.0)
+    # предельное ожидание итога в запросе статуса (wait_ms)
+    MAX_WAIT_MS: int = os.getenv('GATEWAY_REPLIES_MAX_WAIT_MS', 30000)
+
+class ConfigurationTaskStream(ConfigurationSection):
+    #########################
+    #   TASK CHANGES (SSE)  #
+    #########################
+
+    # GET /tasks/stream: один потребитель task_changes на процесс и раздача клиентам
+    ENABLED: bool = os.getenv('GATEWAY_TASK_STREAM_ENABLED', True)
+    # событий в буфере клиента; при переполнении drop_oldest или disconnect
+    BUFFER_SIZE: int = os.getenv('GATEWAY_TASK_STREAM_BUFFER_SIZE', 100)
+    OVERFLOW: str = os.getenv('GATEWAY_TASK_STREAM_OVERFLOW', 'drop_oldest')
+    MAX_CLIENTS: int = os.getenv('GATEWAY_TASK_STREAM_MAX_CLIENTS', 10000)
+    # комментарий-пинг без событий (сек.): держит соединение через прокси
+    HEARTBEAT: float = os.getenv('GATEWAY_TASK_STREAM_HEARTBEAT', 15.0)
+
 class Setting(BaseSettings):
     # ENV
     MODE: str = os.getenv('MODE', 'DEVELOPMENT')
@@ -54,5 +152,20 @@ class Setting(BaseSettings):
 
     # KAFKA
     kafka: ConfigurationKafka = ConfigurationKafka()
+
+    # KAFKA SPOOL
+    spool: ConfigurationSpool = ConfigurationSpool()
+
+    # KAFKA PUBLISH QUEUE
+    publish_queue: ConfigurationPublishQueue = ConfigurationPublishQueue()
+
+    # BULK TASK EVENTS
+    bulk_events: ConfigurationBulkEvents = ConfigurationBulkEvents()
+
+    # TASK EVENT REPLIES
+    replies: ConfigurationReplies = ConfigurationReplies()
+
+    # TASK CHANGES (SSE)
+    task_stream: ConfigurationTaskStream = ConfigurationTaskStream()
     
 settings = Setting()
\ No newline at end of file
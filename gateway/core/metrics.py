@@ -0,0 +1,32 @@
+from typing import Callable, Any
+
+
+class MetricsRegistry:
+    """
+    Метрики процесса: счетчики, текущие значения и коллекторы.
+
+    Коллектор — функция без аргументов, возвращающая словарь метрик компонента
+    (например, статистику кэша); вызывается при каждом снимке.
+    """
+    def __init__(self):
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._collectors: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def set(self, name: str, value: float) -> None:
+        self._gauges[name] = value
+
+    def register(self, name: str, collector: Callable[[], dict[str, Any]]) -> None:
+        self._collectors[name] = collector
+
+    def snapshot(self) -> dict[str, Any]:
+        data: dict[str, Any] = {**self._counters, **self._gauges}
+        for name, collector in self._collectors.items():
+            data[name] = collector()
+        return data
+
+
+metrics = MetricsRegistry()
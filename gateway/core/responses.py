@@ -0,0 +1,11 @@
+from fastapi.responses import Response
+
+
+class RawJSONResponse(Response):
+    """
+    Готовый JSON от внутреннего сервиса.
+
+    Тело уже провалидировано и сериализовано сервисом-источником,
+    поэтому отдается как есть: без json.loads, response_model и повторного dumps.
+    """
+    media_type = 'application/json'
@@ -1,6 +1,7 @@
 import httpx
 from typing import Union, Optional
 from fastapi import status, HTTPException
+from core.responses import RawJSONResponse
 from api_v1.rest.tasks.schemas import (
     TaskCreate,
     TaskUpdate,
@@ -15,6 +16,8 @@ logger = logging.getLogger('httpx')
 
 
 class ExternalServiceFacade:
+    json_headers = {'Content-Type': 'application/json'}
+
     def __init__(self, base_url: str):
         self.base_url = base_url
 
@@ -29,19 +32,22 @@ class ExternalServiceFacade:
                 if method == 'post':
                     response = await client.post(
                         f'{self.base_url}/api/v1/{endpoint}',
-                        json=data.model_dump(),
+                        content=data.model_dump_json(),
+                        headers=self.json_headers,
                         follow_redirects=True
                     )
                 elif method == 'put':
                     response = await client.put(
                         f'{self.base_url}/api/v1/{endpoint}',
-                        json=data.model_dump(),
+                        content=data.model_dump_json(),
+                        headers=self.json_headers,
                         follow_redirects=True
                     )
                 elif method == 'patch':
                     response = await client.patch(
                         f'{self.base_url}/api/v1/{endpoint}',
-                        json=data.model_dump(exclude_unset=True),
+                        content=data.model_dump_json(exclude_unset=True),
+                        headers=self.json_headers,
                         follow_redirects=True
                     )
                 elif method == 'delete':
@@ -59,7 +65,11 @@ class ExternalServiceFacade:
                 if response.status_code == 204:
                     return status.HTTP_204_NO_CONTENT
                 else:
-                    return response.json()
+                    # Ответ сервиса уже сериализован: без разбора и повторного dumps
+                    return RawJSONResponse(
+                        content=response.content,
+                        status_code=response.status_code,
+                    )
             except httpx.HTTPStatusError as e:
                 logger.error('HTTPStatusError', exc_info=e)
                 # Если ответ JSON, возвращаем его как есть
@@ -0,0 +1,99 @@
+from typing import Optional
+from aiokafka.admin import AIOKafkaAdminClient, NewTopic
+from aiokafka.errors import TopicAlreadyExistsError, for_code
+from core.config import settings
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+
+def _admin_client() -> AIOKafkaAdminClient:
+    return AIOKafkaAdminClient(
+        bootstrap_servers=settings.kafka.BOOTSTRAP,
+        client_id=f'{settings.kafka.CLIENT_ID}_admin',
+    )
+
+
+async def describe_partitions(admin: AIOKafkaAdminClient, topics: list[str]) -> dict[str, tuple[int, int]]:
+    """Топик -> (число партиций, фактор репликации) для существующих топиков"""
+    # list_topics не создает топики при KAFKA_AUTO_CREATE_TOPICS_ENABLE, в отличие от запроса метаданных по имени
+    existing = set(await admin.list_topics()) & set(topics)
+    if not existing:
+        return {}
+    result = {}
+    for topic in await admin.describe_topics(list(existing)):
+        partitions = topic['partitions']
+        replication = min((len(p['replicas']) for p in partitions), default=0)
+        result[topic['topic']] = (len(partitions), replication)
+    return result
+
+
+async def ensure_topics(
+    topics: list[str],
+    partitions: int,
+    replication: int,
+) -> dict[str, int]:
+    """
+    Создает отсутствующие топики с заданными числом партиций и фактором
+    репликации, существующие — проверяет. Возвращает число партиций топиков.
+
+    Партиции существующих топиков не добавляются: смена их числа меняет
+    соответствие ключ -> партиция и нарушает порядок событий одного ключа.
+    """
+    admin = _admin_client()
+    await admin.start()
+    try:
+        described = await describe_partitions(admin, topics)
+        missing = [topic for topic in topics if topic not in described]
+        if missing:
+            response = await admin.create_topics([
+                NewTopic(name=topic, num_partitions=partitions, replication_factor=replication)
+                for topic in missing
+            ])
+            for topic, code, *_ in response.topic_errors:
+                # топик мог создать другой сервис одновременно с нами
+                if code and for_code(code) is not TopicAlreadyExistsError:
+                    raise for_code(code)(f'Не удалось создать топик {topic}')
+            logger.info('Созданы топики => %s, партиций: %s, реплик: %s', ', '.join(missing), partitions, replication)
+            described.update(await describe_partitions(admin, missing))
+        for topic, (count, replicas) in described.items():
+            if count < partitions:
+                logger.warning('Топик %s => партиций: %s, настроено: %s; параллелизм потребителей ограничен %s', topic, count, partitions, count)
+            if replicas < replication:
+                logger.warning('Топик %s => фактор репликации: %s, настроено: %s', topic, replicas, replication)
+        return {topic: count for topic, (count, _) in described.items()}
+    finally:
+        await admin.close()
+
+
+async def bootstrap_topics(topics: list[str], consumers: Optional[int] = None) -> dict[str, int]:
+    """
+    Подготовка топиков при запуске (KAFKA_TOPIC_BOOTSTRAP). Ошибка не мешает
+    запуску сервиса: топики создаст брокер (auto create) с числом партиций
+    по умолчанию. consumers — ожидаемое число потребителей группы: если
+    партиций меньше, лишние потребители простаивают.
+    """
+    if not settings.kafka.TOPIC_BOOTSTRAP:
+        return {}
+    try:
+        counts = await ensure_topics(topics, settings.kafka.TOPIC_PARTITIONS, settings.kafka.TOPIC_REPLICATION)
+    except Exception as e:
+        logger.warning('Не удалось подготовить топики %s: %s', ', '.join(topics), e)
+        return {}
+    for topic, count in counts.items():
+        if consumers and count < consumers:
+            logger.warning('Топик %s => партиций: %s меньше числа потребителей: %s; %s из них без партиций', topic, count, consumers, consumers - count)
+    return counts
+
+
+async def get_partition_count(topic: str) -> Optional[int]:
+    admin = _admin_client()
+    await admin.start()
+    try:
+        described = await describe_partitions(admin, [topic])
+    finally:
+        await admin.close()
+    return described[topic][0] if topic in described else None
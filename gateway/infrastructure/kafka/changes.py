@@ -0,0 +1,127 @@
+import asyncio, orjson
+from collections import deque
+from typing import Optional
+from core.config import settings
+from .tail import tail_topic
+
+# поведение при переполнении буфера клиента: вытеснить старые события или отключить клиента
+OVERFLOW_POLICIES = ('drop_oldest', 'disconnect')
+
+
+class TooManySubscribers(Exception):
+    """Достигнут предел подключений к потоку изменений"""
+
+
+def sse_frame(event: str, data: dict, event_id: Optional[str] = None) -> bytes:
+    frame = f'id: {event_id}\n' if event_id else ''
+    return f'{frame}event: {event}\n'.encode() + b'data: ' + orjson.dumps(data) + b'\n\n'
+
+
+class ChangeSubscriber:
+    """
+    Клиент потока изменений: ограниченный буфер готовых кадров SSE.
+    Ожидающий клиент — одна корутина и Event, без отдельного потребителя Kafka.
+    """
+    __slots__ = ('statuses', 'size', 'policy', 'buffer', 'ready', 'closed', 'dropped')
+
+    def __init__(self, size: int, policy: str, statuses: Optional[frozenset[str]]):
+        self.statuses = statuses
+        self.size = size
+        self.policy = policy
+        self.buffer: deque[bytes] = deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+        # вытеснено с последней выдачи: клиенту уходит событие dropped
+        self.dropped = 0
+
+    def wants(self, status: Optional[str]) -> bool:
+        # у удаления задачи статуса нет: его получают все
+        return self.statuses is None or status is None or status in self.statuses
+
+    def offer(self, frame: bytes) -> bool:
+        """Кадр в буфер; False — переполнение"""
+        overflow = len(self.buffer) >= self.size
+        if overflow:
+            if self.policy == 'disconnect':
+                self.closed = True
+                self.ready.set()
+                return False
+            self.buffer.popleft()
+            self.dropped += 1
+        self.buffer.append(frame)
+        self.ready.set()
+        return not overflow
+
+    async def next(self, timeout: float) -> list[bytes]:
+        """Накопленные кадры; пустой список, если за timeout событий не было"""
+        if not self.buffer and not self.closed:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        frames = list(self.buffer)
+        self.buffer.clear()
+        if self.dropped:
+            frames.insert(0, sse_frame('dropped', {'count': self.dropped}))
+            self.dropped = 0
+        return frames
+
+
+class ChangeBroadcaster:
+    """
+    Раздача событий изменений задач подключенным клиентам: событие декодируется
+    и сериализуется в кадр SSE один раз, затем кадр кладется в буферы клиентов,
+    чей фильтр по статусу ему соответствует.
+    """
+    def __init__(self, buffer_size: int, overflow: str, max_subscribers: int):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Неизвестная политика переполнения: {overflow}')
+        self.buffer_size = buffer_size
+        self.overflow = overflow
+        self.max_subscribers = max_subscribers
+        self.subscribers: set[ChangeSubscriber] = set()
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.disconnected = 0
+
+    def subscribe(self, statuses: Optional[list[str]] = None) -> ChangeSubscriber:
+        if len(self.subscribers) >= self.max_subscribers:
+            raise TooManySubscribers(f'Подключений к потоку изменений: {len(self.subscribers)}')
+        subscriber = ChangeSubscriber(self.buffer_size, self.overflow, frozenset(statuses) if statuses else None)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: ChangeSubscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def publish(self, change: dict) -> None:
+        task = change.get('task') or {}
+        frame = sse_frame(change['event'], change, change.get('event_id'))
+        status = task.get('status')
+        self.received += 1
+        for subscriber in self.subscribers:
+            if subscriber.closed or not subscriber.wants(status):
+                continue
+            if subscriber.offer(frame):
+                self.delivered += 1
+            elif subscriber.closed:
+                self.disconnected += 1
+            else:
+                self.delivered += 1
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            'subscribers': len(self.subscribers),
+            'received': self.received,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'disconnected': self.disconnected,
+        }
+
+
+async def consume_changes(broadcaster: ChangeBroadcaster) -> None:
+    """Единственный потребитель топика изменений задач в процессе gateway"""
+    await tail_topic(settings.kafka.CHANGES_TOPIC, 'changes', broadcaster.publish)
@@ -0,0 +1,89 @@
+import orjson, msgpack
+from typing import Iterable, Optional
+
+# заголовки формата сообщения: кодек и версия схемы события
+HEADER_CONTENT_TYPE = 'content-type'
+HEADER_SCHEMA_VERSION = 'x-schema-version'
+# версия схемы событий задач: увеличивается при несовместимых изменениях полей
+TASK_EVENT_SCHEMA_VERSION = 1
+
+
+class UnsupportedSchemaVersion(RuntimeError):
+    """
+    Событие новее, чем умеет читать worker (producer обновлен раньше):
+    ошибка временная — сообщение уходит в повторы и DLQ до обновления worker.
+    """
+
+
+class EventCodec:
+    content_type: str
+
+    def encode(self, event: dict) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> dict:
+        raise NotImplementedError
+
+
+class JsonCodec(EventCodec):
+    """JSON через orjson: тот же формат, что json.dumps, быстрее на обеих сторонах"""
+    content_type = 'application/json'
+
+    def encode(self, event: dict) -> bytes:
+        return orjson.dumps(event)
+
+    def decode(self, data: bytes) -> dict:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(EventCodec):
+    """MessagePack: бинарный формат без имен типов, компактнее JSON"""
+    content_type = 'application/msgpack'
+
+    def encode(self, event: dict) -> bytes:
+        return msgpack.packb(event, use_bin_type=True)
+
+    def decode(self, data: bytes) -> dict:
+        return msgpack.unpackb(data, raw=False)
+
+
+CODECS: dict[str, EventCodec] = {
+    'json': JsonCodec(),
+    'msgpack': MsgpackCodec(),
+}
+DECODERS: dict[str, EventCodec] = {codec.content_type: codec for codec in CODECS.values()}
+
+
+def get_codec(name: str) -> EventCodec:
+    if name not in CODECS:
+        raise ValueError(f'Неизвестный кодек событий: {name}')
+    return CODECS[name]
+
+
+def event_headers(codec: EventCodec, version: int = TASK_EVENT_SCHEMA_VERSION) -> list[tuple[str, bytes]]:
+    return [
+        (HEADER_CONTENT_TYPE, codec.content_type.encode()),
+        (HEADER_SCHEMA_VERSION, str(version).encode()),
+    ]
+
+
+def _header(headers: Optional[Iterable[tuple[str, bytes]]], name: str) -> Optional[str]:
+    for key, value in headers or ():
+        if key == name:
+            return value.decode()
+    return None
+
+
+def decode_event(value: bytes, headers: Optional[Iterable[tuple[str, bytes]]]) -> dict:
+    """
+    Декодирование по заголовкам сообщения: во время выкатки старые и новые
+    producer пишут в один топик. Сообщения без заголовков — JSON версии 1.
+    """
+    content_type = _header(headers, HEADER_CONTENT_TYPE) or JsonCodec.content_type
+    codec = DECODERS.get(content_type)
+    if codec is None:
+        raise ValueError(f'Неизвестный формат события: {content_type}')
+    version = int(_header(headers, HEADER_SCHEMA_VERSION) or 1)
+    if version > TASK_EVENT_SCHEMA_VERSION:
+        raise UnsupportedSchemaVersion(f'Версия схемы события {version} новее поддерживаемой {TASK_EVENT_SCHEMA_VERSION}')
+    return codec.decode(value)
@@ -0,0 +1,43 @@
+import random, importlib
+from typing import Callable, Optional
+from aiokafka.partitioner import DefaultPartitioner
+
+# partitioner(key_bytes, all_partitions, available_partitions) -> партиция (см. AIOKafkaProducer)
+Partitioner = Callable[[Optional[bytes], list[int], list[int]], int]
+
+
+def random_partitioner(key: Optional[bytes], all_partitions: list[int], available: list[int]) -> int:
+    """Ключ не учитывается: равномерное распределение без порядка внутри ключа"""
+    return random.choice(available or all_partitions)
+
+
+PARTITIONERS: dict[str, Partitioner] = {
+    # murmur2 от ключа, как в Java-клиенте: один ключ — одна партиция
+    'default': DefaultPartitioner(),
+    'random': random_partitioner,
+}
+
+
+def load_partitioner(name: str) -> Partitioner:
+    """Встроенный partitioner по имени или свой по пути 'module:attribute'"""
+    if name in PARTITIONERS:
+        return PARTITIONERS[name]
+    module_name, _, attribute = name.partition(':')
+    if not attribute:
+        raise ValueError(f'Неизвестный partitioner: {name}')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def event_key(event: dict, field: str, client_id: Optional[str] = None) -> Optional[bytes]:
+    """
+    Ключ сообщения события задачи.
+
+    task_id — ID будущей задачи (event_id): события одной задачи попадают
+    в одну партицию; client_id — события одного клиента обрабатываются
+    по порядку (без заголовка клиента — как task_id); none — без ключа.
+    """
+    if field == 'none':
+        return None
+    if field == 'client_id' and client_id:
+        return client_id.encode()
+    return event['event_id'].encode()
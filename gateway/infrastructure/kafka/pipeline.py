@@ -0,0 +1,163 @@
+import asyncio, time
+from typing import Callable, Optional
+from .publisher import EventPublisher
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+
+class PublishQueueFull(Exception):
+    """Очередь публикации заполнена: клиенту 429 с Retry-After"""
+    def __init__(self, retry_after: int):
+        super().__init__(f'Очередь публикации заполнена, повторите через {retry_after} с')
+        self.retry_after = retry_after
+
+
+class PublishPipeline:
+    """
+    Ограниченная очередь событий перед Kafka и пул задач-отправителей.
+
+    Обработчик запроса ставит событие в очередь и ждет результата (future),
+    отправители забирают события пачками до batch_size и отправляют их
+    одной пачкой producer. Заполненная очередь не растит задержку, а сразу
+    отказывает (PublishQueueFull) с оценкой, когда очередь освободится.
+    Событие, чей запрос перестал ждать (таймаут), не отправляется.
+
+    События без ожидания (ack_mode=enqueued: клиент уже получил 202) при ошибке
+    отправки или не отправленные к остановке передаются в fallback (spool),
+    а не теряются.
+    """
+    def __init__(
+        self,
+        publisher: EventPublisher,
+        topic: str,
+        queue_size: int,
+        workers: int,
+        batch_size: int,
+        min_retry_after: int = 1,
+        fallback: Optional[Callable[[list[tuple[dict, Optional[bytes]]]], None]] = None,
+    ):
+        self.publisher = publisher
+        self.fallback = fallback
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.min_retry_after = min_retry_after
+        self._tasks: list[asyncio.Task] = []
+        self.published = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spooled = 0
+        self.lost = 0
+        self.batches = 0
+        self.dequeued = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # события в секунду (скользящее среднее) — для Retry-After
+        self._rate = 0.0
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float) -> None:
+        """Дожидается отправки очереди не дольше timeout"""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning('Очередь публикации не отправлена при остановке => %s', self.queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # оставшиеся события без ожидания — в fallback, ожидающие запросы получают ошибку
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+            self.queue.task_done()
+        if items:
+            self._fail(items, ConnectionError('Очередь публикации остановлена'))
+
+    def _fail(self, items: list[tuple], error: Exception) -> None:
+        self.failed += len(items)
+        unwaited = []
+        for event, key, future, _, wait in items:
+            if not wait:
+                unwaited.append((event, key))
+            elif not future.done():
+                future.set_exception(error)
+        if not unwaited:
+            return
+        if self.fallback is not None:
+            try:
+                self.fallback(unwaited)
+                self.spooled += len(unwaited)
+                return
+            except Exception as e:
+                logger.error('События без ожидания не записаны в spool => %s, %s: %s', len(unwaited), type(e).__name__, e)
+        # клиент уже получил 202: событие потеряно
+        self.lost += len(unwaited)
+        logger.error('События без ожидания потеряны => %s', len(unwaited))
+
+    def retry_after(self) -> int:
+        if self._rate <= 0:
+            return self.min_retry_after
+        return max(self.min_retry_after, round(self.queue.qsize() / self._rate))
+
+    def submit(self, event: dict, key: Optional[bytes], wait: bool = True) -> asyncio.Future:
+        """Событие в очередь; future завершится после подтверждения брокером"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((event, key, future, time.monotonic(), wait))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            raise PublishQueueFull(self.retry_after())
+        return future
+
+    async def _run(self) -> None:
+        while True:
+            items = [await self.queue.get()]
+            while len(items) < self.batch_size and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            now = time.monotonic()
+            self.dequeued += len(items)
+            for _, _, _, enqueued_at, _ in items:
+                wait = now - enqueued_at
+                self.wait_seconds_total += wait
+                self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            # запрос уже не ждет (таймаут, событие ушло в spool): не отправляем
+            batch = [item for item in items if not item[2].done()]
+            try:
+                if batch:
+                    await self.publisher.publish_batch(self.topic, [(event, key) for event, key, *_ in batch])
+            except Exception as e:
+                logger.warning('Ошибка отправки пачки событий => %s, %s: %s', len(batch), type(e).__name__, e)
+                self._fail(batch, e)
+            else:
+                self.published += len(batch)
+                self.batches += 1
+                elapsed = time.monotonic() - now
+                if elapsed > 0:
+                    self._rate += 0.2 * (len(items) * self.workers / elapsed - self._rate)
+                for _, _, future, _, _ in batch:
+                    if not future.done():
+                        future.set_result(None)
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            'depth': self.queue.qsize(),
+            'capacity': self.queue.maxsize,
+            'published': self.published,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'spooled': self.spooled,
+            'lost': self.lost,
+            'batches': self.batches,
+            'wait_seconds_avg': self.wait_seconds_total / self.dequeued if self.dequeued else 0.0,
+            'wait_seconds_max': self.wait_seconds_max,
+        }
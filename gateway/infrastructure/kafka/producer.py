@@ -1,9 +1,24 @@
-import asyncio, json
+import asyncio
 from fastapi import FastAPI
-from typing import AsyncGenerator
-from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
+from contextlib import asynccontextmanager, suppress
 from aiokafka import AIOKafkaProducer
 from core.config import settings
+from core.metrics import metrics
+from .admin import bootstrap_topics
+from .partitioning import load_partitioner
+from .codec import get_codec
+from .publisher import EventPublisher, producer_options
+from .spool import EventSpool, spool_record, spooled_event
+from .pipeline import PublishPipeline
+from .replies import OutcomeStore, consume_replies
+from .changes import ChangeBroadcaster, consume_changes
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
 
 
 async def _start_producer_with_retries(producer: AIOKafkaProducer):
@@ -17,22 +32,155 @@ async def _start_producer_with_retries(producer: AIOKafkaProducer):
             await asyncio.sleep(settings.kafka.RETRY_BACKOFF * i)
     raise last_exc
 
-@asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    producer = AIOKafkaProducer(
+def create_producer() -> AIOKafkaProducer:
+    return AIOKafkaProducer(
         bootstrap_servers=settings.kafka.BOOTSTRAP,
         client_id=settings.kafka.CLIENT_ID,
-        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+        partitioner=load_partitioner(settings.kafka.PARTITIONER),
+        **producer_options(settings.kafka.PRODUCER_PROFILE),
     )
+
+async def reconnect_producer(app: FastAPI) -> bool:
+    """Новый producer вместо не запустившегося при старте (брокер был недоступен)"""
+    producer = create_producer()
+    try:
+        await producer.start()
+    except Exception as e:
+        logger.warning('Kafka по-прежнему недоступна: %s', e)
+        with suppress(Exception):
+            await producer.stop()
+        return False
+    app.state.kafka_producer = producer
+    app.state.kafka_publisher.producer = producer
+    app.state.kafka_producer_started = True
+    logger.info('Соединение с Kafka восстановлено')
+    return True
+
+async def drain_spool(app: FastAPI, spool: EventSpool) -> None:
+    """
+    Отправка событий из spool в Kafka по порядку записи. Пока spool не пуст,
+    новые события тоже пишутся в него (kafka_producer_available = False),
+    иначе они обогнали бы накопленные.
+    """
+    while True:
+        if not app.state.kafka_producer_started and not await reconnect_producer(app):
+            await asyncio.sleep(settings.kafka.RETRY_BACKOFF)
+            continue
+        if spool.depth == 0:
+            app.state.kafka_producer_available = True
+            await asyncio.sleep(settings.spool.DRAIN_INTERVAL)
+            continue
+        payloads, cursor = spool.peek(settings.spool.DRAIN_BATCH)
+        try:
+            await app.state.kafka_publisher.publish_batch(
+                settings.kafka.TOPIC, [spooled_event(payload) for payload in payloads],
+            )
+        except Exception as e:
+            # пачка повторится целиком: worker отсекает дубликаты по event_id
+            logger.warning('Ошибка отправки событий из spool => %s: %s', type(e).__name__, e)
+            await asyncio.sleep(settings.kafka.RETRY_BACKOFF)
+            continue
+        spool.commit(cursor, len(payloads))
+        logger.info('События из spool отправлены => %s, осталось: %s', len(payloads), spool.depth)
+
+def spool_fallback(app: FastAPI, spool: EventSpool):
+    """
+    Запись в spool событий, принятых без ожидания (202), чья отправка не удалась
+    (очередь публикации или буфер producer в режиме enqueued).
+    Следующие события тоже идут в spool до его разгрузки, чтобы не обогнать эти.
+    """
+    def fallback(items: list[tuple[dict, Optional[bytes]]]) -> None:
+        app.state.kafka_producer_available = False
+        for event, key in items:
+            spool.append(spool_record(event, key))
+    return fallback
+
+async def flush_spool(spool: EventSpool) -> None:
+    while True:
+        await asyncio.sleep(settings.spool.FSYNC_INTERVAL)
+        spool.flush()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    producer = create_producer()
+    spool: Optional[EventSpool] = None
+    if settings.spool.ENABLED:
+        spool = EventSpool(
+            directory=settings.spool.DIR,
+            segment_bytes=settings.spool.SEGMENT_BYTES,
+            max_bytes=settings.spool.MAX_BYTES,
+            fsync=settings.spool.FSYNC,
+        )
+        metrics.register('kafka_spool', spool.stats)
     # startup
-    await _start_producer_with_retries(producer)
+    await bootstrap_topics([settings.kafka.TOPIC, settings.kafka.REPLY_TOPIC] if settings.replies.ENABLED else [settings.kafka.TOPIC])
+    started = True
+    try:
+        await _start_producer_with_retries(producer)
+    except Exception as e:
+        if spool is None:
+            raise
+        # без брокера gateway принимает события в spool
+        logger.warning('Kafka недоступна при запуске, события пишутся в spool: %s', e)
+        started = False
     app.state.kafka_producer = producer
-    app.state.kafka_producer_available = True
+    app.state.kafka_publisher = EventPublisher(
+        producer,
+        ack_mode=settings.kafka.PRODUCER_ACK_MODE,
+        max_pending=settings.kafka.PRODUCER_MAX_PENDING,
+        codec=get_codec(settings.kafka.EVENT_CODEC),
+        fallback=spool_fallback(app, spool) if spool is not None else None,
+    )
+    app.state.kafka_spool = spool
+    pipeline: Optional[PublishPipeline] = None
+    if settings.publish_queue.ENABLED:
+        pipeline = PublishPipeline(
+            app.state.kafka_publisher,
+            topic=settings.kafka.TOPIC,
+            queue_size=settings.publish_queue.SIZE,
+            workers=settings.publish_queue.WORKERS,
+            batch_size=settings.publish_queue.BATCH_SIZE,
+            min_retry_after=settings.publish_queue.RETRY_AFTER,
+            fallback=spool_fallback(app, spool) if spool is not None else None,
+        )
+        pipeline.start()
+        metrics.register('kafka_publish_queue', pipeline.stats)
+    app.state.kafka_pipeline = pipeline
+    app.state.kafka_producer_started = started
+    app.state.kafka_producer_available = started and (spool is None or spool.depth == 0)
+    tasks = []
+    if spool is not None:
+        tasks.append(asyncio.create_task(drain_spool(app, spool)))
+        if settings.spool.FSYNC == 'interval':
+            tasks.append(asyncio.create_task(flush_spool(spool)))
+    outcomes: Optional[OutcomeStore] = None
+    if settings.replies.ENABLED:
+        outcomes = OutcomeStore(max_size=settings.replies.MAX_SIZE, ttl=settings.replies.TTL)
+        metrics.register('task_replies', outcomes.stats)
+        tasks.append(asyncio.create_task(consume_replies(outcomes)))
+    app.state.task_outcomes = outcomes
+    broadcaster: Optional[ChangeBroadcaster] = None
+    if settings.task_stream.ENABLED:
+        broadcaster = ChangeBroadcaster(
+            buffer_size=settings.task_stream.BUFFER_SIZE,
+            overflow=settings.task_stream.OVERFLOW,
+            max_subscribers=settings.task_stream.MAX_CLIENTS,
+        )
+        metrics.register('task_stream', broadcaster.stats)
+        tasks.append(asyncio.create_task(consume_changes(broadcaster)))
+    app.state.task_changes = broadcaster
     try:
         yield
     finally:
-        # shutdown
+        # shutdown: stop() дожидается отправки событий, принятых в режиме enqueued
+        if pipeline is not None:
+            await pipeline.stop(settings.publish_queue.SHUTDOWN_TIMEOUT)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if spool is not None:
+            spool.close()
         try:
-            await producer.stop()
+            await app.state.kafka_producer.stop()
         except Exception:
-            pass
\ No newline at end of file
+            pass
@@ -0,0 +1,122 @@
+import asyncio
+from functools import partial
+from typing import Callable, Optional
+from aiokafka import AIOKafkaProducer
+from .codec import EventCodec, JsonCodec, event_headers
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+# профили producer: задержка ответа против событий в секунду
+PRODUCER_PROFILES: dict[str, dict] = {
+    # каждое событие — отдельный запрос к брокеру, без сжатия
+    'latency': {
+        'linger_ms': 0,
+        'max_batch_size': 16384,
+        'compression_type': None,
+        'acks': 1,
+        'enable_idempotence': False,
+    },
+    'balanced': {
+        'linger_ms': 5,
+        'max_batch_size': 65536,
+        'compression_type': 'lz4',
+        'acks': 'all',
+        'enable_idempotence': True,
+    },
+    # крупные сжатые пачки; повтор отправки без идемпотентности
+    # может дать дубликат — worker отсекает его по event_id
+    'throughput': {
+        'linger_ms': 20,
+        'max_batch_size': 262144,
+        'compression_type': 'zstd',
+        'acks': 1,
+        'enable_idempotence': False,
+    },
+}
+
+ACK_MODES = ('broker', 'enqueued')
+
+
+def producer_options(profile: str) -> dict:
+    if profile not in PRODUCER_PROFILES:
+        raise ValueError(f'Неизвестный профиль producer: {profile}')
+    return dict(PRODUCER_PROFILES[profile])
+
+
+class EventPublisher:
+    """
+    Отправка событий с выбранным режимом подтверждения.
+
+    broker — ответ после подтверждения брокером (send_and_wait).
+    enqueued — ответ, как только событие добавлено в пачку producer:
+    запрос не ждет сетевого обмена, но ошибка доставки уже не вернется
+    клиенту. Такое событие передается в fallback (spool), без него — только
+    в лог. Число неподтвержденных событий ограничено max_pending: при
+    заполнении буфера запрос ждет, как в режиме broker.
+
+    Событие кодируется codec, формат и версия схемы — в заголовках сообщения.
+    """
+    def __init__(
+        self,
+        producer: AIOKafkaProducer,
+        ack_mode: str,
+        max_pending: int,
+        codec: Optional[EventCodec] = None,
+        fallback: Optional[Callable[[list[tuple[dict, Optional[bytes]]]], None]] = None,
+    ):
+        if ack_mode not in ACK_MODES:
+            raise ValueError(f'Неизвестный режим подтверждения: {ack_mode}')
+        self.producer = producer
+        self.ack_mode = ack_mode
+        self.codec = codec or JsonCodec()
+        self.headers = event_headers(self.codec)
+        self.semaphore = asyncio.Semaphore(max_pending)
+        self.fallback = fallback
+        self.failed = 0
+        self.spooled = 0
+
+    @property
+    def waits_for_broker(self) -> bool:
+        return self.ack_mode == 'broker'
+
+    async def publish(self, topic: str, value: dict, key: Optional[bytes] = None) -> None:
+        event, value = value, self.codec.encode(value)
+        if self.waits_for_broker:
+            await self.producer.send_and_wait(topic, value=value, key=key, headers=self.headers)
+            return
+        await self.semaphore.acquire()
+        try:
+            future = await self.producer.send(topic, value=value, key=key, headers=self.headers)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        future.add_done_callback(partial(self._delivered, event, key))
+
+    async def publish_batch(self, topic: str, items: list[tuple[dict, Optional[bytes]]]) -> None:
+        """Пачка событий (событие, ключ) с ожиданием подтверждения всех, независимо от ack_mode"""
+        futures = [
+            await self.producer.send(topic, value=self.codec.encode(event), key=key, headers=self.headers)
+            for event, key in items
+        ]
+        await asyncio.gather(*futures)
+
+    def _delivered(self, event: dict, key: Optional[bytes], future: asyncio.Future) -> None:
+        self.semaphore.release()
+        if not future.cancelled() and future.exception() is None:
+            return
+        self.failed += 1
+        if future.cancelled():
+            logger.error('Отправка события в Kafka отменена после ответа клиенту')
+        else:
+            logger.error('Событие не доставлено в Kafka после ответа клиенту', exc_info=future.exception())
+        if self.fallback is None:
+            return
+        try:
+            self.fallback([(event, key)])
+            self.spooled += 1
+        except Exception as e:
+            logger.error('Недоставленное событие не записано в spool => %s: %s', type(e).__name__, e)
@@ -0,0 +1,78 @@
+import asyncio, time
+from collections import OrderedDict
+from typing import Optional
+from core.config import settings
+from .tail import tail_topic
+
+
+class OutcomeStore:
+    """
+    Итоги обработки событий по correlation_id из топика ответов worker.
+
+    Хранится не больше max_size итогов не дольше ttl секунд (старые вытесняются).
+    Запросы с ожиданием (long-poll) получают итог сразу по приходу ответа.
+    """
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.outcomes: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.waiters: dict[str, set[asyncio.Future]] = {}
+        self.received = 0
+        self.evicted = 0
+
+    def _evict(self) -> None:
+        deadline = time.monotonic() - self.ttl
+        while self.outcomes:
+            correlation_id, (received_at, _) = next(iter(self.outcomes.items()))
+            if len(self.outcomes) <= self.max_size and received_at >= deadline:
+                break
+            del self.outcomes[correlation_id]
+            self.evicted += 1
+
+    def put(self, outcome: dict) -> None:
+        correlation_id = outcome.get('correlation_id')
+        if not isinstance(correlation_id, str):
+            raise ValueError('Ответ без correlation_id')
+        self.outcomes[correlation_id] = (time.monotonic(), outcome)
+        self.outcomes.move_to_end(correlation_id)
+        self.received += 1
+        self._evict()
+        for future in self.waiters.pop(correlation_id, ()):
+            if not future.done():
+                future.set_result(outcome)
+
+    def get(self, correlation_id: str) -> Optional[dict]:
+        item = self.outcomes.get(correlation_id)
+        if item is None or item[0] < time.monotonic() - self.ttl:
+            return None
+        return item[1]
+
+    async def wait(self, correlation_id: str, timeout: float) -> Optional[dict]:
+        """Итог по correlation_id; если его еще нет — ждет не дольше timeout"""
+        outcome = self.get(correlation_id)
+        if outcome is not None or timeout <= 0:
+            return outcome
+        future = asyncio.get_running_loop().create_future()
+        waiters = self.waiters.setdefault(correlation_id, set())
+        waiters.add(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters.discard(future)
+            if not waiters and self.waiters.get(correlation_id) is waiters:
+                del self.waiters[correlation_id]
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self.outcomes),
+            'received': self.received,
+            'evicted': self.evicted,
+            'waiting': sum(len(waiters) for waiters in self.waiters.values()),
+        }
+
+
+async def consume_replies(store: OutcomeStore) -> None:
+    """Итоги из топика ответов: каждый экземпляр gateway получает все (клиент может спросить любой)"""
+    await tail_topic(settings.kafka.REPLY_TOPIC, 'replies', store.put)
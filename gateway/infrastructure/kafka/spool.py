@@ -0,0 +1,256 @@
+import os, mmap, fcntl, struct, zlib, orjson
+from typing import Optional
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+# заголовок записи: длина и crc32 данных; нулевая длина — конец записанной части сегмента
+RECORD_HEADER = struct.Struct('<II')
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+class SpoolFullError(Exception):
+    """Spool заполнен до MAX_BYTES: событие не принято"""
+
+
+class SpoolLockedError(Exception):
+    """Каталог spool уже открыт другим процессом"""
+
+
+def spool_record(event: dict, key: Optional[bytes]) -> bytes:
+    return orjson.dumps({'key': key.decode() if key is not None else None, 'event': event})
+
+
+def spooled_event(payload: bytes) -> tuple[dict, Optional[bytes]]:
+    record = orjson.loads(payload)
+    return record['event'], record['key'].encode() if record['key'] is not None else None
+
+
+class Segment:
+    """Файл фиксированного размера, отображенный в память; записи только дописываются"""
+    def __init__(self, path: str, index: int, size: int):
+        self.path = path
+        self.index = index
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self.size = os.fstat(fd).st_size
+            self.mm = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        self.write_pos = 0
+        self.records = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        """Восстановление после перезапуска: конец — первая пустая или недописанная запись"""
+        pos = 0
+        while pos + RECORD_HEADER.size <= self.size:
+            length, crc = RECORD_HEADER.unpack_from(self.mm, pos)
+            end = pos + RECORD_HEADER.size + length
+            if length == 0 or end > self.size:
+                break
+            if zlib.crc32(self.mm[pos + RECORD_HEADER.size:end]) != crc:
+                logger.warning('Spool: недописанная запись => сегмент: %s, позиция: %s', self.index, pos)
+                break
+            pos = end
+            self.records += 1
+        self.write_pos = pos
+
+    def fits(self, length: int) -> bool:
+        return self.write_pos + RECORD_HEADER.size + length <= self.size
+
+    def append(self, payload: bytes) -> None:
+        start = self.write_pos + RECORD_HEADER.size
+        # сначала данные, затем заголовок: запись без верного crc при восстановлении отбрасывается
+        self.mm[start:start + len(payload)] = payload
+        RECORD_HEADER.pack_into(self.mm, self.write_pos, len(payload), zlib.crc32(payload))
+        self.write_pos = start + len(payload)
+        self.records += 1
+
+    def read(self, pos: int) -> tuple[Optional[bytes], int]:
+        """Запись с позиции pos и позиция следующей; (None, pos) в конце записанной части"""
+        if pos + RECORD_HEADER.size > self.write_pos:
+            return None, pos
+        length, _ = RECORD_HEADER.unpack_from(self.mm, pos)
+        start = pos + RECORD_HEADER.size
+        return bytes(self.mm[start:start + length]), start + length
+
+    def flush(self) -> None:
+        self.mm.flush()
+
+    def close(self) -> None:
+        self.mm.close()
+
+
+class EventSpool:
+    """
+    Локальный журнал событий на диске на время недоступности Kafka.
+
+    Сегменты по segment_bytes отображаются в память (mmap) и только дописываются;
+    позиция чтения (сегмент, смещение) хранится в файле checkpoint и обновляется
+    после подтверждения брокером, полностью прочитанные сегменты удаляются.
+    Общий размер сегментов ограничен max_bytes. fsync:
+    always — после каждой записи, interval — из фоновой задачи (flush),
+    never — на усмотрение ОС (переживает падение процесса, но не ОС).
+
+    Каталог принадлежит одному процессу: при открытии берется эксклюзивная
+    блокировка (flock), второй процесс на том же каталоге (uvicorn --workers,
+    реплика на общем томе) получает SpoolLockedError, а не затирает сегменты.
+    """
+    def __init__(self, directory: str, segment_bytes: int, max_bytes: int, fsync: str):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f'Неизвестная политика fsync: {fsync}')
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = self._lock(directory)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.segments: list[Segment] = [
+            Segment(os.path.join(directory, name), int(name.split('.')[0]), segment_bytes)
+            for name in sorted(os.listdir(directory)) if name.endswith('.seg')
+        ]
+        self.read_index, self.read_pos = self._load_checkpoint()
+        self.depth = self._count_pending()
+        self.appended = 0
+        self.drained = 0
+        self.rejected = 0
+        self._dirty = False
+        if self.depth:
+            logger.warning('Spool: неотправленные события после перезапуска => %s', self.depth)
+
+    @staticmethod
+    def _lock(directory: str) -> int:
+        fd = os.open(os.path.join(directory, 'lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise SpoolLockedError(f'Каталог spool {directory} используется другим процессом')
+        return fd
+
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self.directory, 'checkpoint')
+
+    def _load_checkpoint(self) -> tuple[int, int]:
+        try:
+            with open(self._checkpoint_path()) as file:
+                index, pos = file.read().split()
+                return int(index), int(pos)
+        except (FileNotFoundError, ValueError):
+            return (self.segments[0].index if self.segments else 0), 0
+
+    def _save_checkpoint(self) -> None:
+        path = self._checkpoint_path()
+        with open(path + '.tmp', 'w') as file:
+            file.write(f'{self.read_index} {self.read_pos}')
+            if self.fsync != 'never':
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(path + '.tmp', path)
+
+    def _count_pending(self) -> int:
+        count = 0
+        for segment in self.segments:
+            if segment.index < self.read_index:
+                continue
+            pos = self.read_pos if segment.index == self.read_index else 0
+            while True:
+                payload, pos = segment.read(pos)
+                if payload is None:
+                    break
+                count += 1
+        return count
+
+    @property
+    def pending_bytes(self) -> int:
+        total = 0
+        for segment in self.segments:
+            if segment.index >= self.read_index:
+                total += segment.write_pos - (self.read_pos if segment.index == self.read_index else 0)
+        return total
+
+    def append(self, payload: bytes) -> None:
+        if RECORD_HEADER.size + len(payload) > self.segment_bytes:
+            raise ValueError('Событие больше сегмента spool')
+        if not self.segments or not self.segments[-1].fits(len(payload)):
+            if (len(self.segments) + 1) * self.segment_bytes > self.max_bytes:
+                self.rejected += 1
+                raise SpoolFullError(f'Spool заполнен: {len(self.segments)} сегментов по {self.segment_bytes} Б')
+            if self.segments:
+                # заполненный сегмент больше не меняется: сбрасываем его на диск сразу
+                self.segments[-1].flush()
+            index = self.segments[-1].index + 1 if self.segments else self.read_index
+            self.segments.append(Segment(os.path.join(self.directory, f'{index:012d}.seg'), index, self.segment_bytes))
+        self.segments[-1].append(payload)
+        self.depth += 1
+        self.appended += 1
+        if self.fsync == 'always':
+            self.segments[-1].flush()
+        else:
+            self._dirty = True
+
+    def peek(self, max_records: int) -> tuple[list[bytes], tuple[int, int]]:
+        """Следующие записи по порядку и позиция после них (для commit)"""
+        records: list[bytes] = []
+        index, pos = self.read_index, self.read_pos
+        for segment in self.segments:
+            if segment.index < index:
+                continue
+            if segment.index > index:
+                index, pos = segment.index, 0
+            while len(records) < max_records:
+                payload, next_pos = segment.read(pos)
+                if payload is None:
+                    break
+                records.append(payload)
+                pos = next_pos
+            if len(records) >= max_records:
+                break
+        return records, (index, pos)
+
+    def commit(self, cursor: tuple[int, int], count: int) -> None:
+        """Записи до cursor подтверждены брокером: сдвигаем позицию чтения"""
+        self.read_index, self.read_pos = cursor
+        self.depth -= count
+        self.drained += count
+        # прочитанные сегменты, кроме текущего для записи, больше не нужны
+        while len(self.segments) > 1 and self.segments[0].index < self.read_index:
+            segment = self.segments.pop(0)
+            segment.close()
+            os.remove(segment.path)
+        if self.depth == 0 and len(self.segments) == 1 and self.segments[0].index == self.read_index:
+            # spool пуст: последний сегмент переиспользуется с начала
+            segment = self.segments.pop()
+            segment.close()
+            os.remove(segment.path)
+            self.read_index, self.read_pos = segment.index + 1, 0
+        self._save_checkpoint()
+
+    def flush(self) -> None:
+        """fsync для политики interval"""
+        if self._dirty and self.segments:
+            self.segments[-1].flush()
+            self._dirty = False
+
+    def close(self) -> None:
+        self.flush()
+        for segment in self.segments:
+            segment.close()
+        # блокировка снимается и при завершении процесса
+        os.close(self._lock_fd)
+
+    def stats(self) -> dict:
+        return {
+            'depth': self.depth,
+            'pending_bytes': self.pending_bytes,
+            'segments': len(self.segments),
+            'appended': self.appended,
+            'drained': self.drained,
+            'rejected': self.rejected,
+        }
@@ -0,0 +1,43 @@
+import asyncio
+from contextlib import suppress
+from typing import Callable
+from aiokafka import AIOKafkaConsumer
+from core.config import settings
+from .codec import decode_event
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+
+async def tail_topic(topic: str, client_suffix: str, handle: Callable[[dict], None]) -> None:
+    """
+    Чтение новых сообщений топика всеми партициями без группы потребителей:
+    каждый процесс gateway получает все сообщения. Один потребитель на процесс,
+    handle вызывается для каждого декодированного события.
+    При недоступности Kafka — переподключение.
+    """
+    while True:
+        consumer = AIOKafkaConsumer(
+            topic,
+            bootstrap_servers=settings.kafka.BOOTSTRAP,
+            client_id=f'{settings.kafka.CLIENT_ID}_{client_suffix}',
+            group_id=None,
+            enable_auto_commit=False,
+            auto_offset_reset='latest',
+        )
+        try:
+            await consumer.start()
+            async for msg in consumer:
+                try:
+                    handle(decode_event(msg.value, msg.headers))
+                except Exception as e:
+                    logger.warning('Невалидное сообщение => топик: %s, партиция: %s, offset: %s, %s: %s', topic, msg.partition, msg.offset, type(e).__name__, e)
+        except Exception as e:
+            logger.warning('Ошибка чтения топика %s: %s', topic, e)
+        finally:
+            with suppress(Exception):
+                await consumer.stop()
+        await asyncio.sleep(settings.kafka.RETRY_BACKOFF)
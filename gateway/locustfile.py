@@ -1,6 +1,12 @@
-from locust import FastHttpUser, task, between
+import os
+from locust import FastHttpUser, task, between, constant, events, tag
 # from core.config import settings
 
+# замер событий/с профиля producer, с которым запущен gateway (KAFKA_PRODUCER_PROFILE):
+# LOCUST_PRODUCER_PROFILE=throughput locust -f locustfile.py CreateTaskEventUser --headless -u 200 -r 50 -t 60s
+PRODUCER_PROFILE = os.getenv('LOCUST_PRODUCER_PROFILE')
+EVENT_REQUEST_NAME = f'/api/v1/task/create_event [{PRODUCER_PROFILE}]'
+
 class UserBehavior(FastHttpUser):
     wait_time = between(1, 2)
 
@@ -39,12 +45,30 @@ class UserBehavior(FastHttpUser):
 #     def get_tasks(self):
 #         self.client.get('/api/v1/tasks/')
 
-# class CreateTaskEventUser(FastHttpUser):
-#     wait_time = between(1, 2)
+if PRODUCER_PROFILE:
+    # без профиля сценарий не создается: обычный прогон остается смешанным
+    class CreateTaskEventUser(FastHttpUser):
+        """Только публикация событий без пауз: предельные события/с профиля producer"""
+        wait_time = constant(0)
 
-#     @task
-#     def create_task_event(self):
-#         self.client.post('/api/v1/task/create_event', json={
-#             'title': 'Create Task',
-#             'description': None,
-#         })
\ No newline at end of file
+        @tag('events')
+        @task
+        def create_task_event(self):
+            self.client.post('/api/v1/task/create_event', name=EVENT_REQUEST_NAME, json={
+                'title': 'Create Task',
+                'description': None,
+            })
+
+    @events.quitting.add_listener
+    def report_events_per_second(environment, **kwargs):
+        entry = environment.stats.entries.get((EVENT_REQUEST_NAME, 'POST'))
+        if entry is None or not entry.num_requests:
+            return
+        accepted = entry.num_requests - entry.num_failures
+        print(
+            f'producer profile={PRODUCER_PROFILE}: '
+            f'{accepted / max(entry.last_request_timestamp - entry.start_time, 1e-9):.0f} events/s, '
+            f'p50={entry.get_response_time_percentile(0.5)} ms, '
+            f'p99={entry.get_response_time_percentile(0.99)} ms, '
+            f'failures={entry.num_failures}'
+        )
\ No newline at end of file
@@ -1,6 +1,7 @@
 import uvicorn, strawberry
 from strawberry.fastapi import GraphQLRouter
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
@@ -20,6 +21,7 @@ app = FastAPI(
     description='API Gateway for microservices',
     version='1.0.0',
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     # docs_url=None,
     # redoc_url=None,
     # openapi_url=None,
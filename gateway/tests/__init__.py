@@ -0,0 +1,9 @@
+"""
+Тесты для FastAPI шлюза (gateway).
+
+Структура тестов:
+- tests/
+  - unit/               - юнит-тесты
+  - conftest.py         - фикстуры для тестов
+"""
+__version__ = '0.1.0'
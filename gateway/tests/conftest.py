@@ -0,0 +1,9 @@
+import pytest
+from core.config import settings
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    if settings.MODE != 'TEST':
+        for item in items:
+            item.add_marker(pytest.mark.skip(reason=f'В режиме {settings.MODE}, тесты недоступны!'))
@@ -0,0 +1,143 @@
+import json, pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from core.config import settings
+from api_v1.rest.tasks.views import router_worker
+from api_v1.rest.tasks.dependencies import get_publisher, get_spool, get_pipeline
+from infrastructure.kafka.pipeline import PublishPipeline
+
+NDJSON = {'Content-Type': 'application/x-ndjson'}
+
+
+class FakePublisher:
+    """Публикатор, запоминающий отправленные пачки"""
+    def __init__(self):
+        self.batches: list[list[tuple[dict, bytes]]] = []
+
+    async def publish_batch(self, topic: str, items: list[tuple[dict, bytes]]) -> None:
+        self.batches.append(list(items))
+
+    @property
+    def events(self) -> list[dict]:
+        return [event for batch in self.batches for event, _ in batch]
+
+
+@pytest.fixture
+def publisher() -> FakePublisher:
+    return FakePublisher()
+
+
+@pytest.fixture
+def pipeline() -> PublishPipeline | None:
+    return None
+
+
+@pytest.fixture
+async def client(publisher, pipeline):
+    app = FastAPI()
+    app.include_router(router_worker, prefix='/task')
+    app.state.kafka_producer_available = True
+    app.dependency_overrides[get_publisher] = lambda: publisher
+    app.dependency_overrides[get_spool] = lambda: None
+    app.dependency_overrides[get_pipeline] = lambda: pipeline
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        yield client
+
+
+def ndjson(*items) -> bytes:
+    return b'\n'.join(json.dumps(item).encode() if not isinstance(item, bytes) else item for item in items) + b'\n'
+
+
+class TestCreateEvents:
+    """Тесты для POST /task/create_events"""
+
+    async def test_summary_counts_accepted_and_rejected(self, client, publisher, monkeypatch):
+        monkeypatch.setattr(settings.bulk_events, 'MAX_ERRORS', 2)
+        monkeypatch.setattr(settings.bulk_events, 'BATCH_SIZE', 2)
+        body = ndjson(
+            {'title': 'first'},
+            {'title': ''},
+            b'',
+            {'title': 'second', 'description': 'd'},
+            {'description': 'no title'},
+            b'not json',
+            {'title': 'third'},
+        )
+        response = await client.post(
+            '/task/create_events', content=body, headers={**NDJSON, 'X-Correlation-Id': 'batch-1'},
+        )
+
+        assert response.status_code == 200
+        summary = response.json()
+        assert summary['correlation_id'] == 'batch-1'
+        assert summary['accepted'] == 3
+        assert summary['spooled'] == 0
+        assert summary['rejected'] == 3
+        # строки нумеруются с пустыми, ошибок в ответе не больше MAX_ERRORS
+        assert [error['line'] for error in summary['errors']] == [2, 5]
+        assert summary['errors_truncated'] is True
+        assert [len(batch) for batch in publisher.batches] == [2, 1]
+        assert [event['correlation_id'] for event in publisher.events] == ['batch-1:1', 'batch-1:4', 'batch-1:7']
+        assert [event['task']['title'] for event in publisher.events] == ['first', 'second', 'third']
+
+    async def test_json_array(self, client, publisher):
+        body = json.dumps([{'title': 'a'}, {'title': 'b'}]).encode()
+        response = await client.post('/task/create_events', content=body, headers={'Content-Type': 'application/json'})
+
+        assert response.status_code == 200
+        summary = response.json()
+        assert summary['accepted'] == 2
+        assert summary['errors_truncated'] is False
+        assert [event['correlation_id'] for event in publisher.events] == [
+            f'{summary["correlation_id"]}:1', f'{summary["correlation_id"]}:2',
+        ]
+
+    async def test_format_error_reports_sent_lines(self, client, publisher):
+        response = await client.post(
+            '/task/create_events', content=b'[{"title": "a"},, {"title": "b"}]',
+            headers={'Content-Type': 'application/json'},
+        )
+
+        assert response.status_code == 400
+        detail = response.json()['detail']
+        assert 'Пропущен элемент 2' in detail['error']
+        # элементы до ошибки формата уже отправлены
+        assert detail['accepted'] == 1
+        assert [event['task']['title'] for event in publisher.events] == ['a']
+
+
+class TestCreateEventsPipeline:
+    """POST /task/create_events через очередь публикации"""
+
+    @pytest.fixture
+    async def pipeline(self, publisher):
+        pipeline = PublishPipeline(publisher, topic=settings.kafka.TOPIC, queue_size=2, workers=1, batch_size=10)
+        yield pipeline
+        await pipeline.stop(1)
+
+    async def test_batches_go_through_queue(self, client, publisher, pipeline, monkeypatch):
+        monkeypatch.setattr(settings.bulk_events, 'BATCH_SIZE', 2)
+        pipeline.start()
+        response = await client.post(
+            '/task/create_events', content=ndjson(*({'title': str(i)} for i in range(5))), headers=NDJSON,
+        )
+
+        assert response.status_code == 200
+        assert response.json()['accepted'] == 5
+        assert pipeline.stats()['published'] == 5
+        assert [event['task']['title'] for event in publisher.events] == ['0', '1', '2', '3', '4']
+
+    async def test_full_queue_rejects_batch_with_retry_after(self, client, publisher, pipeline, monkeypatch):
+        monkeypatch.setattr(settings.bulk_events, 'BATCH_SIZE', 3)
+        # отправители не запущены: третье событие пачки не помещается в очередь
+        response = await client.post(
+            '/task/create_events', content=ndjson(*({'title': str(i)} for i in range(3))), headers=NDJSON,
+        )
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        assert response.json()['detail']['accepted'] == 0
+        # поставленные события пачки отменены и не будут отправлены
+        pipeline.start()
+        await pipeline.stop(1)
+        assert publisher.events == []
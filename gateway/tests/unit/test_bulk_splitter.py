@@ -0,0 +1,127 @@
+import json, pytest
+from infrastructure.kafka.codec import JsonCodec
+from api_v1.rest.tasks.bulk import BulkFormatError, JsonArraySplitter, NdjsonSplitter
+
+MAX_ITEM_BYTES = 1024
+
+
+def split(splitter, body: bytes, chunk_size: int) -> list[tuple[int, bytes]]:
+    items = []
+    for start in range(0, len(body), chunk_size):
+        items += splitter.feed(body[start:start + chunk_size])
+    return items + splitter.close()
+
+
+def split_array(body: bytes, chunk_size: int) -> list[tuple[int, bytes]]:
+    return split(JsonArraySplitter(MAX_ITEM_BYTES), body, chunk_size)
+
+
+def split_ndjson(body: bytes, chunk_size: int) -> list[tuple[int, bytes]]:
+    return split(NdjsonSplitter(MAX_ITEM_BYTES), body, chunk_size)
+
+
+class TestJsonArraySplitter:
+    """Тесты для JsonArraySplitter"""
+
+    ELEMENTS = [
+        {'title': 'a, b ] } [ {', 'description': 'quote \\" and \\\\ backslash'},
+        {'title': 'nested', 'tags': [[1, 2], {'x': [3, {'y': ']'}]}]},
+        'plain "string" with \\u0022',
+        [1, [2, [3]]],
+        42,
+        -1.5e3,
+        True,
+        None,
+    ]
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 4096])
+    def test_elements_across_chunk_boundaries(self, chunk_size):
+        body = json.dumps(self.ELEMENTS, indent=1).encode()
+        items = split_array(body, chunk_size)
+        assert [number for number, _ in items] == list(range(1, len(self.ELEMENTS) + 1))
+        assert [json.loads(raw) for _, raw in items] == self.ELEMENTS
+
+    @pytest.mark.parametrize('chunk_size', [1, 3])
+    def test_escaped_quote_at_chunk_end(self, chunk_size):
+        body = b'["a\\\\", "b\\"c"]'
+        assert [json.loads(raw) for _, raw in split_array(body, chunk_size)] == ['a\\', 'b"c']
+
+    @pytest.mark.parametrize('body', [b'[]', b'  [ \n ]  '])
+    def test_empty_array(self, body):
+        assert split_array(body, 1) == []
+
+    @pytest.mark.parametrize('body', [b'[1,,2]', b'[,1]', b'[1,]'])
+    def test_missing_element(self, body):
+        with pytest.raises(BulkFormatError, match='Пропущен элемент'):
+            split_array(body, 1)
+
+    def test_trailing_data(self):
+        with pytest.raises(BulkFormatError, match='после конца'):
+            split_array(b'[1] [2]', 2)
+
+    def test_missing_separator(self):
+        with pytest.raises(BulkFormatError, match='после элемента 1'):
+            split_array(b'[{"a": 1} {"b": 2}]', 4)
+
+    def test_not_an_array(self):
+        with pytest.raises(BulkFormatError, match='JSON-массив'):
+            split_array(b'{"title": "x"}', 4)
+
+    def test_unterminated_array(self):
+        with pytest.raises(BulkFormatError, match='не завершен'):
+            split_array(b'[{"title": "x"}', 4)
+
+    def test_oversized_element(self):
+        splitter = JsonArraySplitter(max_item_bytes=16)
+        with pytest.raises(BulkFormatError, match='Элемент 2 длиннее 16'):
+            split(splitter, b'[1, "' + b'x' * 64 + b'"]', 8)
+
+    def test_buffer_keeps_only_current_element(self):
+        splitter = JsonArraySplitter(max_item_bytes=64)
+        body = b'[' + b','.join(JsonCodec().encode({'n': i}) for i in range(1000)) + b']'
+        for start in range(0, len(body), 50):
+            splitter.feed(body[start:start + 50])
+            assert len(splitter.buffer) <= 64
+
+
+class TestNdjsonSplitter:
+    """Тесты для NdjsonSplitter"""
+
+    @pytest.mark.parametrize('chunk_size', [1, 5, 4096])
+    def test_lines_across_chunk_boundaries(self, chunk_size):
+        body = b'{"n": 1}\n\n{"n": 2}\r\n   \n{"n": 3}'
+        items = split_ndjson(body, chunk_size)
+        # пустые строки пропускаются, но номера строк сохраняются
+        assert [number for number, _ in items] == [1, 3, 5]
+        assert [json.loads(raw) for _, raw in items] == [{'n': 1}, {'n': 2}, {'n': 3}]
+
+    @pytest.mark.parametrize('body', [b'{"n": 1}\n', b'{"n": 1}\n\n', b'{"n": 1}\n  \n'])
+    def test_blank_last_line(self, body):
+        assert split_ndjson(body, 3) == [(1, b'{"n": 1}')]
+
+    def test_oversized_line(self):
+        splitter = NdjsonSplitter(max_item_bytes=16)
+        with pytest.raises(BulkFormatError, match='Строка 2 длиннее 16'):
+            split(splitter, b'{"n": 1}\n' + b'x' * 64 + b'\n', 8)
+
+    def test_line_at_limit_is_accepted(self):
+        line = b'"' + b'x' * 14 + b'"'
+        assert split(NdjsonSplitter(max_item_bytes=16), line + b'\n', 4) == [(1, line)]
+
+
+class TestSplitterErrors:
+    """Элементы до ошибки формата в той же части тела не теряются"""
+
+    def test_array_items_before_error_are_returned(self):
+        splitter = JsonArraySplitter(MAX_ITEM_BYTES)
+        assert splitter.feed(b'[{"title": "a"},, {"title": "b"}]') == [(1, b'{"title": "a"}')]
+        with pytest.raises(BulkFormatError, match='Пропущен элемент 2'):
+            splitter.feed(b'')
+        with pytest.raises(BulkFormatError):
+            splitter.close()
+
+    def test_ndjson_lines_before_oversized_line_are_returned(self):
+        splitter = NdjsonSplitter(max_item_bytes=16)
+        assert splitter.feed(b'{"n": 1}\n' + b'x' * 64) == [(1, b'{"n": 1}')]
+        with pytest.raises(BulkFormatError, match='Строка 2 длиннее 16'):
+            splitter.close()
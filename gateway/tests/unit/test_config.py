@@ -0,0 +1,38 @@
+import importlib.util
+import core.config
+
+
+def load_config(monkeypatch, **env):
+    """Свежая копия core.config с заданным окружением (общий settings не меняется)"""
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    spec = importlib.util.spec_from_file_location('config_under_test', core.config.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.settings
+
+
+class TestSettings:
+    """Тесты для приведения переменных окружения к типам настроек"""
+
+    def test_env_values_are_parsed(self, monkeypatch):
+        settings = load_config(
+            monkeypatch,
+            GATEWAY_SPOOL_ENABLED='false',
+            GATEWAY_PUBLISH_QUEUE_ENABLED='off',
+            GATEWAY_PUBLISH_WORKERS='8',
+            GATEWAY_SPOOL_PUBLISH_TIMEOUT='0.5',
+            KAFKA_TOPIC_BOOTSTRAP='false',
+        )
+        assert settings.spool.ENABLED is False
+        assert settings.publish_queue.ENABLED is False
+        assert settings.publish_queue.WORKERS == 8
+        assert isinstance(settings.publish_queue.WORKERS, int)
+        assert settings.spool.PUBLISH_TIMEOUT == 0.5
+        assert settings.kafka.TOPIC_BOOTSTRAP is False
+
+    def test_defaults_keep_types(self, monkeypatch):
+        monkeypatch.delenv('GATEWAY_SPOOL_ENABLED', raising=False)
+        settings = load_config(monkeypatch)
+        assert settings.spool.ENABLED is True
+        assert settings.spool.SEGMENT_BYTES == 16 * 1024 * 1024
@@ -0,0 +1,45 @@
+import asyncio
+from infrastructure.kafka.publisher import EventPublisher
+
+
+class FakeProducer:
+    """Producer, чьи отправки завершает тест"""
+    def __init__(self):
+        self.futures: list[asyncio.Future] = []
+
+    async def send(self, topic, value=None, key=None, headers=None):
+        future = asyncio.get_running_loop().create_future()
+        self.futures.append(future)
+        return future
+
+
+class TestEventPublisher:
+    """Тесты для EventPublisher в режиме enqueued"""
+
+    async def test_failed_delivery_goes_to_fallback(self):
+        producer = FakeProducer()
+        spooled: list[tuple[dict, bytes]] = []
+        publisher = EventPublisher(producer, ack_mode='enqueued', max_pending=10, fallback=spooled.extend)
+        await publisher.publish('task_events', {'event_id': '1'}, b'k1')
+        await publisher.publish('task_events', {'event_id': '2'}, b'k2')
+
+        producer.futures[0].set_result(None)
+        producer.futures[1].set_exception(ConnectionError('broker unavailable'))
+        await asyncio.sleep(0)
+
+        assert spooled == [({'event_id': '2'}, b'k2')]
+        assert publisher.failed == 1
+        assert publisher.spooled == 1
+        # место в буфере неподтвержденных освобождается в обоих случаях
+        assert publisher.semaphore._value == 10
+
+    async def test_failed_delivery_without_fallback_is_counted(self):
+        producer = FakeProducer()
+        publisher = EventPublisher(producer, ack_mode='enqueued', max_pending=1)
+        await publisher.publish('task_events', {'event_id': '1'})
+
+        producer.futures[0].cancel()
+        await asyncio.sleep(0)
+
+        assert publisher.failed == 1
+        assert publisher.spooled == 0
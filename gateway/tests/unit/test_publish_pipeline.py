@@ -0,0 +1,97 @@
+import asyncio, pytest
+from infrastructure.kafka.pipeline import PublishPipeline, PublishQueueFull
+
+TOPIC = 'tasks'
+
+
+class FakePublisher:
+    """Публикатор, запоминающий отправленные пачки"""
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches: list[list[tuple[dict, bytes]]] = []
+
+    async def publish_batch(self, topic: str, items: list[tuple[dict, bytes]]) -> None:
+        if self.fail:
+            raise ConnectionError('broker unavailable')
+        self.batches.append(items)
+
+    @property
+    def events(self) -> list[dict]:
+        return [event for batch in self.batches for event, _ in batch]
+
+
+def make_pipeline(publisher: FakePublisher, queue_size: int = 10, **kwargs) -> PublishPipeline:
+    return PublishPipeline(publisher, topic=TOPIC, queue_size=queue_size, workers=1, batch_size=5, **kwargs)
+
+
+class TestPublishPipeline:
+    """Тесты для PublishPipeline"""
+
+    async def test_full_queue_rejects_with_retry_after(self):
+        pipeline = make_pipeline(FakePublisher(), queue_size=4, min_retry_after=1)
+        for i in range(4):
+            pipeline.submit({'n': i}, None, wait=False)
+        # без наблюдаемой скорости — минимальная оценка
+        with pytest.raises(PublishQueueFull) as exc:
+            pipeline.submit({'n': 4}, None)
+        assert exc.value.retry_after == 1
+
+        pipeline._rate = 2.0
+        with pytest.raises(PublishQueueFull) as exc:
+            pipeline.submit({'n': 5}, None)
+        assert exc.value.retry_after == 2
+        assert pipeline.stats()['dropped'] == 2
+
+    async def test_cancelled_future_is_not_published(self):
+        publisher = FakePublisher()
+        pipeline = make_pipeline(publisher)
+        abandoned = pipeline.submit({'n': 1}, None)
+        awaited = pipeline.submit({'n': 2}, None)
+        abandoned.cancel()
+
+        pipeline.start()
+        await asyncio.wait_for(awaited, 1)
+        await pipeline.stop(1)
+
+        assert publisher.events == [{'n': 2}]
+
+    async def test_stop_drains_queue(self):
+        publisher = FakePublisher()
+        pipeline = make_pipeline(publisher)
+        for i in range(8):
+            pipeline.submit({'n': i}, None, wait=False)
+
+        pipeline.start()
+        await pipeline.stop(1)
+
+        assert publisher.events == [{'n': i} for i in range(8)]
+        assert pipeline.stats()['depth'] == 0
+
+    async def test_failed_unwaited_events_go_to_fallback(self):
+        spooled: list[tuple[dict, bytes]] = []
+        pipeline = make_pipeline(FakePublisher(fail=True), fallback=spooled.extend)
+        accepted = pipeline.submit({'n': 1}, b'k1', wait=False)
+        awaited = pipeline.submit({'n': 2}, b'k2')
+
+        pipeline.start()
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(awaited, 1)
+        await pipeline.stop(1)
+
+        # ожидающий запрос получает ошибку сам, событие 202 уходит в spool
+        assert spooled == [({'n': 1}, b'k1')]
+        assert not accepted.done()
+        stats = pipeline.stats()
+        assert stats['spooled'] == 1
+        assert stats['lost'] == 0
+
+    async def test_unsent_events_go_to_fallback_on_stop(self):
+        spooled: list[tuple[dict, bytes]] = []
+        pipeline = make_pipeline(FakePublisher(), fallback=spooled.extend)
+        pipeline.submit({'n': 1}, None, wait=False)
+
+        # отправители не запущены: очередь не разгрузится до таймаута
+        await pipeline.stop(0.01)
+
+        assert spooled == [({'n': 1}, None)]
+        assert pipeline.stats()['depth'] == 0
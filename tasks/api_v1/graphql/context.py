@@ -1,34 +1,48 @@
-from typing import AsyncIterator
+from typing import AsyncIterator, Optional
 from contextlib import asynccontextmanager
-from fastapi import Request
+from fastapi import Request, WebSocket
 from strawberry.fastapi import BaseContext
 from infrastructure.database.uow import UnitOfWork, unit_of_work
 from api_v1.service.task import TaskService
+from .loaders import create_task_loader, create_task_entity_loader
 
 
 class GraphQLContext(BaseContext):
     def __init__(
         self,
-        request: Request,
+        request: Optional[Request],
         uow: UnitOfWork,
         task_service: TaskService,
+        websocket: Optional[WebSocket] = None,
     ):
         self.request = request
+        self.websocket = websocket
         self.uow = uow
         self.task_service = task_service
+        # загрузчики живут один запрос: кэш не переживает изменения в других запросах
+        self.task_loader = create_task_loader(task_service)
+        self.task_entity_loader = create_task_entity_loader(task_service)
 
 @asynccontextmanager
-async def get_context(request: Request) -> AsyncIterator[GraphQLContext]:
-    """Контекст для GraphQL запросов, использующий существующий Unit of Work"""
+async def get_context(
+    request: Optional[Request] = None,
+    websocket: Optional[WebSocket] = None,
+) -> AsyncIterator[GraphQLContext]:
+    """
+    Контекст для GraphQL запросов, использующий существующий Unit of Work.
+    Для подписок (graphql-ws) request нет, есть websocket; сессия БД
+    берет соединение из пула только при первом запросе.
+    """
     async with unit_of_work() as uow:
         task_service = TaskService(uow)
         yield GraphQLContext(
             request=request,
             uow=uow,
             task_service=task_service,
+            websocket=websocket,
         )
 
 # Сохранение межзапросного контекста для GraphQL
-async def get_context_wrapper(request: Request):
-    async with get_context(request) as ctx:
+async def get_context_wrapper(request: Request = None, websocket: WebSocket = None):
+    async with get_context(request, websocket) as ctx:
         yield ctx
@@ -0,0 +1,29 @@
+import base64, binascii, json
+from graphql import GraphQLError
+from core.schemas.tasks import TaskStatusEnum
+
+# значения колонок с ограниченным набором: курсор с другим значением подделан или устарел
+COLUMN_VALUES = {
+    'status': {status.value for status in TaskStatusEnum},
+}
+
+
+def encode_cursor(column: str, value, task_id: str) -> str:
+    """Непрозрачный курсор: колонка сортировки и ключ строки (значение, id)"""
+    raw = json.dumps([column, value, task_id], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, column: str) -> tuple:
+    """Ключ (значение, id) из курсора; курсор другой сортировки или поврежденный — ошибка запроса"""
+    try:
+        cursor_column, value, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError, UnicodeError):
+        raise GraphQLError(f'Невалидный курсор: {cursor}')
+    if not isinstance(value, str) or not isinstance(task_id, str):
+        raise GraphQLError(f'Невалидный курсор: {cursor}')
+    if cursor_column != column:
+        raise GraphQLError(f'Курсор не соответствует сортировке {column}')
+    if column in COLUMN_VALUES and value not in COLUMN_VALUES[column]:
+        raise GraphQLError(f'Невалидный курсор: {cursor}')
+    return value, task_id
@@ -0,0 +1,31 @@
+from typing import Optional
+from strawberry.dataloader import DataLoader
+from core.models import Task
+from core.schemas.tasks import SchemaTask
+from api_v1.service.task import TaskService
+
+
+# ключ загрузки: ID задачи и запрошенные поля TaskGQL
+TaskKey = tuple[str, frozenset[str]]
+
+
+def create_task_loader(task_service: TaskService) -> DataLoader[TaskKey, Optional[SchemaTask]]:
+    """
+    Чтение задач: все task(id:) одного шага выполнения — одним запросом id = ANY(...).
+    Выбираются колонки объединения запрошенных полей: один ID с разными
+    выборками (псевдонимы) читается один раз.
+    """
+    async def load(keys: list[TaskKey]) -> list[Optional[SchemaTask]]:
+        task_ids = list(dict.fromkeys(task_id for task_id, _ in keys))
+        fields = frozenset().union(*(fields for _, fields in keys))
+        tasks = await task_service.read_tasks(task_ids, fields)
+        return [tasks.get(task_id) for task_id, _ in keys]
+    return DataLoader(load_fn=load)
+
+
+def create_task_entity_loader(task_service: TaskService) -> DataLoader[str, Optional[Task]]:
+    """ORM-объекты задач для мутаций (update_task, delete_task)"""
+    async def load(task_ids: list[str]) -> list[Optional[Task]]:
+        tasks = await task_service.get_tasks_by_ids(task_ids)
+        return [tasks.get(task_id) for task_id in task_ids]
+    return DataLoader(load_fn=load)
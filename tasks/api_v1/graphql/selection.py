@@ -0,0 +1,27 @@
+from typing import Iterator
+from strawberry.types.nodes import SelectedField, Selection
+
+
+def selected_fields(selections: list[Selection]) -> Iterator[SelectedField]:
+    """Поля выборки с раскрытыми фрагментами (...Fragment и ... on Type)"""
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            yield selection
+        else:
+            yield from selected_fields(selection.selections)
+
+
+def selected_names(selections: list[Selection]) -> set[str]:
+    """Имена запрошенных полей (как в схеме, без псевдонимов)"""
+    return {field.name for field in selected_fields(selections)}
+
+
+def subselection_names(selections: list[Selection], *path: str) -> set[str]:
+    """Имена полей, запрошенных внутри вложенного поля path (всех его вхождений)"""
+    for name in path:
+        selections = [
+            selection
+            for field in selected_fields(selections) if field.name == name
+            for selection in field.selections
+        ]
+    return selected_names(selections)
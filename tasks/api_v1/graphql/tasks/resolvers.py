@@ -1,18 +1,32 @@
 import strawberry
-# from graphql import GraphQLError
 from .schemas import (
     TaskGQL,
     TaskPageGQL,
     TaskCreateInputGQL,
     TaskUpdateInputGQL,
     TaskStatusGQL,
+    TaskOrderGQL,
+    TaskEdgeGQL,
+    TaskConnectionGQL,
+    PageInfoGQL,
+    TASK_GQL_FIELDS,
     map_to_task_gql
 )
-from typing import Optional
+from ..selection import selected_names, subselection_names
+from ..cursor import encode_cursor, decode_cursor
+from enum import Enum
+from typing import AsyncGenerator, Optional
+from graphql import GraphQLError
 from core.schemas.tasks import (
+    SchemaTask,
     TaskCreate,
     TaskUpdatePartial,
 )
+from infrastructure.database.task_broker import task_change_broker, TooManySubscriptions
+
+# размер страницы tasksConnection: без first/last и наибольший
+CONNECTION_DEFAULT_SIZE = 10
+CONNECTION_MAX_SIZE = 100
 
 @strawberry.type
 class Query:
@@ -22,7 +36,9 @@ class Query:
         id: strawberry.ID,
         info: strawberry.Info,
     ) -> Optional[TaskGQL]: 
-        task = await info.context.task_service.get_task(id)
+        # читаются только колонки запрошенных полей
+        fields = frozenset(selected_names(info.selected_fields[0].selections) & TASK_GQL_FIELDS)
+        task = await info.context.task_loader.load((id, fields))
         if task is None:
             return None
         return map_to_task_gql(task)
@@ -38,12 +54,19 @@ class Query:
         task_service = info.context.task_service
         """Получение списка задач с опциональным фильтром по статусу."""
         status_value = status.value if status else None
+        # по выборке: запрос страницы — только если нужны tasks (и только их колонки),
+        # запрос количества — только если нужны total или pagesCount
+        selections = info.selected_fields[0].selections
+        page_fields = selected_names(selections)
         
         tasks_data = await task_service.get_tasks(
             page=(offset // limit) + 1,
             limit=limit,
             column_search='status' if status else None,
-            input_search=status_value
+            input_search=status_value,
+            fields=subselection_names(selections, 'tasks') & TASK_GQL_FIELDS,
+            with_total=not page_fields.isdisjoint(('total', 'pagesCount')),
+            with_tasks='tasks' in page_fields,
         )
         
         tasks = [map_to_task_gql(task) for task in tasks_data.tasks]
@@ -54,6 +77,69 @@ class Query:
             pages_count=tasks_data.pages_count
         )
 
+    @strawberry.field
+    async def tasks_connection(
+        self,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+        status: Optional[TaskStatusGQL] = None,
+        order_by: Optional[TaskOrderGQL] = None,
+        info: strawberry.Info = strawberry.UNSET,
+    ) -> TaskConnectionGQL:
+        """
+        Список задач с курсорной пагинацией (Relay): страница читается по ключу
+        (колонка сортировки, id) без OFFSET, totalCount — только если запрошен.
+        """
+        if first is not None and last is not None:
+            raise GraphQLError('Укажите first или last, но не оба')
+        backward = last is not None
+        limit = last if backward else (first if first is not None else CONNECTION_DEFAULT_SIZE)
+        if not 0 <= limit <= CONNECTION_MAX_SIZE:
+            raise GraphQLError(f'first/last должны быть от 0 до {CONNECTION_MAX_SIZE}')
+        order_by = order_by or TaskOrderGQL()
+        column = order_by.field.value
+        task_service = info.context.task_service
+        search = {
+            'column_search': 'status' if status else None,
+            'input_search': status.value if status else None,
+        }
+
+        selections = info.selected_fields[0].selections
+        connection_fields = selected_names(selections)
+        connection = TaskConnectionGQL(
+            edges=[],
+            page_info=PageInfoGQL(has_next_page=False, has_previous_page=False),
+        )
+        if 'edges' in connection_fields or 'pageInfo' in connection_fields:
+            # колонка сортировки нужна для курсоров
+            fields = (subselection_names(selections, 'edges', 'node') & TASK_GQL_FIELDS) | {column}
+            tasks, has_more = await task_service.get_tasks_keyset(
+                column=column,
+                sort=order_by.direction.value,
+                limit=limit,
+                after=decode_cursor(after, column) if after else None,
+                before=decode_cursor(before, column) if before else None,
+                backward=backward,
+                fields=fields,
+                **search,
+            )
+            connection.edges = [
+                TaskEdgeGQL(cursor=task_cursor(task, column), node=map_to_task_gql(task))
+                for task in tasks
+            ]
+            # строки за противоположной границей не проверяются: курсор означает, что они были
+            connection.page_info = PageInfoGQL(
+                has_next_page=before is not None if backward else has_more,
+                has_previous_page=has_more if backward else after is not None,
+                start_cursor=connection.edges[0].cursor if connection.edges else None,
+                end_cursor=connection.edges[-1].cursor if connection.edges else None,
+            )
+        if 'totalCount' in connection_fields:
+            connection.total_count = await task_service.count_tasks(**search)
+        return connection
+
 @strawberry.type
 class Mutation:
     @strawberry.mutation
@@ -76,12 +162,14 @@ class Mutation:
         input: TaskUpdateInputGQL,
         info: strawberry.Info,
     ) -> Optional[TaskGQL]:
-        task = await info.context.task_service.get_task(id)
+        task = await info.context.task_entity_loader.load(id)
         if task is None:
             return None
         updated_task = await info.context.task_service.update_task(
             task, TaskUpdatePartial(**input.to_update_dict()), partial=True
         )
+        # ключи загрузчика включают выборку: сбрасываются все
+        info.context.task_loader.clear_all()
         return map_to_task_gql(updated_task) if updated_task else None
 
     @strawberry.mutation
@@ -90,12 +178,56 @@ class Mutation:
         id: strawberry.ID,
         info: strawberry.Info,
     ) -> bool:
-        task = await info.context.task_service.get_task(id)
+        task = await info.context.task_entity_loader.load(id)
         if task is None:
             return False
         await info.context.task_service.delete_task(task)
+        info.context.task_entity_loader.clear(id)
+        info.context.task_loader.clear_all()
         return True
 
+def task_cursor(task: SchemaTask, column: str) -> str:
+    value = getattr(task, column)
+    return encode_cursor(column, value.value if isinstance(value, Enum) else value, task.id)
+
+async def task_changes(op: str, status: Optional[TaskStatusGQL]) -> AsyncGenerator[TaskGQL, None]:
+    """Изменения задач из брокера процесса (одно соединение LISTEN на процесс)"""
+    if task_change_broker is None:
+        raise GraphQLError('Подписки отключены (TASKS_SUBSCRIPTIONS_ENABLED)')
+    try:
+        async for task in task_change_broker.listen(op, status.value if status else None):
+            yield map_to_task_gql(SchemaTask.model_validate(task))
+    except TooManySubscriptions as e:
+        raise GraphQLError(str(e))
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def task_created(
+        self,
+        status: Optional[TaskStatusGQL] = None,
+    ) -> AsyncGenerator[TaskGQL, None]:
+        async for task in task_changes('created', status):
+            yield task
+
+    @strawberry.subscription
+    async def task_updated(
+        self,
+        status: Optional[TaskStatusGQL] = None,
+    ) -> AsyncGenerator[TaskGQL, None]:
+        """Задача после изменения; status — фильтр по новому статусу"""
+        async for task in task_changes('updated', status):
+            yield task
+
+    @strawberry.subscription
+    async def task_deleted(
+        self,
+        status: Optional[TaskStatusGQL] = None,
+    ) -> AsyncGenerator[TaskGQL, None]:
+        """Последнее состояние удаленной задачи; status — фильтр по нему"""
+        async for task in task_changes('deleted', status):
+            yield task
+
 
 
 
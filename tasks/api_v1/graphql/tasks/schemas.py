@@ -3,6 +3,7 @@ from enum import Enum
 from typing import Optional, List
 from core.models.task import TaskStatus
 from core.models import Task
+from core.schemas.tasks import SchemaTask
 
 
 @strawberry.enum
@@ -22,13 +23,21 @@ class TaskGQL:
     description: Optional[str] = None
     status: TaskStatusGQL
 
-def map_to_task_gql(task: Task) -> TaskGQL:
-    """Карта базы данных на GraphQL"""
+# поля TaskGQL, которые читаются из одноименных колонок tasks
+TASK_GQL_FIELDS = frozenset(('id', 'title', 'description', 'status'))
+
+def map_to_task_gql(task: Task | SchemaTask) -> TaskGQL:
+    """
+    Карта базы данных на GraphQL.
+    Задача может быть прочитана не целиком (проекция выборки): невыбранные поля — None,
+    клиент их не запрашивал.
+    """
+    status = getattr(task, 'status', None)
     return TaskGQL(
         id=str(task.id),
-        title=task.title,
-        description=task.description,
-        status=TaskStatusGQL(task.status.value) if task.status else None
+        title=getattr(task, 'title', None),
+        description=getattr(task, 'description', None),
+        status=TaskStatusGQL(status.value) if status else None
     )
 
 @strawberry.type
@@ -37,6 +46,41 @@ class TaskPageGQL:
     total: int
     pages_count: int
 
+@strawberry.enum
+class TaskOrderFieldGQL(str, Enum):
+    TITLE = 'title'
+    STATUS = 'status'
+    ID = 'id'
+
+@strawberry.enum
+class OrderDirectionGQL(str, Enum):
+    ASC = 'asc'
+    DESC = 'desc'
+
+@strawberry.input
+class TaskOrderGQL:
+    field: TaskOrderFieldGQL = TaskOrderFieldGQL.TITLE
+    direction: OrderDirectionGQL = OrderDirectionGQL.DESC
+
+@strawberry.type
+class PageInfoGQL:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str] = None
+    end_cursor: Optional[str] = None
+
+@strawberry.type
+class TaskEdgeGQL:
+    cursor: str
+    node: TaskGQL
+
+@strawberry.type
+class TaskConnectionGQL:
+    edges: List[TaskEdgeGQL]
+    page_info: PageInfoGQL
+    # считается, только если запрошено
+    total_count: Optional[int] = None
+
 @strawberry.input
 class TaskCreateInputGQL:
     title: str
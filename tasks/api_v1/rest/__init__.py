@@ -2,6 +2,7 @@ from fastapi import APIRouter
 
 from .tasks.views import router as tasks_router
 from .tasks.views import router_list as tasks_list_router
+from .metrics.views import router as metrics_router
 
 
 router = APIRouter()
@@ -9,6 +10,7 @@ router = APIRouter()
 
 router.include_router(router=tasks_router, prefix='/task')
 router.include_router(router=tasks_list_router, prefix='/tasks')
+router.include_router(router=metrics_router, prefix='/metrics')
 
 
 
@@ -1,18 +1,25 @@
 from typing import Annotated, AsyncIterator
 from fastapi import Path, Depends
 from infrastructure.database.uow import UnitOfWork, unit_of_work
+from infrastructure.cache.bloom import is_known_absent
 from api_v1.service.task import TaskService
 
 from core.models import Task
+from core.schemas.tasks import SchemaTask
 from .decorators import handle_errors
 from .exceptions import TaskNotFoundException
 from aiokafka import AIOKafkaProducer
+from infrastructure.kafka.publisher import EventPublisher
 
 
 async def get_producer() -> AIOKafkaProducer:
     from main import app
     return app.state.kafka_producer
 
+async def get_publisher() -> EventPublisher:
+    from main import app
+    return app.state.kafka_publisher
+
 async def get_uow() -> AsyncIterator[UnitOfWork]:
     async with unit_of_work() as uow:
         yield uow
@@ -20,9 +27,22 @@ async def get_uow() -> AsyncIterator[UnitOfWork]:
 def get_task_service(uow: UnitOfWork = Depends(get_uow)) -> TaskService:
     return TaskService(uow)
 
+@handle_errors
+async def valid_task_id(task_id: Annotated[str, Path]) -> str:
+    """
+    Отсекает заведомо несуществующие ID до открытия сессии БД.
+
+    param task_id: ID задачи.
+    return: ID задачи, если она может существовать.
+    raises HTTPException: Если ID некорректен или отсутствует в фильтре ID.
+    """
+    if is_known_absent(task_id):
+        raise TaskNotFoundException(task_id)
+    return task_id
+
 @handle_errors
 async def task_by_id(
-    task_id: Annotated[str, Path],
+    task_id: str = Depends(valid_task_id),
     service: TaskService = Depends(get_task_service),
 ) -> Task:
     """
@@ -35,4 +55,21 @@ async def task_by_id(
     task = await service.get_task(task_id=task_id)
     if task is None:
         raise TaskNotFoundException(task_id)
-    return task
\ No newline at end of file
+    return task
+
+@handle_errors
+async def task_read_by_id(
+    task_id: str = Depends(valid_task_id),
+    service: TaskService = Depends(get_task_service),
+) -> SchemaTask:
+    """
+    Получает задачу по ID для чтения (без ORM-объекта).
+
+    param task_id: ID задачи, которую нужно получить.
+    return: Задача, если найдена.
+    raises HTTPException: Если задача не найдена.
+    """
+    task = await service.read_task(task_id=task_id)
+    if task is None:
+        raise TaskNotFoundException(task_id)
+    return task
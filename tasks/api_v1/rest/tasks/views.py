@@ -1,10 +1,12 @@
+import uuid
 from typing import Annotated
-from fastapi import APIRouter, Depends, status, Path
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Path
 from .dependencies import (
     get_task_service,
     task_by_id,
-    AIOKafkaProducer,
-    get_producer
+    task_read_by_id,
+    EventPublisher,
+    get_publisher
 )
 from api_v1.service.task import TaskService
 from core.models import Task
@@ -16,6 +18,8 @@ from core.schemas.tasks import (
     TasksResponseSchema
 )
 from core.config import settings
+from infrastructure.kafka.partitioning import event_key
+from core.responses import SchemaResponse
 
 import logging.config
 from core.logger import logger_config
@@ -43,11 +47,12 @@ async def create_task(
     Исключения:
         HTTPException: При возникновении ошибки.
     """
-    return await service.create_task(task=task)
+    new_task = await service.create_task(task=task)
+    return SchemaResponse(SchemaTask.model_validate(new_task), status_code=status.HTTP_201_CREATED)
 
 
 @router.get('/{task_id}/', response_model=SchemaTask, status_code=status.HTTP_200_OK)
-async def get_task(task: SchemaTask = Depends(task_by_id)):
+async def get_task(task: SchemaTask = Depends(task_read_by_id)):
     """
     Получает задачу по ID.
 
@@ -61,7 +66,7 @@ async def get_task(task: SchemaTask = Depends(task_by_id)):
     Исключения:
         HTTPException: При возникновении ошибки.
     """
-    return task
+    return SchemaResponse(task)
 
 
 @router.put('/{task_id}/', response_model=SchemaTask, status_code=status.HTTP_200_OK)
@@ -83,10 +88,11 @@ async def update_task(
     Исключения:
         HTTPException: При возникновении ошибки.
     """
-    return await service.update_task(
+    updated_task = await service.update_task(
         task=task,
         task_update=task_update
     )
+    return SchemaResponse(SchemaTask.model_validate(updated_task))
 
 
 @router.patch('/{task_id}/', response_model=SchemaTask, status_code=status.HTTP_200_OK)
@@ -108,11 +114,12 @@ async def update_partial_task(
     Исключения:
         HTTPException: При возникновении ошибки.
     """
-    return await service.update_task(
+    updated_task = await service.update_task(
         task=task,
         task_update=task_update,
         partial=True,
     )
+    return SchemaResponse(SchemaTask.model_validate(updated_task))
 
 
 @router.delete('/{task_id}/', status_code=status.HTTP_204_NO_CONTENT)
@@ -164,7 +171,7 @@ async def get_list_tasks(
     Исключения:
         HTTPException: При возникновении ошибки.
     """
-    return await service.get_tasks(
+    tasks = await service.get_tasks(
         column=column,
         sort=sort,
         page=page,
@@ -172,20 +179,41 @@ async def get_list_tasks(
         column_search=column_search,
         input_search=input_search,
     )
+    return SchemaResponse(tasks)
+
+def event_response(event_status: str, event: dict) -> dict:
+    return {'status': event_status, 'event_id': event['event_id'], 'correlation_id': event['correlation_id']}
 
 @router.post('/create_event', status_code=status.HTTP_201_CREATED)
 async def send_task_creation_event(
     task: TaskCreate,
-    producer: AIOKafkaProducer = Depends(get_producer)
+    response: Response,
+    publisher: EventPublisher = Depends(get_publisher),
+    client_id: Annotated[str | None, Header(alias='X-Client-Id')] = None,
+    correlation_id: Annotated[str | None, Header(alias='X-Correlation-Id', max_length=128)] = None,
 ):
     event = {
         'event': 'TaskModuleCreation',
+        # ID события — ID будущей задачи: worker по нему отсекает повторную доставку
+        'event_id': str(uuid.uuid4()),
+        # итог обработки worker отправит в reply_to (его читает gateway: GET /task/events/{correlation_id})
+        'correlation_id': correlation_id or str(uuid.uuid4()),
         'task': task.model_dump()
     }
+    if settings.worker.REPLY_ENABLED:
+        event['reply_to'] = settings.kafka.REPLY_TOPIC
     try:
-        await producer.send_and_wait(topic=settings.kafka.TOPIC, value=event)
+        await publisher.publish(
+            topic=settings.kafka.TOPIC,
+            value=event,
+            key=event_key(event, settings.kafka.PARTITION_KEY, client_id),
+        )
         kafka_logger.info('Сообщение успешно отправлено в topic task_events')
     except Exception as e:
         kafka_logger.exception('Ошибка отправки сообщения в topic task_events', exc_info=e)
         raise HTTPException(status_code=503, detail=f'Ошибка отправки сообщения в topic task_events: {e}')
-    return {'status': 'published'}
\ No newline at end of file
+    if not publisher.waits_for_broker:
+        # событие в буфере producer, подтверждения брокера не ждали
+        response.status_code = status.HTTP_202_ACCEPTED
+        return event_response('accepted', event)
+    return event_response('published', event)
\ No newline at end of file
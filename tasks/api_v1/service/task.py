@@ -6,20 +6,141 @@ from core.schemas.tasks import (
     TaskUpdatePartial,
     TasksResponseSchema,
 )
-from typing import Optional
+from typing import Optional, Iterable
+from core.config import settings
 from infrastructure.database.uow import UnitOfWork
+from infrastructure.cache.task_cache import task_cache, MISS
+from infrastructure.cache.bloom import task_id_filter, is_known_absent
+
+
+# Тип события outbox по операции над задачей
+OUTBOX_EVENT_TYPES = {
+    'created': 'TaskCreated',
+    'updated': 'TaskUpdated',
+    'deleted': 'TaskDeleted',
+}
 
 
 class TaskService:
     def __init__(self, uow: UnitOfWork):
         self.uow = uow
     
+    async def _task_changed(self, task_id: str, op: str, task: Optional[Task] = None) -> None:
+        """
+        Изменение задачи: событие в outbox и NOTIFY в транзакции записи,
+        затем локальные кэш и фильтр ID.
+        """
+        payload = {'id': task_id}
+        if task is not None:
+            payload = SchemaTask.model_validate(task).model_dump(mode='json')
+        await self._tasks_changed(op, {task_id: payload})
+
+    async def _tasks_changed(self, op: str, payloads: dict[str, dict]) -> None:
+        """Изменение пачки задач: payloads — {ID задачи: данные события outbox}"""
+        if settings.outbox.ENABLED:
+            await self.uow.outbox.add_events([
+                {
+                    'event_type': OUTBOX_EVENT_TYPES[op],
+                    'aggregate_id': task_id,
+                    'payload': payload,
+                }
+                for task_id, payload in payloads.items()
+            ])
+        # NOTIFY всегда, независимо от настроек этого процесса: кэш, фильтр ID и подписки
+        # других процессов (API при записи из worker) узнают об изменении только так
+        task_ids = list(payloads)
+        # payload только с id (задача не прочитана) — без данных задачи для подписок
+        tasks = [payload if 'status' in payload else None for payload in payloads.values()]
+        if len(task_ids) == 1:
+            await self.uow.tasks.notify_task_changed(settings.db.NOTIFY_CHANNEL, task_ids[0], op, tasks[0])
+        else:
+            await self.uow.tasks.notify_tasks_changed(settings.db.NOTIFY_CHANNEL, task_ids, op, tasks)
+        for task_id in task_ids:
+            if task_cache is not None:
+                task_cache.invalidate(task_id)
+            if task_id_filter is not None and op == 'created':
+                task_id_filter.add(task_id)
+    
     async def create_task(self, task: TaskCreate) -> Optional[SchemaTask]:
-        return await self.uow.tasks.create_task(task)
+        new_task = await self.uow.tasks.create_task(task)
+        await self._task_changed(new_task.id, 'created', new_task)
+        return new_task
+
+    async def create_tasks(
+        self,
+        tasks: list[TaskCreate],
+        task_ids: Optional[list[str]] = None,
+    ) -> list[SchemaTask]:
+        """
+        Пакетное создание задач в текущей транзакции.
+        С task_ids повторно полученные задачи пропускаются; возвращаются только созданные.
+        """
+        new_tasks = await self.uow.tasks.create_tasks(tasks, task_ids)
+        if new_tasks:
+            await self._tasks_changed('created', {
+                task.id: task.model_dump(mode='json') for task in new_tasks
+            })
+        return new_tasks
     
     async def get_task(self, task_id: str) -> Optional[Task]:
+        if is_known_absent(task_id):
+            return None
+        if task_cache is not None and task_cache.is_missing(task_id):
+            return None
         return await self.uow.tasks.get_task(task_id)
 
+    async def read_task(self, task_id: str) -> Optional[SchemaTask]:
+        if is_known_absent(task_id):
+            return None
+        if task_cache is None:
+            return await self.uow.tasks.read_task(task_id)
+        cached = task_cache.get(task_id)
+        if cached is not MISS:
+            return cached
+        generation = task_cache.generation
+        task = await self.uow.tasks.read_task(task_id)
+        task_cache.set(task_id, task, generation)
+        return task
+
+    async def get_tasks_by_ids(self, task_ids: list[str]) -> dict[str, Task]:
+        """ORM-объекты задач по списку ID (для изменения) одним запросом"""
+        task_ids = [
+            task_id for task_id in dict.fromkeys(task_ids)
+            if not is_known_absent(task_id) and not (task_cache is not None and task_cache.is_missing(task_id))
+        ]
+        return await self.uow.tasks.get_tasks_by_ids(task_ids)
+
+    async def read_tasks(
+        self,
+        task_ids: list[str],
+        fields: Optional[Iterable[str]] = None,
+    ) -> dict[str, SchemaTask]:
+        """
+        Чтение задач по списку ID: найденные в кэше — из него, остальные одним запросом.
+        fields — нужные поля: без кэша читаются только их колонки, кэш хранит задачи целиком.
+        """
+        found: dict[str, SchemaTask] = {}
+        missing: list[str] = []
+        for task_id in dict.fromkeys(task_ids):
+            if is_known_absent(task_id):
+                continue
+            if task_cache is not None:
+                cached = task_cache.get(task_id)
+                if cached is not MISS:
+                    if cached is not None:
+                        found[task_id] = cached
+                    continue
+            missing.append(task_id)
+        if not missing:
+            return found
+        generation = task_cache.generation if task_cache is not None else None
+        loaded = await self.uow.tasks.read_tasks(missing, fields if task_cache is None else None)
+        if task_cache is not None:
+            for task_id in missing:
+                task_cache.set(task_id, loaded.get(task_id), generation)
+        found.update(loaded)
+        return found
+
     async def get_tasks(
         self,
         column: str = 'title',
@@ -28,6 +149,9 @@ class TaskService:
         limit: int = 10,
         column_search: str | None = None,
         input_search: str | None = None,
+        fields: Optional[Iterable[str]] = None,
+        with_total: bool = True,
+        with_tasks: bool = True,
     ) -> TasksResponseSchema:
         return await self.uow.tasks.get_tasks(
             column=column,
@@ -36,6 +160,43 @@ class TaskService:
             limit=limit,
             column_search=column_search,
             input_search=input_search,
+            fields=fields,
+            with_total=with_total,
+            with_tasks=with_tasks,
+        )
+
+    async def count_tasks(
+        self,
+        column_search: str | None = None,
+        input_search: str | None = None,
+    ) -> int:
+        return await self.uow.tasks.count_tasks(
+            column_search=column_search,
+            input_search=input_search,
+        )
+
+    async def get_tasks_keyset(
+        self,
+        column: str = 'title',
+        sort: str = 'desc',
+        limit: int = 10,
+        after: Optional[tuple] = None,
+        before: Optional[tuple] = None,
+        backward: bool = False,
+        column_search: str | None = None,
+        input_search: str | None = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> tuple[list[SchemaTask], bool]:
+        return await self.uow.tasks.get_tasks_keyset(
+            column=column,
+            sort=sort,
+            limit=limit,
+            after=after,
+            before=before,
+            backward=backward,
+            column_search=column_search,
+            input_search=input_search,
+            fields=fields,
         )
 
     async def update_task(
@@ -44,15 +205,21 @@ class TaskService:
         task_update: TaskUpdate | TaskUpdatePartial,
         partial: bool = False,
     ) -> Optional[Task]:
-        return await self.uow.tasks.update_task(
+        updated_task = await self.uow.tasks.update_task(
             task=task,
             task_update=task_update,
             partial=partial,
         )
+        await self._task_changed(task.id, 'updated', updated_task)
+        return updated_task
 
     async def delete_task(
         self,
         task: Task,
     ) -> None:
-        return await self.uow.tasks.delete_task(task)
+        task_id = task.id
+        # последнее состояние задачи: подписчики фильтруют удаления по статусу
+        deleted = SchemaTask.model_validate(task)
+        await self.uow.tasks.delete_task(task)
+        await self._task_changed(task_id, 'deleted', deleted)
         
\ No newline at end of file
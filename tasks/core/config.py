@@ -1,11 +1,15 @@
 # -*- encoding: utf-8 -*-
 import os
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings
 
 load_dotenv()
 
+class ConfigurationSection(BaseModel):
+    # значения из окружения — строки: приводятся к объявленным типам ('false' -> False, '8' -> 8)
+    model_config = ConfigDict(validate_default=True)
+
 class ConfigurationDB(BaseModel):
     #########################
     #  PostgreSQL database  #
@@ -20,9 +24,20 @@ class ConfigurationDB(BaseModel):
     @property
     def async_url(self):
         return f'postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}'
+
+    @property
+    def dsn(self):
+        # для прямых соединений asyncpg (LISTEN/NOTIFY)
+        return f'postgresql://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}'
     
     echo: bool = False
 
+    # канал Postgres LISTEN/NOTIFY для изменений задач (кэш, фильтр ID, подписки GraphQL)
+    NOTIFY_CHANNEL: str = os.getenv('TASKS_DB_NOTIFY_CHANNEL', 'tasks_changes')
+    NOTIFY_RECONNECT_BACKOFF: float = Field(
+        default=os.getenv('TASKS_DB_NOTIFY_RECONNECT_BACKOFF', 1.0), validate_default=True,
+    )
+
 
 class ConfigurationCORS(BaseModel):
     #########################
@@ -46,17 +61,134 @@ class ConfigurationCORS(BaseModel):
         'Access-Control-Allow-Origin',
     ]
 
-class ConfigurationKafka(BaseModel):
+class ConfigurationKafka(ConfigurationSection):
     #########################
     #         KAFKA         #
     #########################
     
     BOOTSTRAP: str = os.getenv('KAFKA_BOOTSTRAP', 'kafka:9092')
     TOPIC: str = os.getenv('KAFKA_TOPIC', 'task_events')
+    # события изменений задач (TaskCreated/Updated/Deleted) из outbox
+    CHANGES_TOPIC: str = os.getenv('KAFKA_CHANGES_TOPIC', 'task_changes')
+    # сообщения, которые worker не смог обработать (с метаданными ошибки в заголовках)
+    DLQ_TOPIC: str = os.getenv('KAFKA_DLQ_TOPIC', 'task_events.dlq')
+    # итоги обработки событий (correlation_id -> задача или ошибка) для gateway
+    REPLY_TOPIC: str = os.getenv('KAFKA_REPLY_TOPIC', 'task_events.replies')
     GROUP_ID: str = os.getenv('KAFKA_GROUP_ID', 'tasks_app_group')
     CLIENT_ID: str = os.getenv('KAFKA_CLIENT_ID', 'tasks_app')
     STARTUP_RETRIES: int = os.getenv('KAFKA_STARTUP_RETRIES', 3)
     RETRY_BACKOFF: float = os.getenv('KAFKA_RETRY_BACKOFF', 1.0)
+    # ключ событий задач: task_id (ID будущей задачи), client_id (заголовок X-Client-Id) или none
+    PARTITION_KEY: str = os.getenv('KAFKA_PARTITION_KEY', 'task_id')
+    # default (murmur2 от ключа), random или свой 'module:attribute'
+    PARTITIONER: str = os.getenv('KAFKA_PARTITIONER', 'default')
+    # профиль producer событий задач: latency, balanced или throughput (linger, пачка, сжатие, acks)
+    PRODUCER_PROFILE: str = os.getenv('KAFKA_PRODUCER_PROFILE', 'balanced')
+    # ответ после подтверждения брокером (broker) или после постановки в пачку producer (enqueued)
+    PRODUCER_ACK_MODE: str = os.getenv('KAFKA_PRODUCER_ACK_MODE', 'broker')
+    # неподтвержденных событий в режиме enqueued, дальше запросы ждут
+    PRODUCER_MAX_PENDING: int = os.getenv('KAFKA_PRODUCER_MAX_PENDING', 10000)
+    # кодек событий задач: json или msgpack (формат и версия схемы — в заголовках сообщения)
+    EVENT_CODEC: str = os.getenv('KAFKA_EVENT_CODEC', 'json')
+    # создание/проверка топиков при запуске; партиции ограничивают число параллельных потребителей
+    TOPIC_BOOTSTRAP: bool = os.getenv('KAFKA_TOPIC_BOOTSTRAP', True)
+    TOPIC_PARTITIONS: int = os.getenv('KAFKA_TOPIC_PARTITIONS', 12)
+    TOPIC_REPLICATION: int = os.getenv('KAFKA_TOPIC_REPLICATION', 1)
+
+class ConfigurationWorker(ConfigurationSection):
+    #########################
+    #      KAFKA WORKER     #
+    #########################
+
+    # пакетная обработка: getmany + один INSERT и один commit offset на пачку
+    BATCH_ENABLED: bool = os.getenv('TASKS_WORKER_BATCH_ENABLED', True)
+    BATCH_MAX_RECORDS: int = os.getenv('TASKS_WORKER_BATCH_MAX_RECORDS', 500)
+    BATCH_MAX_WAIT_MS: int = os.getenv('TASKS_WORKER_BATCH_MAX_WAIT_MS', 200)
+    # одновременно обрабатываемых пачек (разных партиций); 1 — последовательно
+    CONCURRENCY: int = os.getenv('TASKS_WORKER_CONCURRENCY', 4)
+    # пачек в очереди партиции, после которых партиция ставится на паузу
+    PARTITION_QUEUE_SIZE: int = os.getenv('TASKS_WORKER_PARTITION_QUEUE_SIZE', 2)
+    # где хранить offset: kafka (commit группы) или postgres (в транзакции записи задач)
+    OFFSETS_STORE: str = os.getenv('TASKS_WORKER_OFFSETS_STORE', 'kafka')
+    # топики задержки (task_events.retry.<N>s) и DLQ для неудачных сообщений
+    RETRY_ENABLED: bool = os.getenv('TASKS_WORKER_RETRY_ENABLED', True)
+    # задержки повторов по возрастанию, секунды через запятую
+    RETRY_DELAYS: str = os.getenv('TASKS_WORKER_RETRY_DELAYS', '1,30,300')
+    # ответ на события с correlation_id и reply_to: ID задачи или ошибка
+    REPLY_ENABLED: bool = os.getenv('TASKS_WORKER_REPLY_ENABLED', True)
+    # пауза чтения при перегрузке БД: ожидание соединения из пула и пачки в записи
+    FLOW_CONTROL_ENABLED: bool = os.getenv('TASKS_WORKER_FLOW_CONTROL_ENABLED', True)
+    FLOW_MAX_CHECKOUT_WAIT_MS: float = os.getenv('TASKS_WORKER_FLOW_MAX_CHECKOUT_WAIT_MS', 200)
+    FLOW_MAX_IN_FLIGHT_BATCHES: int = os.getenv('TASKS_WORKER_FLOW_MAX_IN_FLIGHT_BATCHES', 8)
+    # возобновление, когда оба сигнала ниже этой доли порога
+    FLOW_RESUME_RATIO: float = os.getenv('TASKS_WORKER_FLOW_RESUME_RATIO', 0.5)
+    # ограничение скорости записи задач (строк в секунду); 0 — без ограничения
+    MAX_ROWS_PER_SECOND: float = os.getenv('TASKS_WORKER_MAX_ROWS_PER_SECOND', 0)
+    # процессов worker у супервизора; 0 — min(число CPU, число партиций)
+    PROCESSES: int = os.getenv('TASKS_WORKER_PROCESSES', 0)
+    # перезапуск упавшего процесса: начальная и максимальная пауза
+    RESTART_BACKOFF: float = os.getenv('TASKS_WORKER_RESTART_BACKOFF', 1.0)
+    RESTART_BACKOFF_MAX: float = os.getenv('TASKS_WORKER_RESTART_BACKOFF_MAX', 30.0)
+    # время на корректную остановку процессов до SIGKILL
+    SHUTDOWN_TIMEOUT: float = os.getenv('TASKS_WORKER_SHUTDOWN_TIMEOUT', 30.0)
+    # доработка полученных пачек по SIGTERM; меньше SHUTDOWN_TIMEOUT, чтобы успеть подтвердить offset
+    DRAIN_TIMEOUT: float = os.getenv('TASKS_WORKER_DRAIN_TIMEOUT', 20.0)
+    # доработка пачек отзываемых партиций при ребалансировке, дальше они прерываются
+    REVOKE_TIMEOUT: float = os.getenv('TASKS_WORKER_REVOKE_TIMEOUT', 10.0)
+    # период отправки метрик процессов супервизору
+    METRICS_INTERVAL: float = os.getenv('TASKS_WORKER_METRICS_INTERVAL', 10.0)
+
+    @property
+    def retry_delays(self) -> list[int]:
+        return [int(delay) for delay in self.RETRY_DELAYS.split(',') if delay.strip()]
+
+class ConfigurationCache(ConfigurationSection):
+    #########################
+    #   TASKS CACHE (LRU)   #
+    #########################
+
+    ENABLED: bool = os.getenv('TASKS_CACHE_ENABLED', False)
+    MAX_SIZE: int = os.getenv('TASKS_CACHE_MAX_SIZE', 10000)
+    TTL: float = os.getenv('TASKS_CACHE_TTL', 60.0)
+    NEGATIVE_TTL: float = os.getenv('TASKS_CACHE_NEGATIVE_TTL', 5.0)
+
+class ConfigurationBloom(ConfigurationSection):
+    #########################
+    #  TASK ID BLOOM FILTER #
+    #########################
+
+    ENABLED: bool = os.getenv('TASKS_BLOOM_ENABLED', False)
+    # ожидаемое число задач и допустимая доля ложноположительных ответов
+    CAPACITY: int = os.getenv('TASKS_BLOOM_CAPACITY', 1_000_000)
+    FALSE_POSITIVE_RATE: float = os.getenv('TASKS_BLOOM_FALSE_POSITIVE_RATE', 0.01)
+    # размер пачки ID при построении фильтра на старте
+    BUILD_BATCH_SIZE: int = os.getenv('TASKS_BLOOM_BUILD_BATCH_SIZE', 10000)
+
+class ConfigurationSubscriptions(ConfigurationSection):
+    ##############################
+    #  GRAPHQL SUBSCRIPTIONS     #
+    ##############################
+
+    # taskCreated/taskUpdated/taskDeleted через graphql-ws из общего соединения LISTEN
+    ENABLED: bool = os.getenv('TASKS_SUBSCRIPTIONS_ENABLED', True)
+    # изменений в очереди подписки; при переполнении вытесняются старые
+    QUEUE_SIZE: int = os.getenv('TASKS_SUBSCRIPTIONS_QUEUE_SIZE', 100)
+    MAX_SUBSCRIPTIONS: int = os.getenv('TASKS_SUBSCRIPTIONS_MAX', 10000)
+
+class ConfigurationOutbox(ConfigurationSection):
+    ##########################
+    #  TRANSACTIONAL OUTBOX  #
+    ##########################
+
+    ENABLED: bool = os.getenv('TASKS_OUTBOX_ENABLED', True)
+    # строк за одну транзакцию relay
+    BATCH_SIZE: int = os.getenv('TASKS_OUTBOX_BATCH_SIZE', 1000)
+    # пауза relay, когда outbox пуст
+    POLL_INTERVAL: float = os.getenv('TASKS_OUTBOX_POLL_INTERVAL', 0.5)
+    # батчинг и сжатие на стороне producer
+    LINGER_MS: int = os.getenv('TASKS_OUTBOX_LINGER_MS', 20)
+    MAX_BATCH_SIZE: int = os.getenv('TASKS_OUTBOX_MAX_BATCH_SIZE', 1048576)
+    COMPRESSION: str = os.getenv('TASKS_OUTBOX_COMPRESSION', 'gzip')
 
 class Setting(BaseSettings):
     # ENV
@@ -74,6 +206,21 @@ class Setting(BaseSettings):
 
     # KAFKA
     kafka: ConfigurationKafka = ConfigurationKafka()
-    
+
+    # CACHE
+    cache: ConfigurationCache = ConfigurationCache()
+
+    # BLOOM FILTER
+    bloom: ConfigurationBloom = ConfigurationBloom()
+
+    # OUTBOX
+    outbox: ConfigurationOutbox = ConfigurationOutbox()
+
+    # GRAPHQL SUBSCRIPTIONS
+    subscriptions: ConfigurationSubscriptions = ConfigurationSubscriptions()
+
+    # KAFKA WORKER
+    worker: ConfigurationWorker = ConfigurationWorker()
+
 
 settings = Setting()
\ No newline at end of file
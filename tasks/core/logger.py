@@ -65,6 +65,10 @@ logger_config = {
             '()': 'core.logger.ServiceNameFilter',
             'service_name': 'tasks_microservice_kafka'
         },
+        'cache': {
+            '()': 'core.logger.ServiceNameFilter',
+            'service_name': 'tasks_microservice_cache'
+        },
     },
     'handlers': {
         'console': {
@@ -120,6 +124,12 @@ logger_config = {
             'propagate': False,
             'filters': ['kafka'],
         },
+        'cache_logger': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+            'filters': ['cache'],
+        },
         'aiokafka.cluster': {
             'handlers': ['console'],
             'level': 'INFO',
@@ -1,7 +1,11 @@
 __all__ = (
     'Base',
     'Task',
+    'OutboxEvent',
+    'ConsumerOffset',
 )
 
 from .base import Base
-from .task import Task
\ No newline at end of file
+from .task import Task
+from .outbox import OutboxEvent
+from .consumer_offset import ConsumerOffset
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, UniqueConstraint
+
+from .base import Base
+
+
+class ConsumerOffset(Base):
+    """Offset группы потребителей, сохраненный в одной транзакции с обработанными данными"""
+    __tablename__ = 'consumer_offsets'
+    __table_args__ = (
+        UniqueConstraint('group_id', 'topic', 'partition', name='uq_consumer_offsets_group_topic_partition'),
+    )
+
+    group_id: Mapped[str] = mapped_column(String(255))
+    topic: Mapped[str] = mapped_column(String(255))
+    partition: Mapped[int] = mapped_column(Integer)
+    # следующий offset к чтению (как в commit Kafka)
+    offset: Mapped[int] = mapped_column(BigInteger)
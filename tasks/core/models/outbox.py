@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, BigInteger, DateTime, Identity, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base
+
+
+class OutboxEvent(Base):
+    """Событие изменения задачи, записанное в транзакции изменения (transactional outbox)"""
+    __tablename__ = 'outbox'
+
+    # порядок публикации
+    seq: Mapped[int] = mapped_column(BigInteger, Identity(), unique=True)
+    event_type: Mapped[str] = mapped_column(String(50))
+    # ключ сообщения Kafka (ID задачи) — порядок событий одной задачи внутри партиции
+    aggregate_id: Mapped[str] = mapped_column(String(36))
+    payload: Mapped[dict] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
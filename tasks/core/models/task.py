@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Enum as PgEnum
+from sqlalchemy import String, Index, Enum as PgEnum
 from enum import Enum
 
 from .base import Base
@@ -11,6 +11,11 @@ class TaskStatus(Enum):
 
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # ключи курсорной пагинации (column, id): tasksConnection по title и status
+        Index('ix_tasks_title_id', 'title', 'id'),
+        Index('ix_tasks_status_id', 'status', 'id'),
+    )
 
     title: Mapped[str] = mapped_column(String(100))
     description: Mapped[str | None] = mapped_column(String(255))
@@ -0,0 +1,48 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from aiokafka import TopicPartition
+from core.models import ConsumerOffset
+
+offsets_table = ConsumerOffset.__table__
+
+
+class ConsumerOffsetRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_offsets(self, group_id: str, partitions: list[TopicPartition]) -> dict[TopicPartition, int]:
+        """Сохраненные offset группы для партиций (отсутствующие не возвращаются)"""
+        topics = {tp.topic for tp in partitions}
+        stmt = select(
+            offsets_table.c.topic,
+            offsets_table.c.partition,
+            offsets_table.c.offset,
+        ).where(
+            offsets_table.c.group_id == group_id,
+            offsets_table.c.topic.in_(topics),
+        )
+        result = await self.session.execute(stmt)
+        wanted = set(partitions)
+        offsets = {}
+        for row in result.mappings():
+            tp = TopicPartition(row['topic'], row['partition'])
+            if tp in wanted:
+                offsets[tp] = row['offset']
+        return offsets
+
+    async def store_offsets(self, group_id: str, offsets: dict[TopicPartition, int]) -> None:
+        """Upsert offset партиций в текущей транзакции"""
+        if not offsets:
+            return
+        stmt = insert(offsets_table)
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_consumer_offsets_group_topic_partition',
+            set_={'offset': stmt.excluded.offset},
+            # запоздавшая пачка прежнего владельца партиции не откатывает offset назад
+            where=offsets_table.c.offset < stmt.excluded.offset,
+        )
+        await self.session.execute(stmt, [
+            {'group_id': group_id, 'topic': tp.topic, 'partition': tp.partition, 'offset': offset}
+            for tp, offset in offsets.items()
+        ])
@@ -0,0 +1,49 @@
+from sqlalchemy import select, insert, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import RowMapping
+from typing import Sequence
+from core.models import OutboxEvent
+
+outbox_table = OutboxEvent.__table__
+
+
+class OutboxRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_event(self, event_type: str, aggregate_id: str, payload: dict) -> None:
+        """Запись события в текущей транзакции (без ORM-объекта и flush)"""
+        stmt = insert(outbox_table).values(
+            event_type=event_type,
+            aggregate_id=aggregate_id,
+            payload=payload,
+        )
+        await self.session.execute(stmt)
+
+    async def add_events(self, events: list[dict]) -> None:
+        """Пакетная запись событий: {'event_type', 'aggregate_id', 'payload'}"""
+        if events:
+            await self.session.execute(insert(outbox_table), events)
+
+    async def lock_batch(self, limit: int) -> Sequence[RowMapping]:
+        """
+        Блокирует до limit самых старых событий до конца транзакции.
+        Строки, заблокированные другим relay, пропускаются (SKIP LOCKED).
+        """
+        stmt = (
+            select(
+                outbox_table.c.id,
+                outbox_table.c.event_type,
+                outbox_table.c.aggregate_id,
+                outbox_table.c.payload,
+                outbox_table.c.created_at,
+            )
+            .order_by(outbox_table.c.seq)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(stmt)
+        return result.mappings().all()
+
+    async def delete_events(self, event_ids: list[str]) -> None:
+        await self.session.execute(delete(outbox_table).where(outbox_table.c.id.in_(event_ids)))
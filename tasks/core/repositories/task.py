@@ -1,6 +1,8 @@
-from sqlalchemy import select, update, func
+import json, time
+from sqlalchemy import select, update, func, text, bindparam, any_, tuple_, Text
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, AsyncIterator, Iterable
 from core.models import Task
 from core.models.task import TaskStatus
 from core.schemas.tasks import (
@@ -9,6 +11,7 @@ from core.schemas.tasks import (
     TaskUpdate,
     TaskUpdatePartial,
     TasksResponseSchema,
+    TaskStatusEnum,
 )
 import logging.config
 from core.logger import logger_config
@@ -16,6 +19,67 @@ from core.logger import logger_config
 logging.config.dictConfig(logger_config)
 logger = logging.getLogger('task_repository_logger')
 
+tasks_table = Task.__table__
+# Колонки для чтения без ORM: строки приходят как RowMapping,
+# без identity map и без создания объектов Task
+TASK_READ_COLUMNS = (
+    tasks_table.c.id,
+    tasks_table.c.title,
+    tasks_table.c.description,
+    tasks_table.c.status,
+)
+
+
+def row_to_schema(row) -> SchemaTask:
+    """Строка из БД в SchemaTask без повторной валидации (данные доверенные)"""
+    return SchemaTask.model_construct(
+        id=row['id'],
+        title=row['title'],
+        description=row['description'],
+        status=TaskStatusEnum(row['status'].value),
+    )
+
+
+def task_columns(fields: Optional[Iterable[str]] = None) -> tuple:
+    """
+    Колонки чтения для полей задачи (проекция выборки GraphQL).
+    None — все колонки; id выбирается всегда (ключ строки).
+    """
+    if fields is None:
+        return TASK_READ_COLUMNS
+    fields = set(fields)
+    return tuple(column for column in TASK_READ_COLUMNS if column.name == 'id' or column.name in fields)
+
+
+def partial_row_to_schema(row) -> SchemaTask:
+    """Строка с частью колонок в SchemaTask: невыбранные поля не заполняются"""
+    data = dict(row)
+    if data.get('status') is not None:
+        data['status'] = TaskStatusEnum(data['status'].value)
+    return SchemaTask.model_construct(**data)
+
+
+def rows_mapper(columns: tuple):
+    return row_to_schema if columns is TASK_READ_COLUMNS else partial_row_to_schema
+
+
+def task_search_condition(column_search: str | None, input_search: str | None):
+    """Условие поиска задач (по началу title/description или по статусу); None — без фильтра"""
+    if not (column_search and input_search):
+        return None
+    if column_search in ('title', 'description'):
+        return tasks_table.c[column_search].like(input_search + '%')
+    if column_search == 'status':
+        if input_search.upper() == 'CREATED':
+            return tasks_table.c.status == TaskStatus.CREATED
+        elif input_search.upper() == 'IN_PROGRESS':
+            return tasks_table.c.status == TaskStatus.IN_PROGRESS
+        elif input_search.upper() == 'COMPLETED':
+            return tasks_table.c.status == TaskStatus.COMPLETED
+        logger.exception('Неизвестный статус задачи: %s', input_search)
+        raise ValueError(f'Неизвестный статус задачи: {input_search}')
+    return None
+
 
 class TaskRepository:
     def __init__(self, session: AsyncSession):
@@ -25,6 +89,39 @@ class TaskRepository:
         stmt = select(Task).where(Task.id == task_id)
         result = await self.session.execute(stmt)
         return result.scalars().one_or_none()
+
+    async def get_tasks_by_ids(self, task_ids: list[str]) -> dict[str, Task]:
+        """ORM-объекты задач по списку ID одним запросом (id = ANY(:task_ids))"""
+        if not task_ids:
+            return {}
+        stmt = select(Task).where(Task.id == any_(bindparam('task_ids', task_ids, type_=ARRAY(Text))))
+        result = await self.session.execute(stmt)
+        return {task.id: task for task in result.scalars()}
+
+    async def read_tasks(
+        self,
+        task_ids: list[str],
+        fields: Optional[Iterable[str]] = None,
+    ) -> dict[str, SchemaTask]:
+        """Чтение задач по списку ID одним запросом без ORM-объектов; fields — только эти колонки"""
+        if not task_ids:
+            return {}
+        columns = task_columns(fields)
+        stmt = select(*columns).where(
+            tasks_table.c.id == any_(bindparam('task_ids', task_ids, type_=ARRAY(Text)))
+        )
+        result = await self.session.execute(stmt)
+        to_schema = rows_mapper(columns)
+        return {row['id']: to_schema(row) for row in result.mappings()}
+
+    async def read_task(self, task_id: str) -> Optional[SchemaTask]:
+        """Чтение задачи по ID без ORM-объекта (только для ответа клиенту)"""
+        stmt = select(*TASK_READ_COLUMNS).where(tasks_table.c.id == task_id)
+        result = await self.session.execute(stmt)
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        return row_to_schema(row)
     
     async def get_tasks(
         self,
@@ -34,55 +131,127 @@ class TaskRepository:
         limit: int = 10,
         column_search: str | None = None,
         input_search: str | None = None,
+        fields: Optional[Iterable[str]] = None,
+        with_total: bool = True,
+        with_tasks: bool = True,
     ) -> TasksResponseSchema:
-        stmt = select(Task)
-        total_stmt = select(func.count(Task.id))
-
-        if column_search and input_search:
-            if column_search in ('title', 'description'):
-                input_column = getattr(Task, column_search)
-                stmt = stmt.where(input_column.like(input_search + '%'))
-                total_stmt = total_stmt.where(input_column.like(input_search + '%'))
-
-            elif column_search == 'status':
-                if input_search.upper() == 'CREATED':
-                    status_condition = Task.status == TaskStatus.CREATED
-                elif input_search.upper() == 'IN_PROGRESS':
-                    status_condition = Task.status == TaskStatus.IN_PROGRESS
-                elif input_search.upper() == 'COMPLETED':
-                    status_condition = Task.status == TaskStatus.COMPLETED
-                else:
-                    logger.exception('Неизвестный статус задачи: %s', input_search)
-                    raise ValueError(f'Неизвестный статус задачи: {input_search}')
-                
-                # Apply the same status filter to both queries
-                stmt = stmt.where(status_condition)
-                total_stmt = total_stmt.where(status_condition)
-
-        total_result = await self.session.execute(total_stmt)
-        total_tasks = total_result.scalar() or 0
-
-        # Вычисляем количество страниц
-        pages_count = (total_tasks + limit - 1) // limit  # Округление вверх
-        # Добавляем пагинацию к запросу
-        offset = (page - 1) * limit
-
-        task_column = getattr(Task, column)
-        # определяем направление сортировки
-        ordering = task_column.desc() if sort.lower() == 'desc' else task_column.asc()
-        # строим запрос с сортировкой, лимитом и offset
-        stmt = stmt.order_by(ordering).limit(limit).offset(offset)
+        """
+        Страница задач и их количество.
+        fields — выбираемые колонки (по умолчанию все); with_total=False — без
+        запроса количества (total и pages_count равны None), with_tasks=False —
+        без запроса страницы.
+        """
+        columns = task_columns(fields)
+        stmt = select(*columns)
+        total_stmt = select(func.count(tasks_table.c.id))
 
-        result = await self.session.execute(stmt)
-        tasks = result.scalars().all()
-        if tasks is None:
-            tasks = []
-        return TasksResponseSchema(
+        condition = task_search_condition(column_search, input_search)
+        if condition is not None:
+            # один и тот же фильтр для обоих запросов
+            stmt = stmt.where(condition)
+            total_stmt = total_stmt.where(condition)
+
+        total_tasks = pages_count = None
+        if with_total:
+            total_result = await self.session.execute(total_stmt)
+            total_tasks = total_result.scalar() or 0
+            # Вычисляем количество страниц
+            pages_count = (total_tasks + limit - 1) // limit  # Округление вверх
+
+        tasks = []
+        if with_tasks:
+            # Добавляем пагинацию к запросу
+            offset = (page - 1) * limit
+
+            task_column = tasks_table.c[column]
+            # определяем направление сортировки
+            ordering = task_column.desc() if sort.lower() == 'desc' else task_column.asc()
+            # строим запрос с сортировкой, лимитом и offset
+            stmt = stmt.order_by(ordering).limit(limit).offset(offset)
+
+            result = await self.session.execute(stmt)
+            # строки -> схемы напрямую, минуя ORM и from_attributes
+            to_schema = rows_mapper(columns)
+            tasks = [to_schema(row) for row in result.mappings()]
+        return TasksResponseSchema.model_construct(
             pages_count=pages_count,
             total=total_tasks,
             tasks=tasks,
         )
     
+    async def count_tasks(
+        self,
+        column_search: str | None = None,
+        input_search: str | None = None,
+    ) -> int:
+        stmt = select(func.count(tasks_table.c.id))
+        condition = task_search_condition(column_search, input_search)
+        if condition is not None:
+            stmt = stmt.where(condition)
+        result = await self.session.execute(stmt)
+        return result.scalar() or 0
+
+    async def get_tasks_keyset(
+        self,
+        column: str = 'title',
+        sort: str = 'desc',
+        limit: int = 10,
+        after: Optional[tuple] = None,
+        before: Optional[tuple] = None,
+        backward: bool = False,
+        column_search: str | None = None,
+        input_search: str | None = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> tuple[list[SchemaTask], bool]:
+        """
+        Страница задач по ключу (column, id) без OFFSET и без count(*).
+
+        after/before — ключи (значение column, id) границ, строки строго между ними.
+        backward=False — первые limit строк после after, True — последние limit
+        строк перед before (в порядке сортировки). Возвращает задачи и признак,
+        что за limit есть еще строки в направлении чтения.
+        """
+        columns = task_columns(fields)
+        task_column = tasks_table.c[column]
+        key = tuple_(task_column, tasks_table.c.id)
+        key_types = (task_column.type, tasks_table.c.id.type)
+        descending = sort.lower() == 'desc'
+
+        stmt = select(*columns)
+        condition = task_search_condition(column_search, input_search)
+        if condition is not None:
+            stmt = stmt.where(condition)
+        if after is not None:
+            after_key = tuple_(*self._key_values(column, after), types=key_types)
+            stmt = stmt.where(key < after_key if descending else key > after_key)
+        if before is not None:
+            before_key = tuple_(*self._key_values(column, before), types=key_types)
+            stmt = stmt.where(key > before_key if descending else key < before_key)
+
+        # назад — обратный порядок, затем разворот: индекс (column, id) читается с другого конца
+        if descending != backward:
+            stmt = stmt.order_by(task_column.desc(), tasks_table.c.id.desc())
+        else:
+            stmt = stmt.order_by(task_column.asc(), tasks_table.c.id.asc())
+        # лишняя строка — признак следующей страницы
+        stmt = stmt.limit(limit + 1)
+
+        result = await self.session.execute(stmt)
+        to_schema = rows_mapper(columns)
+        tasks = [to_schema(row) for row in result.mappings()]
+        has_more = len(tasks) > limit
+        tasks = tasks[:limit]
+        if backward:
+            tasks.reverse()
+        return tasks, has_more
+
+    @staticmethod
+    def _key_values(column: str, key: tuple) -> tuple:
+        value, task_id = key
+        if column == 'status':
+            value = TaskStatus(value)
+        return value, task_id
+
     async def create_task(
         self,
         task: TaskCreate,
@@ -93,6 +262,29 @@ class TaskRepository:
         await self.session.refresh(task)
         return task
 
+    async def create_tasks(
+        self,
+        tasks: list[TaskCreate],
+        task_ids: Optional[list[str]] = None,
+    ) -> list[SchemaTask]:
+        """
+        Пакетное создание задач без ORM-объектов: одна команда INSERT ... VALUES
+        на пачку строк (insertmanyvalues), без flush/refresh на каждую задачу.
+
+        С task_ids вставка идемпотентна (ON CONFLICT (id) DO NOTHING): возвращаются
+        только действительно созданные задачи, повторы пропускаются.
+        """
+        if not tasks:
+            return []
+        rows = [task.model_dump() for task in tasks]
+        stmt = insert(tasks_table)
+        if task_ids is not None:
+            for row, task_id in zip(rows, task_ids):
+                row['id'] = task_id
+            stmt = stmt.on_conflict_do_nothing(index_elements=[tasks_table.c.id])
+        result = await self.session.execute(stmt.returning(*TASK_READ_COLUMNS), rows)
+        return [row_to_schema(row) for row in result.mappings()]
+
     async def update_task(
         self,
         task: Task,
@@ -114,3 +306,37 @@ class TaskRepository:
         await self.session.delete(task)
         await self.session.flush()
 
+    async def stream_task_ids(self, batch_size: int = 10000) -> AsyncIterator[str]:
+        """Потоковое чтение всех ID задач пачками (серверный курсор)"""
+        stmt = select(tasks_table.c.id).execution_options(yield_per=batch_size)
+        result = await self.session.stream_scalars(stmt)
+        async for task_id in result:
+            yield task_id
+
+    async def notify_task_changed(self, channel: str, task_id: str, op: str, task: Optional[dict] = None) -> None:
+        """NOTIFY в текущей транзакции: доставляется слушателям только после commit"""
+        data = {'id': task_id, 'op': op, 'ts': time.time()}
+        if task is not None:
+            # данные задачи для подписок (полей немного: в предел NOTIFY 8000 байт укладываются)
+            data['task'] = task
+        payload = json.dumps(data)
+        await self.session.execute(select(func.pg_notify(channel, payload)))
+
+    async def notify_tasks_changed(
+        self,
+        channel: str,
+        task_ids: list[str],
+        op: str,
+        tasks: Optional[list[Optional[dict]]] = None,
+    ) -> None:
+        """NOTIFY для пачки задач одной командой"""
+        ts = time.time()
+        payloads = [
+            json.dumps({'id': task_id, 'op': op, 'ts': ts, **({'task': tasks[i]} if tasks and tasks[i] is not None else {})})
+            for i, task_id in enumerate(task_ids)
+        ]
+        stmt = text(
+            'SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload'
+        ).bindparams(bindparam('payloads', type_=ARRAY(Text)))
+        await self.session.execute(stmt, {'channel': channel, 'payloads': payloads})
+
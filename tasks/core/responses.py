@@ -0,0 +1,17 @@
+from typing import Any
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+class SchemaResponse(ORJSONResponse):
+    """
+    Ответ из доверенной pydantic-схемы (SchemaTask, TasksResponseSchema).
+
+    Схема сериализуется своим скомпилированным сериализатором (pydantic-core)
+    сразу в bytes: без повторной валидации response_model, jsonable_encoder
+    и stdlib json. Остальные значения сериализуются через orjson.
+    """
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return super().render(content)
@@ -1,9 +1,16 @@
+import re
 from pydantic import BaseModel, ConfigDict
 from typing import Annotated, List
 from annotated_types import MinLen, MaxLen
 from enum import Enum
 
 
+# ID задач — строковые uuid4 (см. core/models/base.py)
+TASK_ID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+def is_valid_task_id(task_id: str) -> bool:
+    return TASK_ID_PATTERN.match(task_id) is not None
+
 class TaskStatusEnum(str, Enum):
     CREATED = 'created'
     IN_PROGRESS = 'in_progress'
@@ -0,0 +1,90 @@
+import asyncio, argparse
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+from infrastructure.kafka.producer import _start_producer_with_retries
+from infrastructure.kafka.retry import (
+    RETRY_HEADERS,
+    HEADER_ORIGINAL_TOPIC,
+    HEADER_ERROR_CLASS,
+    get_header,
+)
+from core.config import settings
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+
+async def replay_dlq(limit: int | None, error_class: str | None, dry_run: bool) -> int:
+    """
+    Возвращает сообщения DLQ в исходный топик пачками.
+
+    Читает DLQ группой <GROUP_ID>.dlq_replay до конца на момент запуска,
+    отправляет исходные ключ и значение без заголовков повторов (счетчик
+    попыток сбрасывается) и подтверждает offset после подтверждения брокером.
+    """
+    consumer = AIOKafkaConsumer(
+        bootstrap_servers=settings.kafka.BOOTSTRAP,
+        group_id=f'{settings.kafka.GROUP_ID}.dlq_replay',
+        enable_auto_commit=False,
+        auto_offset_reset='earliest',
+    )
+    producer = AIOKafkaProducer(
+        bootstrap_servers=settings.kafka.BOOTSTRAP,
+        client_id=f'{settings.kafka.CLIENT_ID}_dlq_replay',
+        acks='all',
+        enable_idempotence=True,
+    )
+    await consumer.start()
+    await _start_producer_with_retries(producer)
+    replayed = 0
+    try:
+        partitions = [
+            TopicPartition(settings.kafka.DLQ_TOPIC, partition)
+            for partition in await producer.partitions_for(settings.kafka.DLQ_TOPIC)
+        ]
+        if not partitions:
+            logger.info('DLQ %s пуст или не существует', settings.kafka.DLQ_TOPIC)
+            return 0
+        consumer.assign(partitions)
+        # граница чтения фиксируется при запуске: новые сообщения DLQ не повторяются в цикле
+        end_offsets = await consumer.end_offsets(partitions)
+        remaining = {tp for tp in partitions if await consumer.position(tp) < end_offsets[tp]}
+        while remaining and (limit is None or replayed < limit):
+            records = await consumer.getmany(*remaining, timeout_ms=1000, max_records=settings.worker.BATCH_MAX_RECORDS)
+            futures, offsets = [], {}
+            for tp, messages in records.items():
+                for msg in messages:
+                    if msg.offset >= end_offsets[tp] or (limit is not None and replayed >= limit):
+                        remaining.discard(tp)
+                        break
+                    offsets[tp] = msg.offset + 1
+                    if error_class and get_header(msg, HEADER_ERROR_CLASS) != error_class:
+                        continue
+                    topic = get_header(msg, HEADER_ORIGINAL_TOPIC) or settings.kafka.TOPIC
+                    headers = [(key, value) for key, value in msg.headers or () if key not in RETRY_HEADERS]
+                    replayed += 1
+                    if not dry_run:
+                        futures.append(await producer.send(topic, value=msg.value, key=msg.key, headers=headers))
+            await asyncio.gather(*futures)
+            # с фильтром пропущенные сообщения не должны считаться повторенными
+            if offsets and not dry_run and not error_class:
+                await consumer.commit(offsets)
+            for tp in list(remaining):
+                if await consumer.position(tp) >= end_offsets[tp]:
+                    remaining.discard(tp)
+    finally:
+        await producer.stop()
+        await consumer.stop()
+    logger.info('Повторено сообщений из DLQ: %s%s', replayed, ' (dry run)' if dry_run else '')
+    return replayed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Повтор сообщений DLQ в исходный топик')
+    parser.add_argument('--limit', type=int, default=None, help='не больше N сообщений')
+    parser.add_argument('--error-class', default=None, help='только сообщения с этим классом ошибки (x-error-class); offset не подтверждаются')
+    parser.add_argument('--dry-run', action='store_true', help='только посчитать, без отправки и commit')
+    args = parser.parse_args()
+    asyncio.run(replay_dlq(args.limit, args.error_class, args.dry_run))
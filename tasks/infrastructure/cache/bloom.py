@@ -0,0 +1,171 @@
+import math, hashlib
+from typing import Optional
+from core.config import settings
+from core.metrics import metrics
+from core.schemas.tasks import is_valid_task_id
+from infrastructure.database.uow import unit_of_work
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('cache_logger')
+
+
+class BloomFilter:
+    """
+    Фильтр Блума для строковых ключей.
+
+    Размер битового массива и число хеш-функций вычисляются из ожидаемого
+    количества элементов и допустимой доли ложноположительных ответов.
+    Ложноотрицательных ответов не бывает.
+    """
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(capacity, 1)
+        self.false_positive_rate = false_positive_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # двойное хеширование: h1 + i * h2 вместо k независимых хеш-функций
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        # повторное добавление (локально и по NOTIFY) не искажает оценку заполнения
+        if added:
+            self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def estimated_false_positive_rate(self) -> float:
+        """Ожидаемая доля ложноположительных ответов при текущем заполнении"""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def stats(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'count': self.count,
+            'memory_bytes': len(self.bits),
+            'hashes': self.hashes,
+            'configured_false_positive_rate': self.false_positive_rate,
+            'estimated_false_positive_rate': self.estimated_false_positive_rate,
+        }
+
+
+class TaskIdFilter:
+    """
+    Фильтр существующих ID задач процесса.
+
+    Строится на старте потоковым чтением ID из БД и дополняется при создании задач
+    (локально и по NOTIFY от других процессов). Удаленные ID из фильтра Блума
+    не удаляются — для них ответ «возможно есть» и запрос идет в БД.
+    Фильтр отсекает запросы, только пока он построен и соединение LISTEN активно:
+    без него задачи, созданные worker и другими процессами, в фильтр не попадут,
+    поэтому с потери соединения до перестроения фильтр ничего не отсекает.
+    """
+    def __init__(self, capacity: int, false_positive_rate: float, batch_size: int):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.batch_size = batch_size
+        self._filter = BloomFilter(capacity, false_positive_rate)
+        # фильтр, который строится сейчас: новые ID пишутся в оба
+        self._building: Optional[BloomFilter] = None
+        self.ready = False
+        # потери соединения LISTEN: построение во время потери не делает фильтр готовым
+        self.disconnects = 0
+        self.checks = 0
+        self.rejected = 0
+
+    def add(self, task_id: str) -> None:
+        self._filter.add(task_id)
+        if self._building is not None:
+            self._building.add(task_id)
+
+    def might_exist(self, task_id: str) -> bool:
+        if not self.ready:
+            return True
+        self.checks += 1
+        if task_id in self._filter:
+            return True
+        self.rejected += 1
+        return False
+
+    async def rebuild(self) -> None:
+        disconnects = self.disconnects
+        building = BloomFilter(self.capacity, self.false_positive_rate)
+        self._building = building
+        try:
+            async with unit_of_work() as uow:
+                async for task_id in uow.tasks.stream_task_ids(self.batch_size):
+                    building.add(task_id)
+        finally:
+            self._building = None
+        self._filter = building
+        if self.disconnects != disconnects:
+            logger.warning('Соединение LISTEN потеряно при построении фильтра ID задач, фильтр не используется')
+            return
+        self.ready = True
+        if building.count > building.capacity:
+            logger.warning(
+                'Фильтр ID задач переполнен: %s из %s, ожидаемая доля ложноположительных %.4f',
+                building.count, building.capacity, building.estimated_false_positive_rate,
+            )
+        logger.info('Фильтр ID задач построен: %s ID, %s байт', building.count, len(building.bits))
+
+    def handle_notification(self, data: dict) -> None:
+        if data.get('op') == 'created':
+            self.add(data['id'])
+
+    async def resync(self) -> None:
+        # пока не было подписки, могли быть созданы задачи, которых нет в фильтре
+        await self.rebuild()
+
+    def disconnected(self) -> None:
+        # NOTIFY о задачах других процессов не приходят: «нет в фильтре» больше не значит «нет задачи»
+        self.disconnects += 1
+        self.ready = False
+
+    def stats(self) -> dict:
+        return {
+            **self._filter.stats(),
+            'ready': self.ready,
+            'disconnects': self.disconnects,
+            'checks': self.checks,
+            'rejected': self.rejected,
+        }
+
+
+task_id_filter: Optional[TaskIdFilter] = None
+if settings.bloom.ENABLED:
+    task_id_filter = TaskIdFilter(
+        capacity=settings.bloom.CAPACITY,
+        false_positive_rate=settings.bloom.FALSE_POSITIVE_RATE,
+        batch_size=settings.bloom.BUILD_BATCH_SIZE,
+    )
+    metrics.register('task_id_filter', task_id_filter.stats)
+
+
+def is_known_absent(task_id: str) -> bool:
+    """
+    Задачи с таким ID точно нет: ID некорректен или отсутствует в фильтре
+    (пока фильтр построен и подписка на NOTIFY активна). Проверка не обращается к БД.
+    """
+    if not is_valid_task_id(task_id):
+        return True
+    return task_id_filter is not None and not task_id_filter.might_exist(task_id)
@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from core.config import settings
+from core.metrics import metrics
+from core.schemas.tasks import SchemaTask
+
+
+# Признак отсутствия записи в кэше (в отличие от None — задачи нет в БД)
+MISS = object()
+
+
+class TaskCache:
+    """
+    Ограниченный LRU/TTL-кэш задач процесса.
+
+    Хранит и отрицательные записи (значение None — задачи с таким ID нет в БД)
+    с отдельным, более коротким TTL. Согласованность между процессами
+    обеспечивается инвалидацией через Postgres LISTEN/NOTIFY
+    (см. infrastructure/database/notifications.py).
+    """
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict[str, tuple[float, Optional[SchemaTask]]] = OrderedDict()
+        # растет при каждой инвалидации: запись, прочитанная из БД до инвалидации,
+        # не должна попасть в кэш после нее
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.last_invalidation_lag = 0.0
+        self.max_invalidation_lag = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, task_id: str) -> Optional[SchemaTask] | object:
+        """Задача, None (задачи нет в БД) или MISS (нет в кэше)"""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            self.misses += 1
+            return MISS
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[task_id]
+            self.misses += 1
+            return MISS
+        self._entries.move_to_end(task_id)
+        self.hits += 1
+        return value
+
+    def is_missing(self, task_id: str) -> bool:
+        """Есть ли действующая отрицательная запись для ID"""
+        entry = self._entries.get(task_id)
+        if entry is None or entry[1] is not None or entry[0] < time.monotonic():
+            return False
+        self.hits += 1
+        return True
+
+    def set(self, task_id: str, task: Optional[SchemaTask], generation: int) -> None:
+        if generation != self.generation:
+            return
+        ttl = self.ttl if task is not None else self.negative_ttl
+        self._entries[task_id] = (time.monotonic() + ttl, task)
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, task_id: str, sent_at: float | None = None) -> None:
+        """Удаляет запись; sent_at — время NOTIFY (unix), для расчета задержки инвалидации"""
+        self.generation += 1
+        self._entries.pop(task_id, None)
+        self.invalidations += 1
+        if sent_at is not None:
+            self.last_invalidation_lag = max(time.time() - sent_at, 0.0)
+            self.max_invalidation_lag = max(self.max_invalidation_lag, self.last_invalidation_lag)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def handle_notification(self, data: dict) -> None:
+        self.invalidate(data['id'], data.get('ts'))
+
+    async def resync(self) -> None:
+        # пока не было подписки, инвалидации могли потеряться
+        self.clear()
+
+    def disconnected(self) -> None:
+        # записи без инвалидаций живут не дольше TTL, очистка — при resync
+        pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'last_invalidation_lag_seconds': self.last_invalidation_lag,
+            'max_invalidation_lag_seconds': self.max_invalidation_lag,
+        }
+
+
+task_cache: Optional[TaskCache] = None
+if settings.cache.ENABLED:
+    task_cache = TaskCache(
+        max_size=settings.cache.MAX_SIZE,
+        ttl=settings.cache.TTL,
+        negative_ttl=settings.cache.NEGATIVE_TTL,
+    )
+    metrics.register('task_cache', task_cache.stats)
@@ -0,0 +1,115 @@
+import asyncio, json, asyncpg
+from fastapi import FastAPI
+from typing import AsyncGenerator, Protocol
+from contextlib import asynccontextmanager, suppress
+from core.config import settings
+from infrastructure.cache.task_cache import task_cache
+from infrastructure.cache.bloom import task_id_filter
+from infrastructure.database.task_broker import task_change_broker
+from core.metrics import metrics
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('database_logger')
+
+
+class TaskChangesSubscriber(Protocol):
+    def handle_notification(self, data: dict) -> None:
+        """Уведомление об изменении задачи: {'id', 'op', 'ts'}"""
+
+    async def resync(self) -> None:
+        """Соединение LISTEN (пере)установлено: уведомления могли быть потеряны"""
+
+    def disconnected(self) -> None:
+        """Соединение LISTEN потеряно: до resync уведомления не приходят"""
+
+
+class TaskChangesListener:
+    """
+    Одно соединение LISTEN на процесс: получает NOTIFY об изменениях задач
+    (отправляются в транзакции записи) и раздает их подписчикам процесса.
+    """
+    def __init__(self, dsn: str, channel: str):
+        self.dsn = dsn
+        self.channel = channel
+        self.subscribers: list[TaskChangesSubscriber] = []
+
+    def subscribe(self, subscriber: TaskChangesSubscriber) -> None:
+        self.subscribers.append(subscriber)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except Exception as e:
+            logger.exception('Некорректное уведомление об изменении задачи: %s', payload, exc_info=e)
+            return
+        for subscriber in self.subscribers:
+            try:
+                subscriber.handle_notification(data)
+            except Exception as e:
+                logger.exception('Ошибка обработки уведомления: %s', payload, exc_info=e)
+
+    async def _resync(self) -> None:
+        for subscriber in self.subscribers:
+            try:
+                await subscriber.resync()
+            except Exception as e:
+                logger.exception('Ошибка синхронизации подписчика %s', subscriber, exc_info=e)
+
+    def _disconnected(self) -> None:
+        for subscriber in self.subscribers:
+            try:
+                subscriber.disconnected()
+            except Exception as e:
+                logger.exception('Ошибка отключения подписчика %s', subscriber, exc_info=e)
+
+    async def run(self) -> None:
+        while True:
+            connection = None
+            subscribed = False
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(self.channel, self._on_notify)
+                subscribed = True
+                logger.info('Подписка на изменения задач: %s', self.channel)
+                # подписка активна до синхронизации, поэтому изменения не теряются
+                await self._resync()
+                while not connection.is_closed():
+                    await asyncio.sleep(settings.db.NOTIFY_RECONNECT_BACKOFF)
+                logger.warning('Соединение LISTEN закрыто, переподключение')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception('Ошибка соединения LISTEN', exc_info=e)
+            finally:
+                if subscribed:
+                    self._disconnected()
+                if connection is not None and not connection.is_closed():
+                    with suppress(Exception):
+                        await connection.close()
+            await asyncio.sleep(settings.db.NOTIFY_RECONNECT_BACKOFF)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    subscribers = [s for s in (task_cache, task_id_filter, task_change_broker) if s is not None]
+    if not subscribers:
+        yield
+        return
+    listener = TaskChangesListener(
+        dsn=settings.db.dsn,
+        channel=settings.db.NOTIFY_CHANNEL,
+    )
+    for subscriber in subscribers:
+        listener.subscribe(subscriber)
+    if task_change_broker is not None:
+        metrics.register('graphql_subscriptions', task_change_broker.stats)
+    listener_task = asyncio.create_task(listener.run())
+    try:
+        yield
+    finally:
+        listener_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener_task
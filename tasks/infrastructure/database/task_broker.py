@@ -0,0 +1,81 @@
+import asyncio
+from typing import AsyncIterator, Optional
+from core.config import settings
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('database_logger')
+
+
+class TooManySubscriptions(Exception):
+    """Достигнут предел подписок на изменения задач в процессе"""
+
+
+class TaskChangeBroker:
+    """
+    Раздача изменений задач подпискам GraphQL процесса.
+
+    Источник — общее для процесса соединение LISTEN (TaskChangesListener):
+    уведомление с данными задачи приходит один раз и раскладывается по очередям
+    подписок с подходящими операцией и статусом, число подписок не влияет
+    на число соединений с БД. Очередь подписки ограничена queue_size,
+    при переполнении вытесняются старые изменения.
+    """
+    def __init__(self, queue_size: int, max_subscriptions: int):
+        self.queue_size = queue_size
+        self.max_subscriptions = max_subscriptions
+        self.subscriptions: set[tuple[str, Optional[str], asyncio.Queue]] = set()
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def handle_notification(self, data: dict) -> None:
+        task = data.get('task')
+        if task is None:
+            return
+        self.received += 1
+        for op, status, queue in self.subscriptions:
+            if op != data['op'] or (status is not None and task.get('status') != status):
+                continue
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(task)
+            self.delivered += 1
+
+    async def resync(self) -> None:
+        # подписки получают только изменения после подключения: пропущенные не восстанавливаются
+        logger.info('Подписки GraphQL на изменения задач => %s', len(self.subscriptions))
+
+    def disconnected(self) -> None:
+        logger.warning('Подписки GraphQL не получают изменения до переподключения LISTEN')
+
+    async def listen(self, op: str, status: Optional[str] = None) -> AsyncIterator[dict]:
+        """Изменения задач операции op (created, updated, deleted) до отписки клиента"""
+        if len(self.subscriptions) >= self.max_subscriptions:
+            raise TooManySubscriptions(f'Подписок на изменения задач: {len(self.subscriptions)}')
+        subscription = (op, status, asyncio.Queue(maxsize=self.queue_size))
+        self.subscriptions.add(subscription)
+        try:
+            while True:
+                yield await subscription[2].get()
+        finally:
+            self.subscriptions.discard(subscription)
+
+    def stats(self) -> dict:
+        return {
+            'subscriptions': len(self.subscriptions),
+            'received': self.received,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+        }
+
+
+task_change_broker: Optional[TaskChangeBroker] = None
+if settings.subscriptions.ENABLED:
+    task_change_broker = TaskChangeBroker(
+        queue_size=settings.subscriptions.QUEUE_SIZE,
+        max_subscriptions=settings.subscriptions.MAX_SUBSCRIPTIONS,
+    )
@@ -2,6 +2,8 @@ from contextlib import asynccontextmanager
 from typing import AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.repositories.task import TaskRepository
+from core.repositories.outbox import OutboxRepository
+from core.repositories.consumer_offset import ConsumerOffsetRepository
 from .db_connect import async_session
 from sqlalchemy.exc import (
     SQLAlchemyError,
@@ -22,6 +24,8 @@ class UnitOfWork:
         self.session: AsyncSession = session
         # доступ ко всем репозиториям
         self.tasks: TaskRepository = TaskRepository(self.session)
+        self.outbox: OutboxRepository = OutboxRepository(self.session)
+        self.offsets: ConsumerOffsetRepository = ConsumerOffsetRepository(self.session)
 
     async def commit(self) -> None:
         await self.session.commit()
@@ -0,0 +1,272 @@
+import asyncio, time
+from typing import Awaitable, Callable, Optional
+from aiokafka import AIOKafkaConsumer, TopicPartition, ConsumerRecord, ConsumerRebalanceListener
+from core.metrics import metrics
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+BatchHandler = Callable[[list[ConsumerRecord]], Awaitable[None]]
+OffsetsLoader = Callable[[list[TopicPartition]], Awaitable[dict[TopicPartition, int]]]
+
+
+class OffsetTracker:
+    """
+    Учет обработанных offset по партициям.
+
+    Пачки одной партиции могут завершаться не по порядку, поэтому к подтверждению
+    отдается только непрерывный префикс: offset после последней пачки, все
+    предыдущие пачки которой уже обработаны.
+    """
+    def __init__(self):
+        # партиция -> [первый offset, следующий за последним, обработана] в порядке получения
+        self._ranges: dict[TopicPartition, list[list]] = {}
+        self._committed: dict[TopicPartition, int] = {}
+
+    def track(self, tp: TopicPartition, first: int, last: int) -> None:
+        self._ranges.setdefault(tp, []).append([first, last + 1, False])
+
+    def done(self, tp: TopicPartition, first: int) -> None:
+        for item in self._ranges.get(tp, ()):
+            if item[0] == first:
+                item[2] = True
+                return
+
+    def pending(self, tp: TopicPartition) -> int:
+        """Число сообщений партиции в необработанных пачках (по диапазонам offset)"""
+        return sum(item[1] - item[0] for item in self._ranges.get(tp, ()) if not item[2])
+
+    def commitable(self) -> dict[TopicPartition, int]:
+        """Снимает непрерывно обработанные пачки и возвращает offset к подтверждению"""
+        offsets = {}
+        for tp, ranges in self._ranges.items():
+            next_offset = None
+            while ranges and ranges[0][2]:
+                next_offset = ranges.pop(0)[1]
+            if next_offset is not None and next_offset != self._committed.get(tp):
+                offsets[tp] = next_offset
+                self._committed[tp] = next_offset
+        return offsets
+
+    def forget(self, partitions) -> None:
+        for tp in partitions:
+            self._ranges.pop(tp, None)
+            self._committed.pop(tp, None)
+
+
+class PartitionPauser:
+    """
+    Пауза партиций по нескольким независимым причинам (очередь партиции,
+    нагрузка на БД): партиция возобновляется, только когда снята последняя.
+    """
+    def __init__(self, consumer: AIOKafkaConsumer):
+        self.consumer = consumer
+        self._reasons: dict[TopicPartition, set[str]] = {}
+
+    def pause(self, tp: TopicPartition, reason: str) -> None:
+        reasons = self._reasons.setdefault(tp, set())
+        if not reasons:
+            self.consumer.pause(tp)
+        reasons.add(reason)
+
+    def resume(self, tp: TopicPartition, reason: str) -> None:
+        reasons = self._reasons.get(tp)
+        if not reasons or reason not in reasons:
+            return
+        reasons.discard(reason)
+        if not reasons:
+            del self._reasons[tp]
+            if tp in self.consumer.assignment():
+                self.consumer.resume(tp)
+
+    def paused(self, reason: str) -> set[TopicPartition]:
+        return {tp for tp, reasons in self._reasons.items() if reason in reasons}
+
+    def forget(self, partitions) -> None:
+        for tp in partitions:
+            self._reasons.pop(tp, None)
+
+
+class PartitionDispatcher:
+    """
+    Параллельная обработка партиций с сохранением порядка внутри партиции.
+
+    Для каждой партиции — своя очередь пачек и своя задача asyncio, которая
+    обрабатывает их последовательно. Общее число одновременно обрабатываемых
+    пачек ограничено семафором. Когда в очереди партиции накапливается
+    queue_size пачек, партиция ставится на паузу (consumer.pause), чтобы
+    не читать из Kafka больше, чем успеваем записать.
+    """
+    def __init__(
+        self,
+        consumer: AIOKafkaConsumer,
+        handler: BatchHandler,
+        concurrency: int,
+        queue_size: int,
+        commit_to_kafka: bool = True,
+        pauser: Optional[PartitionPauser] = None,
+    ):
+        self.consumer = consumer
+        self.pauser = pauser or PartitionPauser(consumer)
+        self.handler = handler
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.queue_size = queue_size
+        self.tracker = OffsetTracker()
+        # offset хранятся вне Kafka (в БД вместе с данными): commit в Kafka не нужен
+        self.commit_to_kafka = commit_to_kafka
+        self._queues: dict[TopicPartition, asyncio.Queue] = {}
+        self._workers: dict[TopicPartition, asyncio.Task] = {}
+        self._error: Optional[BaseException] = None
+        # пачек поставлено и еще не обработано (в очередях и в записи)
+        self.batches = 0
+
+    def submit(self, tp: TopicPartition, messages: list[ConsumerRecord]) -> None:
+        if self._error is not None:
+            raise self._error
+        if not messages:
+            return
+        self.tracker.track(tp, messages[0].offset, messages[-1].offset)
+        queue = self._queues.get(tp)
+        if queue is None:
+            queue = self._queues[tp] = asyncio.Queue()
+            self._workers[tp] = asyncio.create_task(self._run(tp, queue))
+        queue.put_nowait(messages)
+        self.batches += 1
+        if queue.qsize() >= self.queue_size:
+            self.pauser.pause(tp, 'queue')
+
+    async def _run(self, tp: TopicPartition, queue: asyncio.Queue) -> None:
+        while True:
+            messages = await queue.get()
+            try:
+                async with self.semaphore:
+                    await self.handler(messages)
+            except Exception as e:
+                # следующие пачки партиции не обрабатываем: offset не продвинется дальше ошибки
+                logger.exception('Ошибка обработки пачки => партиция: %s, offset: %s', tp, messages[0].offset, exc_info=e)
+                self._error = e
+                return
+            finally:
+                queue.task_done()
+                self.batches -= 1
+            self.tracker.done(tp, messages[0].offset)
+            if queue.qsize() < self.queue_size:
+                self.pauser.resume(tp, 'queue')
+
+    async def commit(self) -> None:
+        """Подтверждает обработанные offset; пробрасывает ошибку обработки партиции"""
+        if self._error is not None:
+            raise self._error
+        offsets = self.tracker.commitable()
+        if offsets and self.commit_to_kafka:
+            await self.consumer.commit(offsets)
+
+    async def drain(self, partitions=None) -> None:
+        """Ожидает обработки всех поставленных пачек (или только пачек partitions)"""
+        for tp, queue in list(self._queues.items()):
+            if partitions is not None and tp not in partitions:
+                continue
+            joined = asyncio.create_task(queue.join())
+            # упавшая задача партиции свою очередь уже не разберет
+            await asyncio.wait({joined, self._workers[tp]}, return_when=asyncio.FIRST_COMPLETED)
+            joined.cancel()
+
+    async def revoke(self, partitions, timeout: float) -> int:
+        """
+        Партиции отзываются при ребалансировке: дорабатываем их пачки не дольше
+        timeout, прерываем оставшиеся и подтверждаем обработанное. Возвращает
+        число прерванных сообщений — их повторно прочитает новый владелец.
+        """
+        partitions = [tp for tp in partitions if tp in self._queues]
+        if not partitions:
+            return 0
+        try:
+            await asyncio.wait_for(self.drain(partitions), timeout)
+        except asyncio.TimeoutError:
+            logger.warning('Пачки отзываемых партиций не обработаны за %s с, прерываем', timeout)
+        aborted = 0
+        for tp in partitions:
+            worker = self._workers.pop(tp)
+            self._queues.pop(tp)
+            if not worker.done():
+                worker.cancel()
+                await asyncio.gather(worker, return_exceptions=True)
+            aborted += self.tracker.pending(tp)
+        # ошибка другой партиции не мешает подтвердить непрерывный обработанный префикс
+        offsets = self.tracker.commitable()
+        if offsets and self.commit_to_kafka:
+            await self.consumer.commit(offsets)
+        self.tracker.forget(partitions)
+        self.pauser.forget(partitions)
+        return aborted
+
+    async def stop(self) -> None:
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+
+class WorkerRebalanceListener(ConsumerRebalanceListener):
+    """
+    Ребалансировка группы без лишней повторной обработки.
+
+    При отзыве партиций дорабатывает (не дольше revoke_timeout) или прерывает
+    их пачки и подтверждает offset до того, как партиции получит другой
+    участник. Последовательные циклы чтения держат lock на время обработки
+    пачки, параллельные — передают dispatcher. Если offset хранятся вне Kafka
+    (load_offsets), при назначении партиций consumer переходит к сохраненным
+    offset; партиции без них читаются по обычным правилам.
+    """
+    def __init__(
+        self,
+        consumer: AIOKafkaConsumer,
+        revoke_timeout: float,
+        load_offsets: Optional[OffsetsLoader] = None,
+        pauser: Optional[PartitionPauser] = None,
+    ):
+        self.consumer = consumer
+        self.revoke_timeout = revoke_timeout
+        self.load_offsets = load_offsets
+        self.pauser = pauser
+        self.dispatcher: Optional[PartitionDispatcher] = None
+        self.lock = asyncio.Lock()
+        self._revoked_at: Optional[float] = None
+
+    async def on_partitions_revoked(self, revoked) -> None:
+        self._revoked_at = time.monotonic()
+        if not revoked:
+            return
+        if self.dispatcher is not None:
+            aborted = await self.dispatcher.revoke(revoked, self.revoke_timeout)
+        else:
+            aborted = 0
+            try:
+                # текущая пачка дорабатывается и подтверждается до отзыва
+                await asyncio.wait_for(self.lock.acquire(), self.revoke_timeout)
+                self.lock.release()
+            except asyncio.TimeoutError:
+                logger.warning('Пачка не обработана за %s с до отзыва партиций', self.revoke_timeout)
+        if self.pauser is not None:
+            self.pauser.forget(revoked)
+        metrics.inc('worker_revoked_partitions', len(revoked))
+        metrics.inc('worker_revoke_aborted_messages', aborted)
+        logger.info('Партиции отозваны => %s, прервано сообщений: %s', len(revoked), aborted)
+
+    async def on_partitions_assigned(self, assigned) -> None:
+        if assigned and self.load_offsets is not None:
+            offsets = await self.load_offsets(list(assigned))
+            for tp, offset in offsets.items():
+                self.consumer.seek(tp, offset)
+            logger.info('Offset из хранилища => партиций: %s из %s', len(offsets), len(assigned))
+        if self._revoked_at is not None:
+            duration = time.monotonic() - self._revoked_at
+            self._revoked_at = None
+            metrics.inc('worker_rebalances')
+            metrics.inc('worker_rebalance_seconds_total', duration)
+            metrics.set('worker_last_rebalance_seconds', duration)
+            logger.info('Ребалансировка завершена за %.3f с => назначено партиций: %s', duration, len(assigned))
@@ -0,0 +1,146 @@
+import asyncio, time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from aiokafka import AIOKafkaConsumer
+from .consumer import PartitionPauser
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+
+class TokenBucket:
+    """
+    Ограничение скорости: rate токенов в секунду, не больше burst в запасе.
+    Запрос больше burst не блокируется навсегда — запас уходит в минус
+    и следующие запросы ждут, пока он восстановится.
+    """
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.waited = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+        if self.tokens < 0:
+            delay = -self.tokens / self.rate
+            self.waited += delay
+            await asyncio.sleep(delay)
+
+
+class FlowController:
+    """
+    Обратное давление worker при перегрузке БД.
+
+    Сигналы — время получения соединения из пула (скользящее среднее) и число
+    пачек в работе, поставленных в dispatcher (в очередях партиций и в записи).
+    Второй сигнал есть только при параллельной обработке: последовательный цикл
+    вызывает update между пачками, когда в записи ничего нет, и опирается
+    на ожидание пула. Выше порога все назначенные партиции основного consumer
+    ставятся на паузу; ниже resume_ratio от порога — возобновляются
+    (гистерезис, чтобы не переключаться на каждой пачке). Опционально
+    ограничивает скорость записи строк (TokenBucket), чтобы массовая
+    загрузка не забирала пул соединений у API.
+    """
+    def __init__(
+        self,
+        max_checkout_wait: float,
+        max_in_flight: int,
+        resume_ratio: float = 0.5,
+        rows_per_second: float = 0,
+        smoothing: float = 0.3,
+    ):
+        self.max_checkout_wait = max_checkout_wait
+        self.max_in_flight = max_in_flight
+        self.resume_ratio = resume_ratio
+        self.smoothing = smoothing
+        self.bucket = TokenBucket(rows_per_second) if rows_per_second else None
+        self.checkout_wait = 0.0
+        self._sampled_at = time.monotonic()
+        self.in_flight = 0
+        # пачек поставлено в PartitionDispatcher и еще не записано
+        self.backlog = 0
+        self.paused = False
+        self.pauses = 0
+        self.paused_seconds = 0.0
+        self._paused_at = 0.0
+
+    def record_checkout_wait(self, seconds: float) -> None:
+        self.checkout_wait += self.smoothing * (seconds - self.checkout_wait)
+        self._sampled_at = time.monotonic()
+
+    def _decay(self) -> None:
+        # на паузе записей нет и новых замеров тоже: без затухания пауза не снялась бы
+        now = time.monotonic()
+        self.checkout_wait *= 0.5 ** (now - self._sampled_at)
+        self._sampled_at = now
+
+    @asynccontextmanager
+    async def batch(self, rows: int) -> AsyncIterator[None]:
+        """Запись пачки из rows строк: ограничение скорости и учет пачек в записи"""
+        if self.bucket is not None and rows:
+            await self.bucket.acquire(rows)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    @property
+    def pending(self) -> int:
+        # в записи пачек не больше CONCURRENCY: порог сравнивается с очередью dispatcher
+        return max(self.in_flight, self.backlog)
+
+    def overloaded(self) -> bool:
+        return self.checkout_wait > self.max_checkout_wait or self.pending >= self.max_in_flight
+
+    def relieved(self) -> bool:
+        return (
+            self.checkout_wait <= self.max_checkout_wait * self.resume_ratio
+            and self.pending <= self.max_in_flight * self.resume_ratio
+        )
+
+    def update(self, consumer: AIOKafkaConsumer, pauser: PartitionPauser, backlog: int = 0) -> None:
+        """
+        Вызывается в цикле чтения: ставит на паузу или возобновляет партиции.
+        backlog — пачек в PartitionDispatcher (поставлено и не записано).
+        """
+        self.backlog = backlog
+        if self.in_flight == 0:
+            self._decay()
+        if not self.paused and self.overloaded():
+            self.paused = True
+            self.pauses += 1
+            self._paused_at = time.monotonic()
+            logger.warning('БД перегружена, чтение приостановлено => ожидание пула: %.3f с, пачек в работе: %s', self.checkout_wait, self.pending)
+        elif self.paused and self.relieved():
+            self.paused = False
+            self.paused_seconds += time.monotonic() - self._paused_at
+            for tp in pauser.paused('flow'):
+                pauser.resume(tp, 'flow')
+            logger.info('Нагрузка на БД снизилась, чтение возобновлено')
+        if self.paused:
+            # в том числе партиции, назначенные после начала паузы
+            for tp in consumer.assignment():
+                pauser.pause(tp, 'flow')
+
+    def stats(self) -> dict:
+        return {
+            'paused': self.paused,
+            'pauses': self.pauses,
+            'paused_seconds': self.paused_seconds,
+            'checkout_wait_seconds': self.checkout_wait,
+            'in_flight_batches': self.in_flight,
+            'backlog_batches': self.backlog,
+            'throttled_seconds': self.bucket.waited if self.bucket is not None else 0.0,
+        }
@@ -1,9 +1,13 @@
-import asyncio, json
+import asyncio
 from fastapi import FastAPI
 from typing import AsyncGenerator
 from contextlib import asynccontextmanager
 from aiokafka import AIOKafkaProducer
 from core.config import settings
+from .admin import bootstrap_topics
+from .partitioning import load_partitioner
+from .codec import get_codec
+from .publisher import EventPublisher, producer_options
 
 
 async def _start_producer_with_retries(producer: AIOKafkaProducer):
@@ -22,16 +26,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     producer = AIOKafkaProducer(
         bootstrap_servers=settings.kafka.BOOTSTRAP,
         client_id=settings.kafka.CLIENT_ID,
-        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+        partitioner=load_partitioner(settings.kafka.PARTITIONER),
+        **producer_options(settings.kafka.PRODUCER_PROFILE),
     )
     # startup
+    await bootstrap_topics([settings.kafka.TOPIC])
     await _start_producer_with_retries(producer)
     app.state.kafka_producer = producer
+    app.state.kafka_publisher = EventPublisher(
+        producer,
+        ack_mode=settings.kafka.PRODUCER_ACK_MODE,
+        max_pending=settings.kafka.PRODUCER_MAX_PENDING,
+        codec=get_codec(settings.kafka.EVENT_CODEC),
+    )
     app.state.kafka_producer_available = True
     try:
         yield
     finally:
-        # shutdown
+        # shutdown: stop() дожидается отправки событий, принятых в режиме enqueued
         try:
             await producer.stop()
         except Exception:
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Optional
+from aiokafka import AIOKafkaProducer
+from .codec import EventCodec, JsonCodec, event_headers
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+# профили producer: задержка ответа против событий в секунду
+PRODUCER_PROFILES: dict[str, dict] = {
+    # каждое событие — отдельный запрос к брокеру, без сжатия
+    'latency': {
+        'linger_ms': 0,
+        'max_batch_size': 16384,
+        'compression_type': None,
+        'acks': 1,
+        'enable_idempotence': False,
+    },
+    'balanced': {
+        'linger_ms': 5,
+        'max_batch_size': 65536,
+        'compression_type': 'lz4',
+        'acks': 'all',
+        'enable_idempotence': True,
+    },
+    # крупные сжатые пачки; повтор отправки без идемпотентности
+    # может дать дубликат — worker отсекает его по event_id
+    'throughput': {
+        'linger_ms': 20,
+        'max_batch_size': 262144,
+        'compression_type': 'zstd',
+        'acks': 1,
+        'enable_idempotence': False,
+    },
+}
+
+ACK_MODES = ('broker', 'enqueued')
+
+
+def producer_options(profile: str) -> dict:
+    if profile not in PRODUCER_PROFILES:
+        raise ValueError(f'Неизвестный профиль producer: {profile}')
+    return dict(PRODUCER_PROFILES[profile])
+
+
+class EventPublisher:
+    """
+    Отправка событий с выбранным режимом подтверждения.
+
+    broker — ответ после подтверждения брокером (send_and_wait).
+    enqueued — ответ, как только событие добавлено в пачку producer:
+    запрос не ждет сетевого обмена, но ошибка доставки уже не вернется
+    клиенту, а только попадет в лог. Число неподтвержденных событий
+    ограничено max_pending: при заполнении буфера запрос ждет, как в режиме broker.
+
+    Событие кодируется codec, формат и версия схемы — в заголовках сообщения.
+    """
+    def __init__(
+        self,
+        producer: AIOKafkaProducer,
+        ack_mode: str,
+        max_pending: int,
+        codec: Optional[EventCodec] = None,
+    ):
+        if ack_mode not in ACK_MODES:
+            raise ValueError(f'Неизвестный режим подтверждения: {ack_mode}')
+        self.producer = producer
+        self.ack_mode = ack_mode
+        self.codec = codec or JsonCodec()
+        self.headers = event_headers(self.codec)
+        self.semaphore = asyncio.Semaphore(max_pending)
+        self.failed = 0
+
+    @property
+    def waits_for_broker(self) -> bool:
+        return self.ack_mode == 'broker'
+
+    async def publish(self, topic: str, value: dict, key: Optional[bytes] = None) -> None:
+        value = self.codec.encode(value)
+        if self.waits_for_broker:
+            await self.producer.send_and_wait(topic, value=value, key=key, headers=self.headers)
+            return
+        await self.semaphore.acquire()
+        try:
+            future = await self.producer.send(topic, value=value, key=key, headers=self.headers)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        future.add_done_callback(self._delivered)
+
+    def _delivered(self, future: asyncio.Future) -> None:
+        self.semaphore.release()
+        if future.cancelled():
+            self.failed += 1
+            return
+        if future.exception() is not None:
+            self.failed += 1
+            logger.error('Событие не доставлено в Kafka после ответа клиенту', exc_info=future.exception())
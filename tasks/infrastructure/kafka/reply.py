@@ -0,0 +1,98 @@
+import asyncio
+from typing import Any, Optional
+from aiokafka import AIOKafkaProducer
+from .codec import EventCodec, event_headers
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+# (correlation_id, топик ответа)
+ReplyTarget = tuple[str, str]
+
+
+def reply_target(data: Any) -> Optional[ReplyTarget]:
+    """Куда отвечать на событие: correlation_id и reply_to, проставленные gateway"""
+    if not isinstance(data, dict):
+        return None
+    correlation_id, reply_to = data.get('correlation_id'), data.get('reply_to')
+    if isinstance(correlation_id, str) and correlation_id and isinstance(reply_to, str) and reply_to:
+        return correlation_id, reply_to
+    return None
+
+
+class TaskReplies:
+    """
+    Итоги обработки пачки событий для топиков ответов.
+
+    Ответ отправляется только на окончательный итог: задача записана (created,
+    в том числе повторно доставленное событие) или сообщение ушло в DLQ (failed).
+    Сообщения в топиках задержки получат ответ после повтора.
+    """
+    def __init__(self):
+        self.targets: dict[str, list[ReplyTarget]] = {}
+        self.outcomes: list[tuple[ReplyTarget, dict]] = []
+
+    def expect(self, task_id: str, data: dict) -> None:
+        target = reply_target(data)
+        if target is not None:
+            self.targets.setdefault(task_id, []).append(target)
+
+    def _add(self, target: ReplyTarget, status: str, task_id: Optional[str], error: Optional[BaseException]) -> None:
+        outcome = {'correlation_id': target[0], 'status': status, 'task_id': task_id}
+        if error is not None:
+            outcome['error'] = f'{type(error).__name__}: {error}'[:1000]
+        self.outcomes.append((target, outcome))
+
+    def created(self, task_ids) -> None:
+        for task_id in task_ids:
+            for target in self.targets.pop(task_id, ()):
+                self._add(target, 'created', task_id, None)
+
+    def failed(self, task_id: str, error: BaseException) -> None:
+        for target in self.targets.pop(task_id, ()):
+            self._add(target, 'failed', task_id, error)
+
+    def invalid(self, data: Any, error: BaseException) -> None:
+        """Событие не прошло проверку: ID задачи нет, отвечаем по correlation_id"""
+        target = reply_target(data)
+        if target is not None:
+            self._add(target, 'failed', None, error)
+
+
+class ReplyPublisher:
+    """Отправка итогов в топики ответов; ошибка отправки не влияет на обработку пачки"""
+    def __init__(self, producer: AIOKafkaProducer, codec: EventCodec):
+        self.producer = producer
+        self.codec = codec
+        self.headers = event_headers(codec)
+        self.sent = 0
+        self.failed = 0
+
+    async def send(self, outcomes: list[tuple[ReplyTarget, dict]]) -> None:
+        if not outcomes:
+            return
+        try:
+            futures = [
+                await self.producer.send(
+                    reply_to,
+                    value=self.codec.encode(outcome),
+                    key=correlation_id.encode(),
+                    headers=self.headers,
+                )
+                for (correlation_id, reply_to), outcome in outcomes
+            ]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(outcomes)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        self.sent += len(results) - len(errors)
+        self.failed += len(errors)
+        if errors:
+            # клиент не получит ответа и увидит задачу через GET /tasks/
+            logger.warning('Ответы не отправлены => %s, %s: %s', len(errors), type(errors[0]).__name__, errors[0])
+
+    def stats(self) -> dict:
+        return {'sent': self.sent, 'failed': self.failed}
@@ -0,0 +1,114 @@
+import time, traceback
+from typing import Optional
+from aiokafka import AIOKafkaProducer, ConsumerRecord
+from pydantic import ValidationError
+from sqlalchemy.exc import OperationalError, TimeoutError as DBTimeoutError
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+# заголовки сообщений повторной обработки и DLQ
+HEADER_ATTEMPT = 'x-retry-attempt'
+HEADER_NOT_BEFORE = 'x-retry-not-before'
+HEADER_ORIGINAL_TOPIC = 'x-original-topic'
+HEADER_ORIGINAL_PARTITION = 'x-original-partition'
+HEADER_ORIGINAL_OFFSET = 'x-original-offset'
+HEADER_ERROR_CLASS = 'x-error-class'
+HEADER_ERROR_MESSAGE = 'x-error-message'
+HEADER_ERROR_TRACE = 'x-error-trace'
+HEADER_FAILED_AT = 'x-failed-at'
+RETRY_HEADERS = {
+    HEADER_ATTEMPT, HEADER_NOT_BEFORE, HEADER_ERROR_CLASS,
+    HEADER_ERROR_MESSAGE, HEADER_ERROR_TRACE, HEADER_FAILED_AT,
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Временная ли ошибка: недоступность или таймаут БД стоит повторить позже,
+    некорректные данные (JSON, схема, целостность) — нет.
+    Таймаут пула соединений unit_of_work пробрасывает как sqlalchemy.exc.TimeoutError.
+    """
+    if isinstance(error, (ValueError, KeyError, TypeError, ValidationError)):
+        return False
+    return isinstance(error, (
+        ConnectionError, TimeoutError, OSError, RuntimeError,
+        DBTimeoutError, OperationalError,
+    ))
+
+
+def get_header(msg: ConsumerRecord, name: str) -> Optional[str]:
+    for key, value in msg.headers or ():
+        if key == name:
+            return value.decode()
+    return None
+
+
+def message_attempt(msg: ConsumerRecord) -> int:
+    return int(get_header(msg, HEADER_ATTEMPT) or 0)
+
+
+def message_due_at(msg: ConsumerRecord) -> float:
+    """Время, раньше которого сообщение из топика задержки не обрабатывается"""
+    return float(get_header(msg, HEADER_NOT_BEFORE) or 0)
+
+
+def retry_topic_name(topic: str, delay: int) -> str:
+    return f'{topic}.retry.{delay}s'
+
+
+class RetryRouter:
+    """
+    Маршрутизация сообщений, которые не удалось обработать.
+
+    Временные ошибки — в топики задержки по возрастанию (например, 1s/30s/5m),
+    после последнего — в DLQ. Постоянные ошибки — сразу в DLQ. Сообщение DLQ
+    несет исходные ключ и значение, а в заголовках — исходную позицию,
+    класс и текст ошибки и число попыток.
+    """
+    def __init__(self, producer: AIOKafkaProducer, topic: str, delays: list[int], dlq_topic: str):
+        self.producer = producer
+        self.topic = topic
+        self.delays = delays
+        self.dlq_topic = dlq_topic
+
+    @property
+    def retry_topics(self) -> list[tuple[str, int]]:
+        return [(retry_topic_name(self.topic, delay), delay) for delay in self.delays]
+
+    def _headers(self, msg: ConsumerRecord, extra: dict[str, str]) -> list[tuple[str, bytes]]:
+        headers = {key: value for key, value in msg.headers or () if key not in RETRY_HEADERS}
+        # исходная позиция — только при первом сбое, дальше переносится как есть
+        headers.setdefault(HEADER_ORIGINAL_TOPIC, msg.topic.encode())
+        headers.setdefault(HEADER_ORIGINAL_PARTITION, str(msg.partition).encode())
+        headers.setdefault(HEADER_ORIGINAL_OFFSET, str(msg.offset).encode())
+        headers.update({key: value.encode() for key, value in extra.items()})
+        return list(headers.items())
+
+    async def route(self, msg: ConsumerRecord, error: BaseException) -> str:
+        """Отправляет сообщение в следующий топик задержки или в DLQ; возвращает топик"""
+        attempt = message_attempt(msg)
+        if is_retryable(error) and attempt < len(self.delays):
+            delay = self.delays[attempt]
+            topic = retry_topic_name(self.topic, delay)
+            headers = self._headers(msg, {
+                HEADER_ATTEMPT: str(attempt + 1),
+                HEADER_NOT_BEFORE: str(time.time() + delay),
+                HEADER_ERROR_CLASS: type(error).__name__,
+                HEADER_ERROR_MESSAGE: str(error)[:1000],
+            })
+        else:
+            topic = self.dlq_topic
+            headers = self._headers(msg, {
+                HEADER_ATTEMPT: str(attempt),
+                HEADER_ERROR_CLASS: type(error).__name__,
+                HEADER_ERROR_MESSAGE: str(error)[:1000],
+                HEADER_ERROR_TRACE: ''.join(traceback.format_exception(error))[-4000:],
+                HEADER_FAILED_AT: str(time.time()),
+            })
+        await self.producer.send_and_wait(topic, value=msg.value, key=msg.key, headers=headers)
+        logger.warning('Сообщение перенаправлено => из: %s[%s]@%s, в: %s, попытка: %s, ошибка: %s', msg.topic, msg.partition, msg.offset, topic, attempt, type(error).__name__)
+        return topic
@@ -1,11 +1,14 @@
 import uvicorn, strawberry
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
 from api_v1.rest import router as rest_api_router_v1
-from infrastructure.kafka.producer import lifespan
+from infrastructure.kafka.producer import lifespan as kafka_lifespan
+from infrastructure.database.notifications import lifespan as notifications_lifespan
+from contextlib import asynccontextmanager
 from strawberry.fastapi import GraphQLRouter
-from api_v1.graphql.tasks.resolvers import Mutation, Query
+from api_v1.graphql.tasks.resolvers import Mutation, Query, Subscription
 from api_v1.graphql.context import get_context_wrapper
 
 import logging.config
@@ -13,11 +16,18 @@ from core.logger import logger_config
 
 logging.config.dictConfig(logger_config)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with kafka_lifespan(app), notifications_lifespan(app):
+        yield
+
 app = FastAPI(
     title='Tasks API',
     description='API for tasks',
     version='1.0.0',
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url=None,
     redoc_url=None,
     openapi_url=None
@@ -35,7 +45,8 @@ app.include_router(router=rest_api_router_v1, prefix=settings.api_v1_prefix)
 
 schema = strawberry.Schema(
     query=Query,
-    mutation=Mutation
+    mutation=Mutation,
+    subscription=Subscription,
 )
 graphql_app = GraphQLRouter(
     schema=schema,
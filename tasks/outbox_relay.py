@@ -0,0 +1,76 @@
+import asyncio, json
+from aiokafka import AIOKafkaProducer
+from infrastructure.database.uow import unit_of_work
+from infrastructure.kafka.producer import _start_producer_with_retries
+from core.config import settings
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+
+def build_message(event) -> dict:
+    return {
+        'event': event['event_type'],
+        'event_id': event['id'],
+        'occurred_at': event['created_at'].isoformat(),
+        'task': event['payload'],
+    }
+
+async def relay_batch(producer: AIOKafkaProducer) -> int:
+    """
+    Публикует одну пачку событий outbox и удаляет их в той же транзакции.
+
+    Строки заблокированы (FOR UPDATE SKIP LOCKED) до commit, поэтому несколько
+    relay не публикуют одно событие дважды. При ошибке Kafka транзакция
+    откатывается и пачка будет отправлена повторно (at-least-once, event_id для дедупликации).
+    """
+    async with unit_of_work() as uow:
+        events = await uow.outbox.lock_batch(settings.outbox.BATCH_SIZE)
+        if not events:
+            return 0
+        # send() только кладет сообщение в батч producer; ждем подтверждения всех разом
+        futures = [
+            await producer.send(
+                settings.kafka.CHANGES_TOPIC,
+                value=build_message(event),
+                key=event['aggregate_id'].encode(),
+            )
+            for event in events
+        ]
+        await asyncio.gather(*futures)
+        await uow.outbox.delete_events([event['id'] for event in events])
+    logger.info('Опубликовано событий из outbox: %s', len(events), extra={
+        'tags': {'topic': settings.kafka.CHANGES_TOPIC, 'batch': len(events)}
+    })
+    return len(events)
+
+async def run_outbox_relay():
+    producer = AIOKafkaProducer(
+        bootstrap_servers=settings.kafka.BOOTSTRAP,
+        client_id=f'{settings.kafka.CLIENT_ID}_outbox',
+        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+        acks='all',
+        enable_idempotence=True,
+        linger_ms=settings.outbox.LINGER_MS,
+        max_batch_size=settings.outbox.MAX_BATCH_SIZE,
+        compression_type=settings.outbox.COMPRESSION,
+    )
+    await _start_producer_with_retries(producer)
+    try:
+        while True:
+            try:
+                published = await relay_batch(producer)
+            except Exception as e:
+                logger.exception('Ошибка публикации outbox', exc_info=e)
+                published = 0
+            # полная пачка — скорее всего есть еще, читаем сразу
+            if published < settings.outbox.BATCH_SIZE:
+                await asyncio.sleep(settings.outbox.POLL_INTERVAL)
+    finally:
+        await producer.stop()
+
+if __name__ == '__main__':
+    asyncio.run(run_outbox_relay())
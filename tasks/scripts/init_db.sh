@@ -23,7 +23,10 @@ if PGPASSWORD="${TASKS_DB_PASS}" psql -h "${TASKS_DB_HOST}" -U "${TASKS_DB_USER}
     poetry run alembic upgrade head
     echo "Миграции успешно применены!"
   else
-    echo "База данных уже инициализирована."
+    echo "База данных уже инициализирована. Применяем новые миграции..."
+    cd /app
+    export PYTHONPATH=/app
+    poetry run alembic upgrade head
   fi
 else
   # Если базы нет - создаем и инициализируем
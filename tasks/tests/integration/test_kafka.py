@@ -60,3 +60,4 @@ class TestTaskKafkaIntegration:
         assert received is not None
         assert received['event'] == 'TaskModuleCreation'
         assert received['task']['title'] == 'Create Task'
+        assert received['correlation_id'] == data_response_task['correlation_id']
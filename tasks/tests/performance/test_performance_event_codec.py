@@ -0,0 +1,65 @@
+import pytest, json, time, uuid
+from core.schemas.tasks import TaskCreate
+from infrastructure.kafka.codec import CODECS, decode_event, event_headers
+
+
+class TestPerformanceEventCodec:
+    """
+    Кодирование событий задач: прежний путь (json.dumps/json.loads)
+    против кодеков с заголовками формата (orjson, MessagePack).
+    Размер сообщения и событий в секунду на кодирование и декодирование
+    с валидацией задачи, как в worker.
+    """
+    ITERATIONS = 20000
+
+    @classmethod
+    def setup_class(cls):
+        cls.events = [
+            {
+                'event': 'TaskCreation',
+                'event_id': str(uuid.uuid4()),
+                'task': {'title': f'Benchmark task {i}', 'description': 'Benchmark description'},
+            }
+            for i in range(100)
+        ]
+
+    def measure(self, encode, decode) -> tuple[int, float, float]:
+        """Возвращает (средний размер в байтах, кодирований в секунду, декодирований в секунду)"""
+        encoded = [encode(event) for event in self.events]
+        size = sum(len(value) for value in encoded) // len(encoded)
+        rounds = self.ITERATIONS // len(self.events)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for event in self.events:
+                encode(event)
+        encode_rate = self.ITERATIONS / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for value in encoded:
+                TaskCreate.model_validate(decode(value)['task'])
+        decode_rate = self.ITERATIONS / (time.perf_counter() - start)
+        return size, encode_rate, decode_rate
+
+    @pytest.mark.parametrize('name', list(CODECS))
+    def test_event_codec_size_and_cpu(self, name: str):
+        codec = CODECS[name]
+        headers = event_headers(codec)
+
+        def encode(event):
+            return codec.encode(event)
+
+        def decode(value):
+            return decode_event(value, headers)
+
+        assert decode(encode(self.events[0])) == self.events[0]
+
+        legacy = self.measure(lambda event: json.dumps(event).encode('utf-8'), json.loads)
+        current = self.measure(encode, decode)
+
+        print(
+            f'{name}: json.dumps {legacy[0]} Б, {legacy[1]:.0f} enc/с, {legacy[2]:.0f} dec/с; '
+            f'{codec.content_type} {current[0]} Б, {current[1]:.0f} enc/с, {current[2]:.0f} dec/с'
+        )
+        assert current[0] <= legacy[0]
@@ -0,0 +1,59 @@
+import pytest, time
+from typing import AsyncIterator
+from sqlalchemy import select, func, delete
+from core.models.task import Task
+from core.repositories.task import TaskRepository
+from core.schemas.tasks import TaskCreate, TasksResponseSchema
+
+
+class TestPerformanceReadPath:
+    """
+    Сравнение CPU на запрос для списка задач (limit=100):
+    ORM-объекты + from_attributes против чтения колонок без ORM.
+    """
+    LIMIT = 100
+    ITERATIONS = 50
+
+    async def _orm_page(self, session, limit: int) -> TasksResponseSchema:
+        """Прежний путь чтения: полные объекты Task и повторная валидация"""
+        total = (await session.execute(select(func.count(Task.id)))).scalar() or 0
+        stmt = select(Task).order_by(Task.title.desc()).limit(limit).offset(0)
+        tasks = (await session.execute(stmt)).scalars().all()
+        page = TasksResponseSchema(
+            pages_count=(total + limit - 1) // limit,
+            total=total,
+            tasks=tasks,
+        )
+        # как в отдельном запросе: identity map не переживает сессию
+        session.expunge_all()
+        return page
+
+    async def _measure(self, call) -> float:
+        """CPU (мс) на один запрос, усредненное по ITERATIONS"""
+        start = time.process_time()
+        for _ in range(self.ITERATIONS):
+            page = await call()
+            page.model_dump_json()
+        return (time.process_time() - start) * 1000 / self.ITERATIONS
+
+    @pytest.mark.asyncio
+    async def test_list_cpu_per_request(self, testing_db_connection: AsyncIterator):
+        session = testing_db_connection.session
+        repo = TaskRepository(session)
+        created = [
+            await repo.create_task(TaskCreate(title=f'Perf task {i}'))
+            for i in range(self.LIMIT)
+        ]
+        session.expunge_all()
+
+        try:
+            orm_ms = await self._measure(lambda: self._orm_page(session, self.LIMIT))
+            lean_ms = await self._measure(lambda: repo.get_tasks(limit=self.LIMIT))
+
+            lean_page = await repo.get_tasks(limit=self.LIMIT)
+            assert len(lean_page.tasks) == self.LIMIT
+        finally:
+            # фикстура фиксирует транзакцию: созданные строки не остаются в общей БД
+            await session.execute(delete(Task).where(Task.id.in_([task.id for task in created])))
+
+        print(f'CPU на запрос (limit={self.LIMIT}): ORM {orm_ms:.2f} мс, без ORM {lean_ms:.2f} мс')
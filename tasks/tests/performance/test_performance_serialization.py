@@ -0,0 +1,65 @@
+import pytest, time, tracemalloc, uuid
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from core.responses import SchemaResponse
+from core.schemas.tasks import SchemaTask, TasksResponseSchema, TaskStatusEnum
+
+
+class TestPerformanceSerialization:
+    """
+    Сравнение сериализации ответов: путь FastAPI по умолчанию
+    (валидация response_model + jsonable_encoder + stdlib json)
+    против SchemaResponse (скомпилированный сериализатор схемы).
+    """
+    ITERATIONS = 2000
+
+    @classmethod
+    def setup_class(cls):
+        cls.task = SchemaTask.model_construct(
+            id=str(uuid.uuid4()),
+            title='Benchmark task',
+            description='Benchmark description',
+            status=TaskStatusEnum.IN_PROGRESS,
+        )
+        cls.page = TasksResponseSchema.model_construct(
+            pages_count=1,
+            total=100,
+            tasks=[cls.task.model_copy(update={'id': str(uuid.uuid4())}) for _ in range(100)],
+        )
+
+    @staticmethod
+    def default_render(model) -> bytes:
+        """Эквивалент serialize_response + JSONResponse"""
+        validated = type(model).model_validate(model.model_dump())
+        return JSONResponse(jsonable_encoder(validated.model_dump())).body
+
+    @staticmethod
+    def fast_render(model) -> bytes:
+        return SchemaResponse(model).body
+
+    def measure(self, render, model) -> tuple[float, int]:
+        """Возвращает (ответов в секунду, пик выделенной памяти в байтах на ответ)"""
+        start = time.perf_counter()
+        for _ in range(self.ITERATIONS):
+            render(model)
+        throughput = self.ITERATIONS / (time.perf_counter() - start)
+
+        tracemalloc.start()
+        render(model)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return throughput, peak
+
+    @pytest.mark.parametrize('case', ['single', 'list_100'])
+    def test_serialization_throughput(self, case: str):
+        model = self.task if case == 'single' else self.page
+
+        assert self.fast_render(model) == self.default_render(model)
+
+        default_rps, default_peak = self.measure(self.default_render, model)
+        fast_rps, fast_peak = self.measure(self.fast_render, model)
+
+        print(
+            f'{case}: JSONResponse {default_rps:.0f} отв/с, {default_peak} Б; '
+            f'SchemaResponse {fast_rps:.0f} отв/с, {fast_peak} Б'
+        )
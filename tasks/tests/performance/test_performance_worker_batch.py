@@ -0,0 +1,96 @@
+import pytest, time, json, uuid
+from aiokafka import TopicPartition, ConsumerRecord
+from sqlalchemy import delete
+from core.models import Task
+from infrastructure.database.uow import unit_of_work
+from worker import handle_task_creation_message, handle_task_creation_batch
+
+
+class InMemoryConsumer:
+    """Замена AIOKafkaConsumer: считает вызовы commit вместо обращения к брокеру"""
+    def __init__(self):
+        self.commits = 0
+        self.committed: dict[TopicPartition, int] = {}
+
+    async def commit(self, offsets: dict[TopicPartition, int]) -> None:
+        self.commits += 1
+        self.committed.update(offsets)
+
+
+def make_records(count: int, partitions: int = 4) -> dict[TopicPartition, list[ConsumerRecord]]:
+    """
+    Сообщения с новыми event_id: ID задачи берется из event_id, без него —
+    из позиции сообщения, и повторный прогон тех же позиций ничего бы не вставил.
+    """
+    records: dict[TopicPartition, list[ConsumerRecord]] = {}
+    for i in range(count):
+        partition = i % partitions
+        tp = TopicPartition('task_events', partition)
+        value = json.dumps({
+            'event': 'TaskCreate',
+            'event_id': str(uuid.uuid4()),
+            'task': {'title': f'Batch task {i}'},
+        }).encode()
+        records.setdefault(tp, []).append(ConsumerRecord(
+            topic=tp.topic, partition=partition, offset=len(records.get(tp, [])),
+            timestamp=0, timestamp_type=0, key=None, value=value, checksum=None,
+            serialized_key_size=0, serialized_value_size=len(value), headers=(),
+        ))
+    return records
+
+
+class TestPerformanceWorkerBatch:
+    """
+    Пропускная способность worker: по одному сообщению (транзакция и commit
+    на каждое) против пачки (один INSERT и один commit offset на пачку).
+    """
+    MESSAGES = 1000
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def _ordered(records: dict[TopicPartition, list[ConsumerRecord]]) -> list[ConsumerRecord]:
+        return sorted((m for batch in records.values() for m in batch), key=lambda m: m.offset)
+
+    @staticmethod
+    def _task_ids(messages: list[ConsumerRecord]) -> list[str]:
+        return [json.loads(m.value)['event_id'] for m in messages]
+
+    @pytest.mark.asyncio
+    async def test_batch_throughput(self):
+        # у каждого прохода свои события: иначе второй проход упрется в ON CONFLICT DO NOTHING
+        single_messages = self._ordered(make_records(self.MESSAGES))
+        batch_messages = self._ordered(make_records(self.MESSAGES))
+
+        try:
+            single_consumer = InMemoryConsumer()
+            single_created = 0
+            start = time.perf_counter()
+            for msg in single_messages:
+                single_created += await handle_task_creation_message(msg, single_consumer)
+            single_rate = self.MESSAGES / (time.perf_counter() - start)
+
+            batch_consumer = InMemoryConsumer()
+            batch_created = 0
+            start = time.perf_counter()
+            for offset in range(0, self.MESSAGES, self.BATCH_SIZE):
+                # делим по порядку сообщений, как getmany(max_records=BATCH_SIZE)
+                batch = {}
+                for m in batch_messages[offset:offset + self.BATCH_SIZE]:
+                    batch.setdefault(TopicPartition(m.topic, m.partition), []).append(m)
+                batch_created += await handle_task_creation_batch(batch, batch_consumer)
+            batch_rate = self.MESSAGES / (time.perf_counter() - start)
+        finally:
+            async with unit_of_work() as uow:
+                await uow.session.execute(
+                    delete(Task).where(Task.id.in_(self._task_ids(single_messages + batch_messages)))
+                )
+
+        # оба прохода действительно вставляют все задачи
+        assert single_created == self.MESSAGES
+        assert batch_created == self.MESSAGES
+        # один commit на пачку, а не на сообщение
+        assert batch_consumer.commits == self.MESSAGES // self.BATCH_SIZE
+        assert single_consumer.commits == self.MESSAGES
+        assert batch_consumer.committed == single_consumer.committed
+
+        print(f'Worker: по одному {single_rate:.0f} сообщ./с, пачками по {self.BATCH_SIZE} {batch_rate:.0f} сообщ./с')
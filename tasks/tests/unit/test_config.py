@@ -0,0 +1,41 @@
+import importlib.util
+import core.config
+
+
+def load_config(monkeypatch, **env):
+    """Свежая копия core.config с заданным окружением (общий settings не меняется)"""
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    spec = importlib.util.spec_from_file_location('config_under_test', core.config.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.settings
+
+
+class TestSettings:
+    """Тесты для приведения переменных окружения к типам настроек"""
+
+    def test_env_values_are_parsed(self, monkeypatch):
+        settings = load_config(
+            monkeypatch,
+            TASKS_OUTBOX_ENABLED='false',
+            TASKS_WORKER_RETRY_ENABLED='0',
+            TASKS_WORKER_CONCURRENCY='8',
+            TASKS_WORKER_PROCESSES='4',
+            TASKS_WORKER_FLOW_RESUME_RATIO='0.25',
+            TASKS_DB_NOTIFY_RECONNECT_BACKOFF='2.5',
+        )
+        assert settings.outbox.ENABLED is False
+        assert settings.worker.RETRY_ENABLED is False
+        assert settings.worker.CONCURRENCY == 8
+        assert isinstance(settings.worker.CONCURRENCY, int)
+        assert settings.worker.PROCESSES == 4
+        assert settings.worker.FLOW_RESUME_RATIO == 0.25
+        assert settings.db.NOTIFY_RECONNECT_BACKOFF == 2.5
+
+    def test_defaults_keep_types(self, monkeypatch):
+        monkeypatch.delenv('TASKS_OUTBOX_ENABLED', raising=False)
+        monkeypatch.delenv('TASKS_WORKER_CONCURRENCY', raising=False)
+        settings = load_config(monkeypatch)
+        assert settings.outbox.ENABLED is True
+        assert settings.worker.CONCURRENCY == 4
@@ -0,0 +1,21 @@
+import pytest, uuid
+from typing import AsyncIterator
+from aiokafka import TopicPartition
+from core.repositories.consumer_offset import ConsumerOffsetRepository
+
+class TestConsumerOffsetRepository:
+    """Тесты для ConsumerOffsetRepository"""
+
+    @pytest.mark.asyncio
+    async def test_store_and_get_offsets(self, testing_db_connection: AsyncIterator):
+        repo = ConsumerOffsetRepository(testing_db_connection.session)
+        group_id = f'test-group-{uuid.uuid4()}'
+        tp0, tp1 = TopicPartition('task_events', 0), TopicPartition('task_events', 1)
+
+        await repo.store_offsets(group_id, {tp0: 10, tp1: 5})
+        await repo.store_offsets(group_id, {tp0: 20})
+        # offset не откатывается назад
+        await repo.store_offsets(group_id, {tp1: 3})
+
+        offsets = await repo.get_offsets(group_id, [tp0, tp1, TopicPartition('task_events', 2)])
+        assert offsets == {tp0: 20, tp1: 5}
@@ -0,0 +1,55 @@
+import pytest, asyncio
+from infrastructure.kafka.publisher import EventPublisher, PRODUCER_PROFILES, producer_options
+
+
+class FakeProducer:
+    def __init__(self):
+        self.sent = []
+        self.futures: list[asyncio.Future] = []
+
+    async def send_and_wait(self, topic, value=None, key=None, headers=None):
+        self.sent.append((topic, value, key, headers))
+
+    async def send(self, topic, value=None, key=None, headers=None):
+        self.sent.append((topic, value, key, headers))
+        future = asyncio.get_running_loop().create_future()
+        self.futures.append(future)
+        return future
+
+
+class TestEventPublisher:
+    """Тесты для EventPublisher"""
+
+    def test_profiles(self):
+        # идемпотентность требует acks=all
+        for options in PRODUCER_PROFILES.values():
+            assert not options['enable_idempotence'] or options['acks'] == 'all'
+        with pytest.raises(ValueError):
+            producer_options('unknown')
+
+    @pytest.mark.asyncio
+    async def test_broker_mode_waits_for_ack(self):
+        producer = FakeProducer()
+        publisher = EventPublisher(producer, ack_mode='broker', max_pending=1)
+        await publisher.publish('task_events', {'event_id': '1'}, b'1')
+        assert publisher.waits_for_broker
+        assert producer.sent == [(
+            'task_events', b'{"event_id":"1"}', b'1',
+            [('content-type', b'application/json'), ('x-schema-version', b'1')],
+        )]
+
+    @pytest.mark.asyncio
+    async def test_enqueued_mode_is_bounded(self):
+        producer = FakeProducer()
+        publisher = EventPublisher(producer, ack_mode='enqueued', max_pending=2)
+        await publisher.publish('task_events', {'event_id': '1'})
+        await publisher.publish('task_events', {'event_id': '2'})
+        # буфер заполнен: третье событие ждет подтверждения одного из первых
+        third = asyncio.create_task(publisher.publish('task_events', {'event_id': '3'}))
+        await asyncio.sleep(0.01)
+        assert not third.done()
+
+        producer.futures[0].set_exception(ConnectionError('broker down'))
+        await asyncio.wait_for(third, 1)
+        assert len(producer.sent) == 3
+        assert publisher.failed == 1
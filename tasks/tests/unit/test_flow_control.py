@@ -0,0 +1,120 @@
+import asyncio, pytest, time
+from aiokafka import TopicPartition, ConsumerRecord
+from core.config import settings
+from infrastructure.kafka.consumer import PartitionPauser, PartitionDispatcher
+from infrastructure.kafka.flow_control import FlowController, TokenBucket
+
+TP0 = TopicPartition('task_events', 0)
+TP1 = TopicPartition('task_events', 1)
+
+
+def make_record(tp: TopicPartition, offset: int) -> ConsumerRecord:
+    return ConsumerRecord(
+        topic=tp.topic, partition=tp.partition, offset=offset,
+        timestamp=0, timestamp_type=0, key=None, value=b'{}', checksum=None,
+        serialized_key_size=0, serialized_value_size=2, headers=(),
+    )
+
+
+class FakeConsumer:
+    def __init__(self):
+        self.paused: set[TopicPartition] = set()
+
+    def pause(self, *partitions):
+        self.paused.update(partitions)
+
+    def resume(self, *partitions):
+        self.paused.difference_update(partitions)
+
+    def assignment(self):
+        return {TP0, TP1}
+
+
+class TestTokenBucket:
+    """Тесты для TokenBucket"""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit(self):
+        bucket = TokenBucket(rate=1000)
+        start = time.monotonic()
+        # 1000 токенов в запасе, еще 100 — через 0.1 с
+        await bucket.acquire(1000)
+        await bucket.acquire(100)
+        assert time.monotonic() - start >= 0.09
+
+
+class TestFlowController:
+    """Тесты для FlowController"""
+
+    def test_pause_and_resume_with_hysteresis(self):
+        consumer = FakeConsumer()
+        pauser = PartitionPauser(consumer)
+        flow = FlowController(max_checkout_wait=0.1, max_in_flight=4, smoothing=1.0)
+
+        flow.record_checkout_wait(0.5)
+        flow.update(consumer, pauser)
+        assert flow.paused
+        assert consumer.paused == {TP0, TP1}
+
+        # ниже порога, но выше resume_ratio * порог — пауза сохраняется
+        flow.record_checkout_wait(0.08)
+        flow.in_flight = 1
+        flow.update(consumer, pauser)
+        assert flow.paused
+
+        flow.record_checkout_wait(0.01)
+        flow.update(consumer, pauser)
+        assert not flow.paused
+        assert consumer.paused == set()
+
+    def test_partition_paused_by_queue_stays_paused(self):
+        consumer = FakeConsumer()
+        pauser = PartitionPauser(consumer)
+        flow = FlowController(max_checkout_wait=0.1, max_in_flight=4, smoothing=1.0)
+
+        pauser.pause(TP0, 'queue')
+        flow.record_checkout_wait(0.5)
+        flow.update(consumer, pauser)
+        flow.record_checkout_wait(0.0)
+        flow.in_flight = 1
+        flow.update(consumer, pauser)
+
+        # снята только пауза по нагрузке, очередь партиции все еще полна
+        assert consumer.paused == {TP0}
+
+    @pytest.mark.asyncio
+    async def test_dispatcher_backlog_with_default_settings(self):
+        consumer = FakeConsumer()
+        pauser = PartitionPauser(consumer)
+        flow = FlowController(
+            max_checkout_wait=settings.worker.FLOW_MAX_CHECKOUT_WAIT_MS / 1000,
+            max_in_flight=settings.worker.FLOW_MAX_IN_FLIGHT_BATCHES,
+            resume_ratio=settings.worker.FLOW_RESUME_RATIO,
+        )
+        released = asyncio.Event()
+
+        async def handler(messages):
+            async with flow.batch(len(messages)):
+                await released.wait()
+
+        dispatcher = PartitionDispatcher(
+            consumer=consumer,
+            handler=handler,
+            concurrency=settings.worker.CONCURRENCY,
+            queue_size=settings.worker.PARTITION_QUEUE_SIZE,
+            pauser=pauser,
+        )
+        for offset in range(settings.worker.FLOW_MAX_IN_FLIGHT_BATCHES):
+            tp = (TP0, TP1)[offset % 2]
+            dispatcher.submit(tp, [make_record(tp, offset // 2)])
+        await asyncio.sleep(0)
+        # в записи не больше CONCURRENCY пачек, порог достигается очередью dispatcher
+        assert flow.in_flight <= settings.worker.CONCURRENCY < settings.worker.FLOW_MAX_IN_FLIGHT_BATCHES
+        flow.update(consumer, pauser, dispatcher.batches)
+        assert flow.paused
+
+        released.set()
+        await dispatcher.drain()
+        flow.update(consumer, pauser, dispatcher.batches)
+        assert not flow.paused
+        await dispatcher.stop()
@@ -0,0 +1,23 @@
+import pytest, uuid
+from typing import AsyncIterator
+from core.repositories.outbox import OutboxRepository
+
+class TestOutboxRepository:
+    """Тесты для OutboxRepository"""
+
+    @pytest.mark.asyncio
+    async def test_add_lock_and_delete_events(self, testing_db_connection: AsyncIterator):
+        repo = OutboxRepository(testing_db_connection.session)
+        aggregate_id = str(uuid.uuid4())
+
+        await repo.add_event('TaskCreated', aggregate_id, {'id': aggregate_id})
+        await repo.add_event('TaskDeleted', aggregate_id, {'id': aggregate_id})
+
+        events = [e for e in await repo.lock_batch(limit=10000) if e['aggregate_id'] == aggregate_id]
+        # события одной задачи возвращаются в порядке записи
+        assert [e['event_type'] for e in events] == ['TaskCreated', 'TaskDeleted']
+        assert events[0]['payload'] == {'id': aggregate_id}
+
+        await repo.delete_events([e['id'] for e in events])
+        remaining = [e for e in await repo.lock_batch(limit=10000) if e['aggregate_id'] == aggregate_id]
+        assert remaining == []
@@ -0,0 +1,177 @@
+import pytest, asyncio
+from aiokafka import TopicPartition, ConsumerRecord
+from infrastructure.kafka.consumer import OffsetTracker, PartitionDispatcher, WorkerRebalanceListener
+
+TP0 = TopicPartition('task_events', 0)
+TP1 = TopicPartition('task_events', 1)
+
+
+def make_messages(tp: TopicPartition, first: int, count: int) -> list[ConsumerRecord]:
+    return [
+        ConsumerRecord(
+            topic=tp.topic, partition=tp.partition, offset=offset,
+            timestamp=0, timestamp_type=0, key=None, value=b'{}', checksum=None,
+            serialized_key_size=0, serialized_value_size=2, headers=(),
+        )
+        for offset in range(first, first + count)
+    ]
+
+
+class FakeConsumer:
+    def __init__(self):
+        self.committed: dict[TopicPartition, int] = {}
+        self.paused: set[TopicPartition] = set()
+        self.positions: dict[TopicPartition, int] = {}
+
+    async def commit(self, offsets):
+        self.committed.update(offsets)
+
+    def pause(self, *partitions):
+        self.paused.update(partitions)
+
+    def resume(self, *partitions):
+        self.paused.difference_update(partitions)
+
+    def seek(self, tp, offset):
+        self.positions[tp] = offset
+
+    def assignment(self):
+        return {TP0, TP1}
+
+
+class TestOffsetTracker:
+    """Тесты для OffsetTracker"""
+
+    def test_only_contiguous_offsets_are_commitable(self):
+        tracker = OffsetTracker()
+        tracker.track(TP0, 0, 9)
+        tracker.track(TP0, 10, 19)
+        tracker.done(TP0, 10)
+        # первая пачка еще не обработана
+        assert tracker.commitable() == {}
+
+        tracker.done(TP0, 0)
+        assert tracker.commitable() == {TP0: 20}
+        # повторно то же значение не возвращается
+        assert tracker.commitable() == {}
+
+
+class TestPartitionDispatcher:
+    """Тесты для PartitionDispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_partitions_are_processed_concurrently_in_order(self):
+        consumer = FakeConsumer()
+        processed: dict[int, list[int]] = {0: [], 1: []}
+        release = asyncio.Event()
+
+        async def handler(messages):
+            # партиция 0 «медленная», партиция 1 не должна ее ждать
+            if messages[0].partition == 0:
+                await release.wait()
+            processed[messages[0].partition].append(messages[0].offset)
+
+        dispatcher = PartitionDispatcher(consumer, handler, concurrency=2, queue_size=10)
+        dispatcher.submit(TP0, make_messages(TP0, 0, 5))
+        dispatcher.submit(TP0, make_messages(TP0, 5, 5))
+        dispatcher.submit(TP1, make_messages(TP1, 0, 5))
+        await asyncio.sleep(0.01)
+        await dispatcher.commit()
+        assert consumer.committed == {TP1: 5}
+
+        release.set()
+        await asyncio.sleep(0.01)
+        await dispatcher.commit()
+        assert processed[0] == [0, 5]
+        assert consumer.committed == {TP0: 10, TP1: 5}
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_partition_paused_when_queue_is_full(self):
+        consumer = FakeConsumer()
+        release = asyncio.Event()
+
+        async def handler(messages):
+            await release.wait()
+
+        dispatcher = PartitionDispatcher(consumer, handler, concurrency=1, queue_size=1)
+        dispatcher.submit(TP0, make_messages(TP0, 0, 1))
+        assert TP0 in consumer.paused
+
+        release.set()
+        await asyncio.sleep(0.01)
+        assert TP0 not in consumer.paused
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_handler_error_stops_partition_and_is_raised(self):
+        consumer = FakeConsumer()
+
+        async def handler(messages):
+            raise RuntimeError('db down')
+
+        dispatcher = PartitionDispatcher(consumer, handler, concurrency=1, queue_size=10)
+        dispatcher.submit(TP0, make_messages(TP0, 0, 1))
+        await asyncio.sleep(0.01)
+        with pytest.raises(RuntimeError):
+            await dispatcher.commit()
+        assert consumer.committed == {}
+        await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_revoke_commits_processed_and_aborts_stuck_batches(self):
+        consumer = FakeConsumer()
+        release = asyncio.Event()
+
+        async def handler(messages):
+            if messages[0].partition == 0 and messages[0].offset >= 5:
+                await release.wait()
+
+        dispatcher = PartitionDispatcher(consumer, handler, concurrency=2, queue_size=10)
+        dispatcher.submit(TP0, make_messages(TP0, 0, 5))
+        dispatcher.submit(TP0, make_messages(TP0, 5, 3))
+        dispatcher.submit(TP1, make_messages(TP1, 0, 5))
+        aborted = await dispatcher.revoke({TP0}, timeout=0.05)
+        # зависшая пачка прервана, обработанный префикс подтвержден до отзыва
+        assert aborted == 3
+        assert consumer.committed == {TP0: 5, TP1: 5}
+        # пачки других партиций продолжают обрабатываться
+        dispatcher.submit(TP1, make_messages(TP1, 5, 1))
+        await asyncio.sleep(0.01)
+        await dispatcher.commit()
+        assert consumer.committed[TP1] == 6
+        await dispatcher.stop()
+
+
+class TestWorkerRebalanceListener:
+    """Тесты для WorkerRebalanceListener"""
+
+    @pytest.mark.asyncio
+    async def test_seek_to_stored_offsets_on_assignment(self):
+        consumer = FakeConsumer()
+
+        async def load_offsets(partitions):
+            return {TP0: 42}
+
+        listener = WorkerRebalanceListener(consumer, revoke_timeout=1, load_offsets=load_offsets)
+        await listener.on_partitions_assigned({TP0, TP1})
+        # для партиции без сохраненного offset seek не выполняется
+        assert consumer.positions == {TP0: 42}
+
+    @pytest.mark.asyncio
+    async def test_revoke_waits_for_current_batch(self):
+        consumer = FakeConsumer()
+        listener = WorkerRebalanceListener(consumer, revoke_timeout=1)
+        events = []
+
+        async def process_batch():
+            async with listener.lock:
+                await asyncio.sleep(0.02)
+                events.append('committed')
+
+        batch = asyncio.create_task(process_batch())
+        await asyncio.sleep(0)
+        await listener.on_partitions_revoked({TP0})
+        events.append('revoked')
+        await batch
+        assert events == ['committed', 'revoked']
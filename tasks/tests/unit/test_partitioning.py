@@ -0,0 +1,84 @@
+import pytest
+from types import SimpleNamespace
+from aiokafka.errors import TopicAlreadyExistsError
+from infrastructure.kafka import admin
+from infrastructure.kafka.partitioning import PARTITIONERS, event_key, load_partitioner, random_partitioner
+
+EVENT = {'event': 'TaskCreation', 'event_id': '5f0c6d1e-0000-4000-8000-000000000001', 'task': {}}
+
+
+class TestPartitioning:
+    """Тесты для ключей и partitioner событий задач"""
+
+    def test_event_key_by_field(self):
+        assert event_key(EVENT, 'task_id') == EVENT['event_id'].encode()
+        assert event_key(EVENT, 'client_id', 'client-1') == b'client-1'
+        # без заголовка клиента ключ — ID задачи
+        assert event_key(EVENT, 'client_id') == EVENT['event_id'].encode()
+        assert event_key(EVENT, 'none') is None
+
+    def test_same_key_same_partition(self):
+        partitioner = load_partitioner('default')
+        partitions = list(range(12))
+        key = event_key(EVENT, 'task_id')
+        assert len({partitioner(key, partitions, partitions) for _ in range(10)}) == 1
+
+    def test_load_partitioner_by_path(self):
+        assert load_partitioner('random') is PARTITIONERS['random']
+        assert load_partitioner('infrastructure.kafka.partitioning:random_partitioner') is random_partitioner
+        with pytest.raises(ValueError):
+            load_partitioner('unknown')
+
+
+class FakeAdmin:
+    def __init__(self, topics: dict[str, tuple[int, int]]):
+        self.topics = topics
+        self.created = []
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def list_topics(self):
+        return list(self.topics)
+
+    async def describe_topics(self, topics):
+        return [
+            {'topic': topic, 'partitions': [{'replicas': [1] * replicas} for _ in range(count)]}
+            for topic, (count, replicas) in self.topics.items() if topic in topics
+        ]
+
+    async def create_topics(self, new_topics):
+        errors = []
+        for topic in new_topics:
+            self.created.append(topic.name)
+            self.topics[topic.name] = (topic.num_partitions, topic.replication_factor)
+            errors.append((topic.name, 0, None))
+        return SimpleNamespace(topic_errors=errors)
+
+
+class TestEnsureTopics:
+    """Тесты для ensure_topics"""
+
+    @pytest.mark.asyncio
+    async def test_creates_missing_and_keeps_existing(self, monkeypatch):
+        fake = FakeAdmin({'task_events': (3, 1)})
+        monkeypatch.setattr(admin, '_admin_client', lambda: fake)
+        counts = await admin.ensure_topics(['task_events', 'task_events.dlq'], partitions=12, replication=1)
+        assert fake.created == ['task_events.dlq']
+        # число партиций существующего топика не меняется
+        assert counts == {'task_events': 3, 'task_events.dlq': 12}
+
+    @pytest.mark.asyncio
+    async def test_topic_created_concurrently_is_not_an_error(self, monkeypatch):
+        fake = FakeAdmin({})
+
+        async def create_topics(new_topics):
+            fake.topics['task_events'] = (12, 1)
+            return SimpleNamespace(topic_errors=[('task_events', TopicAlreadyExistsError.errno, None)])
+
+        fake.create_topics = create_topics
+        monkeypatch.setattr(admin, '_admin_client', lambda: fake)
+        assert await admin.ensure_topics(['task_events'], partitions=12, replication=1) == {'task_events': 12}
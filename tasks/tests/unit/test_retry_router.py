@@ -0,0 +1,108 @@
+import pytest, time
+from aiokafka import ConsumerRecord
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import TimeoutError as DBTimeoutError
+from infrastructure.database import uow as uow_module
+from worker import event_task_id
+from infrastructure.kafka.retry import (
+    RetryRouter,
+    is_retryable,
+    message_attempt,
+    message_due_at,
+    get_header,
+    HEADER_ORIGINAL_OFFSET,
+    HEADER_ERROR_CLASS,
+)
+
+
+class FakeProducer:
+    def __init__(self):
+        self.sent = []
+
+    async def send_and_wait(self, topic, value=None, key=None, headers=None):
+        self.sent.append(ConsumerRecord(
+            topic=topic, partition=0, offset=len(self.sent), timestamp=0, timestamp_type=0,
+            key=key, value=value, checksum=None, serialized_key_size=0,
+            serialized_value_size=len(value), headers=tuple(headers or ()),
+        ))
+
+
+def make_message(offset: int = 7) -> ConsumerRecord:
+    return ConsumerRecord(
+        topic='task_events', partition=1, offset=offset, timestamp=0, timestamp_type=0,
+        key=b'key', value=b'{"task": {}}', checksum=None, serialized_key_size=3,
+        serialized_value_size=12, headers=(),
+    )
+
+
+class TimeoutSession:
+    """Сессия, у которой фиксация упирается в таймаут пула соединений"""
+    async def commit(self):
+        raise DBTimeoutError('QueuePool limit reached, connection timed out')
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class TestRetryRouter:
+    """Тесты для RetryRouter"""
+
+    def test_error_classification(self):
+        class Model(BaseModel):
+            title: str
+
+        with pytest.raises(ValidationError) as validation_error:
+            Model.model_validate({})
+        assert not is_retryable(validation_error.value)
+        assert not is_retryable(ValueError('integrity'))
+        assert is_retryable(ConnectionError('db down'))
+
+    @pytest.mark.asyncio
+    async def test_unit_of_work_timeout_is_retryable(self, monkeypatch):
+        monkeypatch.setattr(uow_module, 'async_session', TimeoutSession)
+        with pytest.raises(Exception) as error:
+            async with uow_module.unit_of_work():
+                pass
+        # unit_of_work пробрасывает таймаут как sqlalchemy.exc.TimeoutError
+        assert isinstance(error.value, DBTimeoutError)
+        assert is_retryable(error.value)
+
+    @pytest.mark.asyncio
+    async def test_retry_tiers_then_dlq(self):
+        producer = FakeProducer()
+        router = RetryRouter(producer, 'task_events', delays=[1, 30], dlq_topic='task_events.dlq')
+        msg = make_message()
+
+        for expected in ('task_events.retry.1s', 'task_events.retry.30s', 'task_events.dlq'):
+            assert await router.route(msg, ConnectionError('db down')) == expected
+            msg = producer.sent[-1]
+
+        first_retry = producer.sent[0]
+        assert message_attempt(first_retry) == 1
+        assert message_due_at(first_retry) > time.time()
+        # исходная позиция сохраняется через все повторы
+        assert get_header(msg, HEADER_ORIGINAL_OFFSET) == '7'
+        assert get_header(msg, HEADER_ERROR_CLASS) == 'ConnectionError'
+        assert msg.key == b'key' and msg.value == b'{"task": {}}'
+
+    @pytest.mark.asyncio
+    async def test_fatal_error_goes_to_dlq(self):
+        producer = FakeProducer()
+        router = RetryRouter(producer, 'task_events', delays=[1, 30], dlq_topic='task_events.dlq')
+        assert await router.route(make_message(), ValueError('bad json')) == 'task_events.dlq'
+
+    @pytest.mark.asyncio
+    async def test_legacy_task_id_survives_retry_hops(self):
+        producer = FakeProducer()
+        router = RetryRouter(producer, 'task_events', delays=[1, 30], dlq_topic='task_events.dlq')
+        msg = make_message()
+        # событие старого producer без event_id: ID задачи — по исходной позиции
+        task_id = event_task_id({}, msg)
+
+        for _ in range(3):
+            await router.route(msg, ConnectionError('db down'))
+            msg = producer.sent[-1]
+            assert event_task_id({}, msg) == task_id
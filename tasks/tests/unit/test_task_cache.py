@@ -0,0 +1,55 @@
+import time
+from infrastructure.cache.task_cache import TaskCache, MISS
+from core.schemas.tasks import SchemaTask, TaskStatusEnum
+
+
+def make_task(task_id: str) -> SchemaTask:
+    return SchemaTask(id=task_id, title=f'Task {task_id}', status=TaskStatusEnum.CREATED)
+
+
+class TestTaskCache:
+    """Тесты для TaskCache"""
+
+    def test_get_set_and_negative_entry(self):
+        cache = TaskCache(max_size=10, ttl=60, negative_ttl=60)
+        assert cache.get('1') is MISS
+
+        cache.set('1', make_task('1'), cache.generation)
+        cache.set('2', None, cache.generation)
+
+        assert cache.get('1').id == '1'
+        assert cache.get('2') is None
+        assert cache.is_missing('2')
+        assert not cache.is_missing('1')
+        assert cache.stats()['hits'] == 3
+        assert cache.stats()['misses'] == 1
+
+    def test_lru_eviction(self):
+        cache = TaskCache(max_size=2, ttl=60, negative_ttl=60)
+        cache.set('1', make_task('1'), cache.generation)
+        cache.set('2', make_task('2'), cache.generation)
+        cache.get('1')
+        cache.set('3', make_task('3'), cache.generation)
+
+        assert cache.get('2') is MISS
+        assert cache.get('1') is not MISS
+        assert cache.stats()['evictions'] == 1
+
+    def test_ttl_expiration(self):
+        cache = TaskCache(max_size=10, ttl=60, negative_ttl=0)
+        cache.set('1', None, cache.generation)
+        time.sleep(0.01)
+        assert cache.get('1') is MISS
+
+    def test_invalidate_and_stale_set(self):
+        cache = TaskCache(max_size=10, ttl=60, negative_ttl=60)
+        cache.set('1', make_task('1'), cache.generation)
+
+        generation = cache.generation
+        cache.invalidate('1', sent_at=time.time())
+        # значение, прочитанное до инвалидации, не попадает в кэш
+        cache.set('1', make_task('1'), generation)
+
+        assert cache.get('1') is MISS
+        assert cache.stats()['invalidations'] == 1
+        assert cache.stats()['last_invalidation_lag_seconds'] >= 0
@@ -0,0 +1,49 @@
+import pytest, asyncio
+from infrastructure.database.task_broker import TaskChangeBroker, TooManySubscriptions
+
+
+def notification(op: str, task_id: str, status: str) -> dict:
+    return {'id': task_id, 'op': op, 'ts': 0, 'task': {'id': task_id, 'title': task_id, 'description': None, 'status': status}}
+
+
+async def take(iterator, count: int) -> list[str]:
+    return [(await iterator.__anext__())['id'] for _ in range(count)]
+
+
+class TestTaskChangeBroker:
+    """Тесты для раздачи изменений задач подпискам GraphQL"""
+
+    @pytest.mark.asyncio
+    async def test_filters_by_op_and_status(self):
+        broker = TaskChangeBroker(queue_size=10, max_subscriptions=10)
+        updated = broker.listen('updated', 'completed')
+        created = broker.listen('created')
+        first = asyncio.gather(take(updated, 1), take(created, 2))
+        await asyncio.sleep(0)
+        broker.handle_notification(notification('created', '1', 'created'))
+        broker.handle_notification(notification('updated', '1', 'in_progress'))
+        broker.handle_notification(notification('updated', '1', 'completed'))
+        broker.handle_notification(notification('created', '2', 'created'))
+        # уведомление без данных задачи (старый формат) подпискам не раздается
+        broker.handle_notification({'id': '3', 'op': 'created', 'ts': 0})
+        assert await asyncio.wait_for(first, 1) == [['1'], ['1', '2']]
+        assert broker.stats()['received'] == 4
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_and_unsubscribe(self):
+        broker = TaskChangeBroker(queue_size=2, max_subscriptions=1)
+        changes = broker.listen('created')
+        consumer = asyncio.create_task(take(changes, 1))
+        await asyncio.sleep(0)
+        assert len(broker.subscriptions) == 1
+        with pytest.raises(TooManySubscriptions):
+            await broker.listen('created').__anext__()
+        for task_id in '1234':
+            broker.handle_notification(notification('created', task_id, 'created'))
+        # очередь на два изменения: старые вытеснены
+        assert await consumer == ['3']
+        assert await take(changes, 1) == ['4']
+        assert broker.stats()['dropped'] == 2
+
+        await changes.aclose()
+        assert not broker.subscriptions
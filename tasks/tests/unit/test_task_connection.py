@@ -0,0 +1,119 @@
+import pytest, strawberry
+from types import SimpleNamespace
+from typing import Iterable, Optional
+from core.schemas.tasks import SchemaTask, TaskStatusEnum
+from api_v1.graphql.cursor import encode_cursor
+from api_v1.graphql.tasks.resolvers import Query
+
+
+class FakeTaskService:
+    """Keyset по (column, id) над списком задач в памяти"""
+    def __init__(self, titles: list[str]):
+        self.tasks = [
+            SchemaTask(id=f'{i:02d}', title=title, status=TaskStatusEnum.CREATED)
+            for i, title in enumerate(titles)
+        ]
+        self.keyset_calls: list[dict] = []
+        self.count_calls = 0
+
+    async def get_tasks_keyset(
+        self,
+        column: str,
+        sort: str,
+        limit: int,
+        after: Optional[tuple],
+        before: Optional[tuple],
+        backward: bool,
+        column_search: Optional[str],
+        input_search: Optional[str],
+        fields: Optional[Iterable[str]],
+    ) -> tuple[list[SchemaTask], bool]:
+        self.keyset_calls.append({'column': column, 'sort': sort, 'limit': limit, 'fields': set(fields)})
+        key = lambda task: (getattr(task, column), task.id)
+        rows = sorted(self.tasks, key=key, reverse=sort == 'desc')
+        if after is not None:
+            rows = [task for task in rows if (key(task) < after if sort == 'desc' else key(task) > after)]
+        if before is not None:
+            rows = [task for task in rows if (key(task) > before if sort == 'desc' else key(task) < before)]
+        page = rows[-limit:] if backward and limit else rows[:limit]
+        return page, len(rows) > limit
+
+    async def count_tasks(self, column_search: Optional[str], input_search: Optional[str]) -> int:
+        self.count_calls += 1
+        return len(self.tasks)
+
+
+async def execute(service: FakeTaskService, query: str, **variables):
+    schema = strawberry.Schema(query=Query)
+    return await schema.execute(query, variable_values=variables, context_value=SimpleNamespace(task_service=service))
+
+
+PAGE_QUERY = '''
+query ($first: Int, $after: String, $last: Int, $before: String) {
+  tasksConnection(first: $first, after: $after, last: $last, before: $before, orderBy: {field: TITLE, direction: ASC}) {
+    edges { cursor node { title } }
+    pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+  }
+}
+'''
+
+
+class TestTaskConnection:
+    """Тесты для курсорной пагинации задач в GraphQL"""
+
+    @pytest.mark.asyncio
+    async def test_forward_pages_cover_all_tasks_once(self):
+        service = FakeTaskService(['c', 'a', 'b', 'a', 'd'])
+        titles, after = [], None
+        while True:
+            result = await execute(service, PAGE_QUERY, first=2, after=after)
+            assert result.errors is None
+            connection = result.data['tasksConnection']
+            titles += [edge['node']['title'] for edge in connection['edges']]
+            if not connection['pageInfo']['hasNextPage']:
+                break
+            after = connection['pageInfo']['endCursor']
+        assert titles == ['a', 'a', 'b', 'c', 'd']
+        # колонка сортировки читается всегда, count(*) не выполняется
+        assert service.keyset_calls[0]['fields'] == {'title'}
+        assert service.count_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_backward_page_before_cursor(self):
+        service = FakeTaskService(['a', 'b', 'c', 'd'])
+        before = encode_cursor('title', 'd', '03')
+        result = await execute(service, PAGE_QUERY, last=2, before=before)
+        assert result.errors is None
+        connection = result.data['tasksConnection']
+        assert [edge['node']['title'] for edge in connection['edges']] == ['b', 'c']
+        assert connection['pageInfo']['hasPreviousPage'] is True
+        assert connection['pageInfo']['hasNextPage'] is True
+
+    @pytest.mark.asyncio
+    async def test_total_count_only(self):
+        service = FakeTaskService(['a', 'b'])
+        result = await execute(service, '{ tasksConnection { totalCount } }')
+        assert result.errors is None
+        assert result.data == {'tasksConnection': {'totalCount': 2}}
+        assert service.keyset_calls == []
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self):
+        service = FakeTaskService(['a'])
+        result = await execute(service, PAGE_QUERY, first=1, last=1)
+        assert 'first или last' in result.errors[0].message
+        result = await execute(service, PAGE_QUERY, first=1, after=encode_cursor('status', 'created', '00'))
+        assert 'сортировке' in result.errors[0].message
+        result = await execute(service, PAGE_QUERY, first=1, after='not-a-cursor')
+        assert 'Невалидный курсор' in result.errors[0].message
+        assert service.keyset_calls == []
+
+    @pytest.mark.asyncio
+    async def test_forged_status_cursor(self):
+        service = FakeTaskService(['a'])
+        query = PAGE_QUERY.replace('field: TITLE', 'field: STATUS')
+        result = await execute(service, query, first=1, after=encode_cursor('status', 'bogus', '00'))
+        assert 'Невалидный курсор' in result.errors[0].message
+        result = await execute(service, query, first=1, after=encode_cursor('status', 'created', '00'))
+        assert result.errors is None
+        assert len(service.keyset_calls) == 1
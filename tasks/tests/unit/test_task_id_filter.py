@@ -0,0 +1,121 @@
+import asyncio, uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from infrastructure.cache import bloom as bloom_module
+from infrastructure.cache.bloom import BloomFilter, TaskIdFilter
+from core.schemas.tasks import is_valid_task_id
+from infrastructure.database import notifications as notifications_module
+from infrastructure.database.notifications import TaskChangesListener
+
+
+class TestTaskIdFilter:
+    """Тесты фильтра ID задач"""
+
+    def test_valid_task_id(self):
+        assert is_valid_task_id(str(uuid.uuid4()))
+        assert not is_valid_task_id('1')
+        assert not is_valid_task_id(str(uuid.uuid4()).upper())
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        keys = [str(uuid.uuid4()) for _ in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+        # ключ, совпавший по всем битам с уже добавленными, не увеличивает счетчик
+        assert 950 <= bloom.count <= 1000
+
+    def test_bloom_filter_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        for _ in range(1000):
+            bloom.add(str(uuid.uuid4()))
+        false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+        assert false_positives / 10000 < 0.03
+        assert bloom.stats()['estimated_false_positive_rate'] < 0.02
+
+    def test_filter_passes_everything_until_ready(self):
+        task_filter = TaskIdFilter(capacity=100, false_positive_rate=0.01, batch_size=10)
+        task_id = str(uuid.uuid4())
+        assert task_filter.might_exist(task_id)
+
+        task_filter.ready = True
+        assert not task_filter.might_exist(task_id)
+        task_filter.handle_notification({'id': task_id, 'op': 'created'})
+        assert task_filter.might_exist(task_id)
+        assert task_filter.stats()['rejected'] == 1
+
+    async def test_filter_passes_everything_while_listener_is_down(self, monkeypatch):
+        task_filter = TaskIdFilter(capacity=100, false_positive_rate=0.01, batch_size=10)
+        known, other = str(uuid.uuid4()), str(uuid.uuid4())
+        disconnect_while_streaming = False
+
+        class FakeTasks:
+            async def stream_task_ids(self, batch_size):
+                if disconnect_while_streaming:
+                    task_filter.disconnected()
+                yield known
+
+        @asynccontextmanager
+        async def fake_unit_of_work():
+            yield SimpleNamespace(tasks=FakeTasks())
+
+        monkeypatch.setattr(bloom_module, 'unit_of_work', fake_unit_of_work)
+        await task_filter.resync()
+        assert task_filter.might_exist(known)
+        assert not task_filter.might_exist(other)
+
+        # задача другого процесса: NOTIFY о ней не придет, пока нет соединения LISTEN
+        task_filter.disconnected()
+        assert task_filter.might_exist(other)
+
+        # соединение потеряно во время построения: фильтр по-прежнему не отсекает
+        disconnect_while_streaming = True
+        await task_filter.resync()
+        assert task_filter.might_exist(other)
+
+        disconnect_while_streaming = False
+        await task_filter.resync()
+        assert not task_filter.might_exist(other)
+        assert task_filter.stats()['disconnects'] == 2
+
+    async def test_listener_reports_lost_connection(self, monkeypatch):
+        calls: list[str] = []
+
+        class Subscriber:
+            def handle_notification(self, data):
+                pass
+
+            async def resync(self):
+                calls.append('resync')
+
+            def disconnected(self):
+                calls.append('disconnected')
+
+        class FakeConnection:
+            """Соединение закрывается после первой проверки"""
+            def __init__(self):
+                self.checks = 0
+
+            async def add_listener(self, channel, callback):
+                pass
+
+            def is_closed(self):
+                self.checks += 1
+                return self.checks > 1
+
+            async def close(self):
+                pass
+
+        async def connect(dsn):
+            return FakeConnection()
+
+        monkeypatch.setattr(notifications_module.asyncpg, 'connect', connect)
+        monkeypatch.setattr(notifications_module.settings.db, 'NOTIFY_RECONNECT_BACKOFF', 0.001)
+        listener = TaskChangesListener(dsn='postgresql://test', channel='tasks_changes')
+        listener.subscribe(Subscriber())
+        task = asyncio.create_task(listener.run())
+        while len(calls) < 3:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert calls[:3] == ['resync', 'disconnected', 'resync']
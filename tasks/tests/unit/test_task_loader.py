@@ -0,0 +1,87 @@
+import pytest, strawberry
+from types import SimpleNamespace
+from typing import Iterable, Optional
+from core.schemas.tasks import SchemaTask, TaskStatusEnum, TasksResponseSchema
+from api_v1.graphql.loaders import create_task_loader
+from api_v1.graphql.tasks.resolvers import Query
+
+
+class FakeTaskService:
+    def __init__(self, task_ids: list[str]):
+        self.tasks = {
+            task_id: SchemaTask(id=task_id, title=f'Task {task_id}', status=TaskStatusEnum.CREATED)
+            for task_id in task_ids
+        }
+        self.calls: list[list[str]] = []
+        self.fields: list[Optional[frozenset]] = []
+        self.page_calls: list[dict] = []
+
+    async def read_tasks(self, task_ids: list[str], fields: Optional[Iterable[str]] = None) -> dict[str, SchemaTask]:
+        self.calls.append(list(task_ids))
+        self.fields.append(frozenset(fields) if fields is not None else None)
+        return {task_id: self.tasks[task_id] for task_id in task_ids if task_id in self.tasks}
+
+    async def get_tasks(self, **kwargs) -> TasksResponseSchema:
+        self.page_calls.append(kwargs)
+        tasks = list(self.tasks.values()) if kwargs['with_tasks'] else []
+        total = len(self.tasks) if kwargs['with_total'] else None
+        return TasksResponseSchema.model_construct(tasks=tasks, total=total, pages_count=1 if total else None)
+
+
+async def execute(service: FakeTaskService, query: str):
+    schema = strawberry.Schema(query=Query)
+    return await schema.execute(query, context_value=SimpleNamespace(task_loader=create_task_loader(service), task_service=service))
+
+
+class TestTaskLoader:
+    """Тесты для пакетной загрузки задач в GraphQL"""
+
+    @pytest.mark.asyncio
+    async def test_aliased_lookups_are_batched(self):
+        service = FakeTaskService(['1', '2'])
+        result = await execute(
+            service,
+            '{ a: task(id: "1") { id title } b: task(id: "2") { id } c: task(id: "3") { id } d: task(id: "1") { id } }',
+        )
+        assert result.errors is None
+        assert result.data == {'a': {'id': '1', 'title': 'Task 1'}, 'b': {'id': '2'}, 'c': None, 'd': {'id': '1'}}
+        # один запрос на весь документ, повторный ID не запрашивается
+        assert service.calls == [['1', '2', '3']]
+        # колонки — объединение выборок
+        assert service.fields == [frozenset({'id', 'title'})]
+
+    @pytest.mark.asyncio
+    async def test_task_fields_from_fragments(self):
+        service = FakeTaskService(['1'])
+        result = await execute(
+            service,
+            'fragment F on TaskGQL { status } { task(id: "1") { ...F ... on TaskGQL { description } __typename } }',
+        )
+        assert result.errors is None
+        assert result.data == {'task': {'status': 'CREATED', 'description': None, '__typename': 'TaskGQL'}}
+        assert service.fields == [frozenset({'status', 'description'})]
+
+
+class TestTasksProjection:
+    """Тесты для выбора запросов и колонок списка задач по выборке GraphQL"""
+
+    @pytest.mark.asyncio
+    async def test_total_only_skips_page_query(self):
+        service = FakeTaskService(['1', '2'])
+        result = await execute(service, '{ tasks { total pagesCount } }')
+        assert result.errors is None
+        assert result.data == {'tasks': {'total': 2, 'pagesCount': 1}}
+        call = service.page_calls[0]
+        assert call['with_total'] is True
+        assert call['with_tasks'] is False
+
+    @pytest.mark.asyncio
+    async def test_tasks_only_skips_count(self):
+        service = FakeTaskService(['1', '2'])
+        result = await execute(service, '{ tasks { tasks { id title } } }')
+        assert result.errors is None
+        assert result.data == {'tasks': {'tasks': [{'id': '1', 'title': 'Task 1'}, {'id': '2', 'title': 'Task 2'}]}}
+        call = service.page_calls[0]
+        assert call['with_total'] is False
+        assert call['with_tasks'] is True
+        assert call['fields'] == {'id', 'title'}
@@ -0,0 +1,98 @@
+import pytest, asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from core.config import settings
+from api_v1.rest.tasks.views import router as tasks_router
+from api_v1.rest.tasks.dependencies import get_publisher
+from infrastructure.kafka.codec import JsonCodec
+from infrastructure.kafka.reply import ReplyPublisher, TaskReplies, reply_target
+
+
+class FakeProducer:
+    def __init__(self, error: Exception | None = None):
+        self.sent = []
+        self.error = error
+
+    async def send(self, topic, value=None, key=None, headers=None):
+        self.sent.append((topic, value, key))
+        future = asyncio.get_running_loop().create_future()
+        if self.error is not None:
+            future.set_exception(self.error)
+        else:
+            future.set_result(None)
+        return future
+
+
+class FakeEventPublisher:
+    waits_for_broker = True
+
+    def __init__(self):
+        self.events: list[dict] = []
+
+    async def publish(self, topic, value, key=None):
+        self.events.append(value)
+
+
+def make_event(correlation_id: str | None = 'c1', reply_to: str | None = 'replies') -> dict:
+    return {'event_id': 'e1', 'task': {'title': 'x'}, 'correlation_id': correlation_id, 'reply_to': reply_to}
+
+
+class TestTaskReplies:
+    """Тесты для итогов обработки событий (request/reply)"""
+
+    def test_reply_target(self):
+        assert reply_target(make_event()) == ('c1', 'replies')
+        # события без correlation_id или reply_to, а также не объекты — без ответа
+        assert reply_target(make_event(correlation_id=None)) is None
+        assert reply_target(make_event(reply_to='')) is None
+        assert reply_target([1, 2]) is None
+
+    def test_outcomes(self):
+        replies = TaskReplies()
+        replies.expect('t1', make_event('c1'))
+        replies.expect('t2', make_event('c2'))
+        replies.expect('t3', make_event(correlation_id=None))
+        replies.created(['t1', 't3'])
+        replies.failed('t2', ValueError('bad'))
+        replies.invalid(make_event('c4'), KeyError('task'))
+        assert [outcome for _, outcome in replies.outcomes] == [
+            {'correlation_id': 'c1', 'status': 'created', 'task_id': 't1'},
+            {'correlation_id': 'c2', 'status': 'failed', 'task_id': 't2', 'error': 'ValueError: bad'},
+            {'correlation_id': 'c4', 'status': 'failed', 'task_id': None, 'error': "KeyError: 'task'"},
+        ]
+        # ответ на событие отправляется один раз
+        replies.created(['t1'])
+        assert len(replies.outcomes) == 3
+
+    @pytest.mark.asyncio
+    async def test_publisher(self):
+        replies = TaskReplies()
+        replies.expect('t1', make_event('c1'))
+        replies.created(['t1'])
+        producer = FakeProducer()
+        publisher = ReplyPublisher(producer, JsonCodec())
+        await publisher.send(replies.outcomes)
+        assert producer.sent == [('replies', b'{"correlation_id":"c1","status":"created","task_id":"t1"}', b'c1')]
+
+        # ошибка отправки ответа не пробрасывается: пачка уже записана
+        failing = ReplyPublisher(FakeProducer(ConnectionError('down')), JsonCodec())
+        await failing.send(replies.outcomes)
+        assert failing.stats() == {'sent': 0, 'failed': 1}
+
+    @pytest.mark.asyncio
+    async def test_create_event_requests_reply(self):
+        publisher = FakeEventPublisher()
+        app = FastAPI()
+        app.include_router(tasks_router, prefix='/task')
+        app.dependency_overrides[get_publisher] = lambda: publisher
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+            response = await client.post(
+                '/task/create_event', json={'title': 'x'}, headers={'X-Correlation-Id': 'c1'},
+            )
+            generated = await client.post('/task/create_event', json={'title': 'y'})
+
+        assert response.status_code == 201
+        assert response.json()['correlation_id'] == 'c1'
+        assert reply_target(publisher.events[0]) == ('c1', settings.kafka.REPLY_TOPIC)
+        # без заголовка correlation_id выдается сервисом
+        assert generated.json()['correlation_id'] == publisher.events[1]['correlation_id']
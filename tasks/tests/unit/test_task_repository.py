@@ -1,4 +1,4 @@
-import pytest
+import pytest, uuid
 from sqlalchemy import select
 from typing import AsyncIterator
 from core.models.task import Task, TaskStatus
@@ -108,4 +108,71 @@ class TestTaskRepository:
         fetched = await repo.get_tasks(limit=1000)
         ids = [task.id for task in fetched.tasks]
         assert new_task_1.id in ids
-        assert new_task_2.id in ids
\ No newline at end of file
+        assert new_task_2.id in ids
+
+    @pytest.mark.asyncio
+    async def test_create_tasks_is_idempotent_by_id(self, testing_db_connection: AsyncIterator):
+        repo = TaskRepository(testing_db_connection.session)
+        task_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        tasks = [TaskCreate(title='Bulk task 1'), TaskCreate(title='Bulk task 2')]
+
+        created = await repo.create_tasks(tasks, task_ids)
+        assert sorted(task.id for task in created) == sorted(task_ids)
+
+        # повторная доставка тех же событий ничего не создает
+        created_again = await repo.create_tasks(tasks, task_ids)
+        assert created_again == []
+        assert (await repo.read_task(task_ids[0])).title == 'Bulk task 1'
+
+    @pytest.mark.asyncio
+    async def test_read_tasks_by_ids(self, testing_db_connection: AsyncIterator):
+        repo = TaskRepository(testing_db_connection.session)
+        new_task_1 = await repo.create_task(TaskCreate(title='Test task'))
+        new_task_2 = await repo.create_task(TaskCreate(title='Test task 2'))
+        missing_id = str(uuid.uuid4())
+
+        tasks = await repo.read_tasks([new_task_1.id, new_task_2.id, missing_id])
+        assert set(tasks) == {new_task_1.id, new_task_2.id}
+        assert tasks[new_task_2.id].title == 'Test task 2'
+
+        entities = await repo.get_tasks_by_ids([new_task_1.id, missing_id])
+        assert list(entities) == [new_task_1.id]
+        assert await repo.read_tasks([]) == {}
+
+    @pytest.mark.asyncio
+    async def test_projected_reads(self, testing_db_connection: AsyncIterator):
+        repo = TaskRepository(testing_db_connection.session)
+        new_task = await repo.create_task(TaskCreate(title='Test task', description='Описание'))
+
+        tasks = await repo.read_tasks([new_task.id], fields=['title'])
+        assert tasks[new_task.id].model_fields_set == {'id', 'title'}
+
+        total_only = await repo.get_tasks(with_tasks=False)
+        assert total_only.tasks == []
+        assert total_only.total >= 1
+
+        page_only = await repo.get_tasks(fields=['status'], with_total=False)
+        assert page_only.total is None and page_only.pages_count is None
+        assert all(task.model_fields_set == {'id', 'status'} for task in page_only.tasks)
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages(self, testing_db_connection: AsyncIterator):
+        repo = TaskRepository(testing_db_connection.session)
+        prefix = f'Keyset {uuid.uuid4().hex[:8]}'
+        for title in ('b', 'a', 'c', 'a'):
+            await repo.create_task(TaskCreate(title=f'{prefix} {title}'))
+        search = {'column_search': 'title', 'input_search': prefix}
+
+        first, has_more = await repo.get_tasks_keyset(sort='asc', limit=3, **search)
+        assert [task.title[-1] for task in first] == ['a', 'a', 'b']
+        assert has_more is True
+
+        last = first[-1]
+        rest, has_more = await repo.get_tasks_keyset(sort='asc', limit=3, after=(last.title, last.id), **search)
+        assert [task.title[-1] for task in rest] == ['c']
+        assert has_more is False
+
+        back, has_more = await repo.get_tasks_keyset(sort='asc', limit=2, before=(rest[0].title, rest[0].id), backward=True, **search)
+        assert [task.id for task in back] == [task.id for task in first[1:]]
+        assert has_more is True
+        assert await repo.count_tasks(**search) == 4
@@ -0,0 +1,33 @@
+import os, sys, time
+from worker_supervisor import WorkerSupervisor
+
+
+def crashing_worker(metrics_queue) -> None:
+    metrics_queue.put((os.getpid(), {'worker_messages': 10, 'task_cache': {'hits': 1}}))
+    sys.exit(1)
+
+
+class TestWorkerSupervisor:
+    """Тесты для WorkerSupervisor"""
+
+    def test_restart_with_backoff_and_metrics(self):
+        supervisor = WorkerSupervisor(processes=2, target=crashing_worker)
+        try:
+            supervisor._check_children()
+            for process in supervisor.children:
+                process.join(timeout=30)
+            supervisor._check_children()
+
+            # упавшие процессы не перезапускаются до истечения паузы
+            assert supervisor.children == [None, None]
+            assert supervisor.restarts == [1, 1]
+            assert all(at > time.monotonic() for at in supervisor.restart_at)
+
+            supervisor._collect_metrics()
+            total = supervisor.aggregated_metrics()
+            # числовые метрики суммируются, вложенные не агрегируются
+            assert total['worker_messages'] == 20
+            assert 'task_cache' not in total
+            assert total['restarts'] == 2
+        finally:
+            supervisor._shutdown()
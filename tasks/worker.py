@@ -1,9 +1,26 @@
-import asyncio, json
-from aiokafka import AIOKafkaConsumer, TopicPartition, ConsumerRecord
+import asyncio, signal, os, uuid, time
+from itertools import takewhile
+from typing import Optional
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition, ConsumerRecord
 from api_v1.rest.tasks.dependencies import unit_of_work
 from api_v1.service.task import TaskService
-from core.schemas.tasks import TaskCreate
+from core.schemas.tasks import TaskCreate, is_valid_task_id
+from infrastructure.kafka.consumer import PartitionDispatcher, PartitionPauser, WorkerRebalanceListener
+from infrastructure.kafka.codec import decode_event, get_codec
+from infrastructure.kafka.flow_control import FlowController
+from infrastructure.kafka.retry import (
+    RetryRouter,
+    is_retryable,
+    message_due_at,
+    get_header,
+    HEADER_ORIGINAL_TOPIC,
+    HEADER_ORIGINAL_PARTITION,
+    HEADER_ORIGINAL_OFFSET,
+)
+from infrastructure.kafka.reply import ReplyPublisher, TaskReplies
+from infrastructure.kafka.producer import _start_producer_with_retries
 from core.config import settings
+from core.metrics import metrics
 
 import logging.config
 from core.logger import logger_config
@@ -11,47 +28,389 @@ from core.logger import logger_config
 logging.config.dictConfig(logger_config)
 logger = logging.getLogger('kafka_logger')
 
+# маршрутизация неудачных сообщений процесса (топики задержки и DLQ)
+retry_router: Optional[RetryRouter] = None
 
-async def handle_task_creation_message(msg: ConsumerRecord, consumer: AIOKafkaConsumer):
-    try:
-        data = json.loads(msg.value.decode())
-    except Exception as e:
-        logger.exception('Невалидный json', exc_info=e)
-        await consumer.commit({TopicPartition(msg.topic, msg.partition): msg.offset + 1})
-        raise
+# ответы на события с correlation_id (итог обработки для gateway)
+reply_publisher: Optional[ReplyPublisher] = None
+
+# обратное давление при перегрузке БД и ограничение скорости записи
+flow_controller: Optional[FlowController] = None
+if settings.worker.FLOW_CONTROL_ENABLED:
+    flow_controller = FlowController(
+        max_checkout_wait=settings.worker.FLOW_MAX_CHECKOUT_WAIT_MS / 1000,
+        max_in_flight=settings.worker.FLOW_MAX_IN_FLIGHT_BATCHES,
+        resume_ratio=settings.worker.FLOW_RESUME_RATIO,
+        rows_per_second=settings.worker.MAX_ROWS_PER_SECOND,
+    )
+    metrics.register('worker_flow', flow_controller.stats)
+
+
+async def handle_task_creation_message(msg: ConsumerRecord, consumer: AIOKafkaConsumer) -> int:
+    """Обработка одного сообщения (режим без пачек): пачка из одного сообщения"""
+    created = await process_task_messages([msg])
+    logger.info('Сообщение успешно обработано => топик: %s, партиция: %s, offset: %s, ключ: %s, значение: %s, время: %s', msg.topic, msg.partition, msg.offset, msg.key, msg.value, msg.timestamp)
+    await consumer.commit({TopicPartition(msg.topic, msg.partition): msg.offset + 1})
+    return created
+
+# пространство имен uuid5 для событий без event_id
+LEGACY_EVENT_NAMESPACE = uuid.UUID('6c1b3f0e-5a7d-4c2e-9f3b-1d2a8e4b7c90')
+
+def event_task_id(data: dict, msg: ConsumerRecord) -> str:
+    """
+    ID создаваемой задачи: event_id события, проставленный producer.
+
+    Повторная доставка того же события (сбой между commit в БД и commit offset)
+    дает тот же ID и не создает дубликат. Для событий старых producer без event_id
+    ID выводится из исходной позиции сообщения в основном топике: из заголовков
+    x-original-* после топика задержки или повтора из DLQ, иначе — из самого сообщения.
+    """
+    event_id = data.get('event_id')
+    if isinstance(event_id, str) and is_valid_task_id(event_id):
+        return event_id
+    topic = get_header(msg, HEADER_ORIGINAL_TOPIC) or msg.topic
+    partition = get_header(msg, HEADER_ORIGINAL_PARTITION) or msg.partition
+    offset = get_header(msg, HEADER_ORIGINAL_OFFSET) or msg.offset
+    return str(uuid.uuid5(LEGACY_EVENT_NAMESPACE, f'{topic}:{partition}:{offset}'))
+
+def decode_task_message(msg: ConsumerRecord, data: Optional[dict] = None) -> tuple[str, TaskCreate]:
+    """Сообщение Kafka -> (ID задачи, TaskCreate) (ValueError/ValidationError для невалидных)"""
+    if data is None:
+        data = decode_event(msg.value, msg.headers)
+    return event_task_id(data, msg), TaskCreate.model_validate(data['task'])
+
+def next_offsets(messages: list[ConsumerRecord]) -> dict[TopicPartition, int]:
+    """Следующий offset к чтению по каждой партиции основного топика в пачке"""
+    offsets = {}
+    for msg in messages:
+        if msg.topic != settings.kafka.TOPIC:
+            continue
+        tp = TopicPartition(msg.topic, msg.partition)
+        offsets[tp] = max(offsets.get(tp, 0), msg.offset + 1)
+    return offsets
+
+async def write_tasks(tasks: dict[str, TaskCreate], offsets: dict[TopicPartition, int]) -> list:
+    """Идемпотентная запись задач и (при хранении в Postgres) offset в одной транзакции"""
+    created = []
+    async with unit_of_work() as uow:
+        if flow_controller is not None:
+            started = time.perf_counter()
+            # соединение берется из пула здесь: время ожидания — сигнал перегрузки БД
+            await uow.session.connection()
+            flow_controller.record_checkout_wait(time.perf_counter() - started)
+        if tasks:
+            created = await TaskService(uow).create_tasks(list(tasks.values()), list(tasks))
+        if offsets:
+            await uow.offsets.store_offsets(settings.kafka.GROUP_ID, offsets)
+    return created
+
+async def route_failed(messages: list[ConsumerRecord], error: BaseException) -> bool:
+    """Сообщения в топики задержки или DLQ; True — все ушли в DLQ (повторов не будет)"""
+    topics = await asyncio.gather(*(retry_router.route(msg, error) for msg in messages))
+    metrics.inc('worker_routed_messages', len(messages))
+    return all(topic == retry_router.dlq_topic for topic in topics)
+
+async def recover_failed_batch(
+    tasks: dict[str, TaskCreate],
+    sources: dict[str, list[ConsumerRecord]],
+    error: BaseException,
+    replies: TaskReplies,
+) -> list:
+    """
+    Пачка не записана. Временная ошибка (БД недоступна) — вся пачка уходит
+    в топик задержки. Постоянная — задачи пишутся по одной, чтобы в DLQ
+    попали только сообщения, которые действительно не удается записать.
+    """
+    if is_retryable(error) or len(tasks) == 1:
+        if await route_failed([msg for messages in sources.values() for msg in messages], error):
+            for task_id in tasks:
+                replies.failed(task_id, error)
+        return []
+    created = []
+    for task_id, task in tasks.items():
+        try:
+            created += await write_tasks({task_id: task}, {})
+        except Exception as e:
+            if await route_failed(sources[task_id], e):
+                replies.failed(task_id, e)
+            continue
+        replies.created([task_id])
+    return created
+
+async def process_task_messages(messages: list[ConsumerRecord]) -> int:
+    """
+    Валидация пачки сообщений и идемпотентная запись задач одним INSERT
+    в одной транзакции (повторно доставленные события пропускаются).
+    При хранении offset в Postgres они пишутся в той же транзакции.
+
+    Невалидные сообщения уходят в DLQ, а сообщения, которые не удалось
+    записать, — в топики задержки или DLQ (см. RetryRouter), и пачка считается
+    обработанной. Без маршрутизации невалидные сообщения пропускаются,
+    а ошибка БД пробрасывается.
+    """
+    tasks: dict[str, TaskCreate] = {}
+    sources: dict[str, list[ConsumerRecord]] = {}
+    replies = TaskReplies()
+    for msg in messages:
+        data = None
+        try:
+            data = decode_event(msg.value, msg.headers)
+            task_id, task = decode_task_message(msg, data)
+        except Exception as e:
+            logger.exception('Невалидное сообщение => топик: %s, партиция: %s, offset: %s', msg.topic, msg.partition, msg.offset, exc_info=e)
+            metrics.inc('worker_invalid_messages')
+            if retry_router is None or await route_failed([msg], e):
+                replies.invalid(data, e)
+            continue
+        tasks.setdefault(task_id, task)
+        sources.setdefault(task_id, []).append(msg)
+        replies.expect(task_id, data)
+
+    created = []
+    offsets = next_offsets(messages) if settings.worker.OFFSETS_STORE == 'postgres' else {}
+    if tasks or offsets:
+        try:
+            if flow_controller is not None:
+                async with flow_controller.batch(len(tasks)):
+                    created = await write_tasks(tasks, offsets)
+            else:
+                created = await write_tasks(tasks, offsets)
+            replies.created(tasks)
+        except Exception as e:
+            logger.exception('Ошибка записи пачки в базу данных', exc_info=e)
+            metrics.inc('worker_failed_batches')
+            if retry_router is None:
+                raise
+            created = await recover_failed_batch(tasks, sources, e, replies)
+            if offsets:
+                await write_tasks({}, offsets)
+    if reply_publisher is not None:
+        # после commit в БД: клиент по ответу сразу найдет задачу
+        await reply_publisher.send(replies.outcomes)
+    metrics.inc('worker_batches')
+    metrics.inc('worker_messages', len(messages))
+    metrics.inc('worker_tasks_created', len(created))
+    metrics.inc('worker_duplicate_events', len(tasks) - len(created))
+    return len(created)
+
+async def load_stored_offsets(partitions: list[TopicPartition]) -> dict[TopicPartition, int]:
+    async with unit_of_work() as uow:
+        return await uow.offsets.get_offsets(settings.kafka.GROUP_ID, partitions)
+
+async def handle_task_creation_batch(
+    records: dict[TopicPartition, list[ConsumerRecord]],
+    consumer: AIOKafkaConsumer,
+) -> int:
+    """
+    Обработка пачки из getmany(): один INSERT на всю пачку и один commit
+    offset на партицию. При ошибке БД offset не подтверждается.
+    """
+    created = await process_task_messages([msg for messages in records.values() for msg in messages])
+    offsets = {tp: messages[-1].offset + 1 for tp, messages in records.items() if messages}
+    if settings.worker.OFFSETS_STORE != 'postgres':
+        await consumer.commit(offsets)
+    logger.info('Пачка обработана => сообщений: %s, задач: %s, партиций: %s', sum(len(m) for m in records.values()), created, len(offsets))
+    return created
 
+async def consume_concurrently(
+    consumer: AIOKafkaConsumer,
+    pauser: PartitionPauser,
+    listener: WorkerRebalanceListener,
+    stop: asyncio.Event,
+) -> None:
+    """Пачки разных партиций обрабатываются параллельно, одной партиции — по порядку"""
+    dispatcher = PartitionDispatcher(
+        consumer=consumer,
+        handler=process_task_messages,
+        concurrency=settings.worker.CONCURRENCY,
+        queue_size=settings.worker.PARTITION_QUEUE_SIZE,
+        commit_to_kafka=settings.worker.OFFSETS_STORE != 'postgres',
+        pauser=pauser,
+    )
+    # отзываемые партиции дорабатывает и подтверждает сам dispatcher
+    listener.dispatcher = dispatcher
     try:
-        task = TaskCreate.model_validate(data['task'])
-    except Exception as e:
-        logger.exception('Невалидный payload', exc_info=e)
-        await consumer.commit({TopicPartition(msg.topic, msg.partition): msg.offset + 1})
-        raise
+        while not stop.is_set():
+            if flow_controller is not None:
+                flow_controller.update(consumer, pauser, dispatcher.batches)
+            records = await consumer.getmany(
+                timeout_ms=settings.worker.BATCH_MAX_WAIT_MS,
+                max_records=settings.worker.BATCH_MAX_RECORDS,
+            )
+            for tp, messages in records.items():
+                dispatcher.submit(tp, messages)
+            await dispatcher.commit()
+        # остановка: дорабатываем уже полученные пачки не дольше DRAIN_TIMEOUT
+        # (супервизор ждет SHUTDOWN_TIMEOUT) и подтверждаем обработанное
+        try:
+            await asyncio.wait_for(dispatcher.drain(), settings.worker.DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            aborted = sum(dispatcher.tracker.pending(tp) for tp in consumer.assignment())
+            metrics.inc('worker_drain_aborted_messages', aborted)
+            logger.warning('Пачки не обработаны за %s с до остановки => прервано сообщений: %s', settings.worker.DRAIN_TIMEOUT, aborted)
+        await dispatcher.commit()
+    finally:
+        listener.dispatcher = None
+        await dispatcher.stop()
 
+async def consume_retry_topic(topic: str, delay: int, stop: asyncio.Event) -> None:
+    """
+    Чтение топика задержки: сообщение обрабатывается не раньше x-retry-not-before.
+    Задержка у всех сообщений топика одна, поэтому внутри партиции они упорядочены
+    по времени готовности: ждем готовности первого, партиция на это время на паузе.
+    """
+    consumer = AIOKafkaConsumer(
+        bootstrap_servers=settings.kafka.BOOTSTRAP,
+        group_id=f'{settings.kafka.GROUP_ID}.retry.{delay}s',
+        enable_auto_commit=False,
+        auto_offset_reset='earliest',
+    )
+    listener = WorkerRebalanceListener(consumer, revoke_timeout=settings.worker.REVOKE_TIMEOUT)
+    consumer.subscribe([topic], listener=listener)
+    await consumer.start()
+    held: dict[TopicPartition, list[ConsumerRecord]] = {}
     try:
-        async with unit_of_work() as uow:
-            svc = TaskService(uow)
-            await svc.create_task(task)
-        # Подтверждаем offset только если все успешно
-        logger.info('Сообщение успешно обработано => топик: %s, партиция: %s, offset: %s, ключ: %s, значение: %s, время: %s', msg.topic, msg.partition, msg.offset, msg.key, msg.value, msg.timestamp)
-        await consumer.commit({TopicPartition(msg.topic, msg.partition): msg.offset + 1})
-    except Exception as e:
-        logger.exception('Ошибка записи в базу данных', exc_info=e)
-        raise
-
-async def run_consumer():
+        while not stop.is_set():
+            records = await consumer.getmany(
+                timeout_ms=settings.worker.BATCH_MAX_WAIT_MS,
+                max_records=settings.worker.BATCH_MAX_RECORDS,
+            )
+            for tp, messages in records.items():
+                held.setdefault(tp, []).extend(messages)
+                consumer.pause(tp)
+            now = time.time()
+            for tp, messages in list(held.items()):
+                if tp not in consumer.assignment():
+                    # партиция отдана другому процессу: он прочитает ее с последнего commit
+                    del held[tp]
+                    continue
+                due = list(takewhile(lambda msg: message_due_at(msg) <= now, messages))
+                if due:
+                    try:
+                        async with listener.lock:
+                            await process_task_messages(due)
+                            await consumer.commit({tp: due[-1].offset + 1})
+                    except Exception as e:
+                        # сообщения остаются отложенными до следующей попытки
+                        logger.exception('Ошибка обработки топика задержки %s', topic, exc_info=e)
+                        await asyncio.sleep(settings.kafka.RETRY_BACKOFF)
+                        continue
+                    metrics.inc('worker_retried_messages', len(due))
+                if len(due) < len(messages):
+                    held[tp] = messages[len(due):]
+                else:
+                    del held[tp]
+                    consumer.resume(tp)
+    finally:
+        await consumer.stop()
+
+async def run_consumer(stop: Optional[asyncio.Event] = None):
+    """
+    Цикл чтения топика задач до установки stop.
+
+    Пачка, полученная до остановки, обрабатывается и подтверждается полностью.
+    """
+    stop = stop or asyncio.Event()
     consumer = AIOKafkaConsumer(
-        settings.kafka.TOPIC,
         bootstrap_servers=settings.kafka.BOOTSTRAP,
         group_id=settings.kafka.GROUP_ID,
         enable_auto_commit=False,
         auto_offset_reset='earliest' # начать с самого старого сообщения
     )
+    load_offsets = None
+    if settings.worker.OFFSETS_STORE == 'postgres':
+        if not settings.worker.BATCH_ENABLED:
+            raise ValueError('Хранение offset в Postgres доступно только в пакетном режиме worker')
+        load_offsets = load_stored_offsets
+    pauser = PartitionPauser(consumer)
+    listener = WorkerRebalanceListener(
+        consumer,
+        revoke_timeout=settings.worker.REVOKE_TIMEOUT,
+        load_offsets=load_offsets,
+        pauser=pauser,
+    )
+    consumer.subscribe([settings.kafka.TOPIC], listener=listener)
+
+    global retry_router, reply_publisher
+    producer = None
+    retry_consumers = []
+    if settings.worker.RETRY_ENABLED or settings.worker.REPLY_ENABLED:
+        producer = AIOKafkaProducer(
+            bootstrap_servers=settings.kafka.BOOTSTRAP,
+            client_id=f'{settings.kafka.CLIENT_ID}_worker',
+            acks='all',
+        )
+        await _start_producer_with_retries(producer)
+    if settings.worker.REPLY_ENABLED:
+        reply_publisher = ReplyPublisher(producer, get_codec(settings.kafka.EVENT_CODEC))
+        metrics.register('worker_replies', reply_publisher.stats)
+    if settings.worker.RETRY_ENABLED:
+        retry_router = RetryRouter(
+            producer=producer,
+            topic=settings.kafka.TOPIC,
+            delays=settings.worker.retry_delays,
+            dlq_topic=settings.kafka.DLQ_TOPIC,
+        )
+        retry_consumers = [
+            asyncio.create_task(consume_retry_topic(topic, delay, stop))
+            for topic, delay in retry_router.retry_topics
+        ]
+
     await consumer.start()
     try:
-        async for msg in consumer:
-            await handle_task_creation_message(msg, consumer)
+        if settings.worker.BATCH_ENABLED and settings.worker.CONCURRENCY > 1:
+            await consume_concurrently(consumer, pauser, listener, stop)
+            return
+        while not stop.is_set():
+            if flow_controller is not None:
+                # между пачками в записи ничего нет: пауза только по ожиданию пула
+                flow_controller.update(consumer, pauser)
+            records = await consumer.getmany(
+                timeout_ms=settings.worker.BATCH_MAX_WAIT_MS,
+                max_records=settings.worker.BATCH_MAX_RECORDS if settings.worker.BATCH_ENABLED else 1,
+            )
+            if not records:
+                continue
+            # ребалансировка ждет, пока полученная пачка не будет записана и подтверждена
+            async with listener.lock:
+                if settings.worker.BATCH_ENABLED:
+                    await handle_task_creation_batch(records, consumer)
+                else:
+                    for messages in records.values():
+                        for msg in messages:
+                            await handle_task_creation_message(msg, consumer)
     finally:
         await consumer.stop()
+        stop.set()
+        await asyncio.gather(*retry_consumers, return_exceptions=True)
+        if producer is not None:
+            await producer.stop()
+        retry_router = None
+        reply_publisher = None
+
+async def report_metrics(metrics_queue, interval: float) -> None:
+    """Периодически отправляет метрики процесса супервизору"""
+    while True:
+        await asyncio.sleep(interval)
+        metrics_queue.put((os.getpid(), metrics.snapshot()))
+
+async def main(metrics_queue=None) -> None:
+    """Точка входа процесса worker: SIGTERM/SIGINT — корректная остановка"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    reporter = None
+    if metrics_queue is not None:
+        reporter = asyncio.create_task(report_metrics(metrics_queue, settings.worker.METRICS_INTERVAL))
+    try:
+        await run_consumer(stop)
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+            # последний снимок, чтобы супервизор учел обработанное перед остановкой
+            metrics_queue.put((os.getpid(), metrics.snapshot()))
+    logger.info('Worker остановлен => pid: %s', os.getpid())
 
 if __name__ == '__main__':
-    asyncio.run(run_consumer())
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+import asyncio, os, signal, time, queue
+import multiprocessing as mp
+from typing import Optional
+from core.config import settings
+from infrastructure.kafka.admin import bootstrap_topics, get_partition_count
+from infrastructure.kafka.retry import retry_topic_name
+
+import logging.config
+from core.logger import logger_config
+
+logging.config.dictConfig(logger_config)
+logger = logging.getLogger('kafka_logger')
+
+
+def run_worker_process(metrics_queue) -> None:
+    """Точка входа дочернего процесса: обычный worker в своем event loop"""
+    import worker
+    asyncio.run(worker.main(metrics_queue))
+
+
+async def prepare_topics() -> Optional[int]:
+    """Создает/проверяет топики worker; возвращает число партиций основного топика"""
+    topics = [settings.kafka.TOPIC, settings.kafka.DLQ_TOPIC]
+    if settings.worker.REPLY_ENABLED:
+        topics.append(settings.kafka.REPLY_TOPIC)
+    if settings.worker.RETRY_ENABLED:
+        topics += [retry_topic_name(settings.kafka.TOPIC, delay) for delay in settings.worker.retry_delays]
+    counts = await bootstrap_topics(topics, consumers=settings.worker.PROCESSES or None)
+    if settings.kafka.TOPIC in counts:
+        return counts[settings.kafka.TOPIC]
+    return await get_partition_count(settings.kafka.TOPIC)
+
+
+def topic_partition_count() -> Optional[int]:
+    try:
+        return asyncio.run(prepare_topics())
+    except Exception as e:
+        logger.warning('Не удалось получить число партиций %s: %s', settings.kafka.TOPIC, e)
+        return None
+
+
+def default_process_count(partitions: Optional[int]) -> int:
+    """min(число CPU, число партиций): лишние процессы группы остались бы без партиций"""
+    cpu_count = os.cpu_count() or 1
+    return max(1, min(cpu_count, partitions or cpu_count))
+
+
+class WorkerSupervisor:
+    """
+    Супервизор процессов worker одной группы потребителей.
+
+    Запускает processes дочерних процессов (каждый — отдельный AIOKafkaConsumer
+    в группе GROUP_ID, Kafka распределяет между ними партиции), перезапускает
+    упавшие с экспоненциальной паузой, собирает их метрики. По SIGTERM/SIGINT
+    пересылает SIGTERM детям: они дорабатывают полученные пачки, подтверждают
+    offset и завершаются; не успевшие за SHUTDOWN_TIMEOUT завершаются SIGKILL.
+    """
+    def __init__(self, processes: int, target=run_worker_process):
+        self.processes = processes
+        self.target = target
+        # spawn: дочерний процесс не наследует состояние event loop и пула соединений
+        self.context = mp.get_context('spawn')
+        self.metrics_queue = self.context.Queue()
+        self.children: list[Optional[mp.Process]] = [None] * processes
+        self.restarts = [0] * processes
+        self.restart_at = [0.0] * processes
+        self.started_at = [0.0] * processes
+        # pid -> последний снимок метрик; счетчики завершившихся процессов тоже учитываются
+        self.metrics: dict[int, dict] = {}
+        self.stopping = False
+
+    def _start(self, slot: int) -> None:
+        process = self.context.Process(
+            target=self.target,
+            args=(self.metrics_queue,),
+            name=f'tasks_worker_{slot}',
+        )
+        process.start()
+        self.children[slot] = process
+        self.started_at[slot] = time.monotonic()
+        logger.info('Запущен процесс worker => слот: %s, pid: %s', slot, process.pid)
+
+    def _stop(self, *args) -> None:
+        self.stopping = True
+
+    def _check_children(self) -> None:
+        now = time.monotonic()
+        for slot, process in enumerate(self.children):
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                # процесс, проработавший дольше максимальной паузы, считаем стабильным
+                if now - self.started_at[slot] > settings.worker.RESTART_BACKOFF_MAX:
+                    self.restarts[slot] = 0
+                backoff = min(
+                    settings.worker.RESTART_BACKOFF * 2 ** self.restarts[slot],
+                    settings.worker.RESTART_BACKOFF_MAX,
+                )
+                self.restarts[slot] += 1
+                self.restart_at[slot] = now + backoff
+                logger.warning('Процесс worker завершился => слот: %s, pid: %s, код: %s, перезапуск через %.1f с', slot, process.pid, process.exitcode, backoff)
+                self.children[slot] = None
+            if now >= self.restart_at[slot]:
+                self._start(slot)
+
+    def _collect_metrics(self) -> None:
+        while True:
+            try:
+                pid, snapshot = self.metrics_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.metrics[pid] = snapshot
+
+    def aggregated_metrics(self) -> dict:
+        """Сумма числовых метрик процессов (включая завершившиеся) и число перезапусков"""
+        total: dict = {'processes': sum(1 for p in self.children if p is not None and p.is_alive())}
+        for snapshot in self.metrics.values():
+            for name, value in snapshot.items():
+                if isinstance(value, (int, float)):
+                    total[name] = total.get(name, 0) + value
+        total['restarts'] = sum(self.restarts)
+        return total
+
+    def _shutdown(self) -> None:
+        alive = [p for p in self.children if p is not None and p.is_alive()]
+        for process in alive:
+            os.kill(process.pid, signal.SIGTERM)
+        deadline = time.monotonic() + settings.worker.SHUTDOWN_TIMEOUT
+        for process in alive:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning('Процесс worker не завершился вовремя => pid: %s', process.pid)
+                process.kill()
+                process.join()
+        self._collect_metrics()
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        logger.info('Супервизор worker => процессов: %s', self.processes)
+        last_report = time.monotonic()
+        try:
+            while not self.stopping:
+                self._check_children()
+                self._collect_metrics()
+                if time.monotonic() - last_report >= settings.worker.METRICS_INTERVAL:
+                    last_report = time.monotonic()
+                    logger.info('Метрики worker', extra={'tags': {'worker': self.aggregated_metrics()}})
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+            logger.info('Супервизор worker остановлен', extra={'tags': {'worker': self.aggregated_metrics()}})
+
+
+if __name__ == '__main__':
+    partitions = topic_partition_count()
+    processes = settings.worker.PROCESSES or default_process_count(partitions)
+    WorkerSupervisor(processes).run()